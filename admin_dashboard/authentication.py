@@ -2,8 +2,13 @@ from rest_framework.authentication import BaseAuthentication
 from rest_framework.exceptions import AuthenticationFailed
 import requests
 from django.conf import settings
+from helpers.exceptions import AuthServiceUnavailable
+from helpers.http_client import auth_post
+from helpers.token_cache import TokenVerificationCache
 from django.contrib.auth.models import AnonymousUser
 
+token_cache = TokenVerificationCache("staff")
+
 class SSOUserTokenAuthentication(BaseAuthentication):
     def authenticate(self, request):
         auth_header = request.headers.get("Authorization")
@@ -12,26 +17,39 @@ class SSOUserTokenAuthentication(BaseAuthentication):
 
         token = auth_header.split("Token ")[1]
 
+        # Serve repeat tokens from the verification cache
+        cached = token_cache.get(token)
+        if cached is not None:
+            if not cached.get("valid"):
+                raise AuthenticationFailed("Invalid or expired token.")
+            return (AuthenticatedBusinessUser(**cached["user"]), None)
+
         try:
-            response = requests.post(
-                settings.AUTH_SERVER_URL + "/api/verify-token/",
+            response = auth_post(
+                "/api/verify-token/",
                 json={"token": token},
-                timeout=5
             )
+            if response.status_code >= 500:
+                raise AuthServiceUnavailable()
             if response.status_code != 200:
+                if 400 <= response.status_code < 500:
+                    token_cache.set_rejected(token)
                 raise AuthenticationFailed("Invalid or expired token.")
 
             data = response.json()
-            user = AuthenticatedBusinessUser(
-                id=data["id"],
-                employee_id=data["employee_id"],
-                business_name=data["full_name"],
-                email=data["email"]
-            )
+            user_data = {
+                "id": data["id"],
+                "employee_id": data["employee_id"],
+                "full_name": data["full_name"],
+                "email": data["email"],
+            }
+            token_cache.set_valid(token, user_data)
+            user = AuthenticatedBusinessUser(**user_data)
 
             return (user, None)
         except requests.RequestException:
-            raise AuthenticationFailed("Authentication service unreachable.")
+            # Includes CircuitOpenError: fail fast with 503 so clients retry instead of logging out
+            raise AuthServiceUnavailable()
         
         
         
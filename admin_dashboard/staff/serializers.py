@@ -1,10 +1,18 @@
 from rest_framework import serializers
 from business.models import  BusinessMember
-from helpers.utils import get_member_details_by_card
+from helpers.exceptions import AuthServiceUnavailable
+from helpers.utils import get_member_details_by_card, get_member_details_by_cards
 
 
+REMOTE_FIELDS = ("full_name", "mobile_number")
+
 
 class BusinessMemberClubSerializer(serializers.ModelSerializer):
+    """
+    Pass context={"member_details": {card_number: details}} (see prefetch_member_details)
+    to serialize a page without one auth-server lookup per row, and fields=[...]
+    to return only some of the fields.
+    """
     full_name = serializers.SerializerMethodField()
     mobile_number = serializers.SerializerMethodField()
 
@@ -21,16 +29,33 @@ class BusinessMemberClubSerializer(serializers.ModelSerializer):
             "mobile_number"
         ]
 
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
+
+    def _member_details(self, obj):
+        member_details = self.context.get("member_details")
+        if member_details is not None and obj.BizMbrCardNo in member_details:
+            return member_details[obj.BizMbrCardNo] or {}
+        return get_member_details_by_card(obj.BizMbrCardNo) or {}
+
     def get_full_name(self, obj):
         try:
-            member_details = get_member_details_by_card(obj.BizMbrCardNo)
-            return member_details.get("full_name")
-        except Exception:
-            return None
+            return self._member_details(obj).get("full_name")
+        except AuthServiceUnavailable:
+            return None  # degraded like the batched lookup
 
     def get_mobile_number(self, obj):
         try:
-            member_details = get_member_details_by_card(obj.BizMbrCardNo)
-            return member_details.get("mobile_number")
-        except Exception:
-            return None
+            return self._member_details(obj).get("mobile_number")
+        except AuthServiceUnavailable:
+            return None  # degraded like the batched lookup
+
+
+def prefetch_member_details(members, fields=None):
+    """Member details for every card in `members`, in one batched lookup; skipped when no remote field is wanted."""
+    if fields and not set(fields) & set(REMOTE_FIELDS):
+        return {}
+    return get_member_details_by_cards([member.BizMbrCardNo for member in members])
@@ -6,20 +6,24 @@ from rest_framework.permissions import IsAuthenticated
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
+from django.conf import settings
 from django.shortcuts import get_object_or_404
 
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
 from admin_dashboard.authentication import SSOUserTokenAuthentication
 from business.models import  BusinessMember
-from .serializers import  BusinessMemberClubSerializer
-from helpers.utils import get_member_details_by_card
+from .serializers import  BusinessMemberClubSerializer, prefetch_member_details
+from helpers.pagination import paginate
 
 
 
 class BusinessMemberListByBusinessID(APIView):
     @swagger_auto_schema(
-        operation_description="Get all Business Members by Business ID",
+        operation_description=(
+            "Get the Business Members of a business, one page at a time "
+            "(STAFF_MEMBER_LIST_PAGE_SIZE by default)."
+        ),
         manual_parameters=[
             openapi.Parameter(
                 "business_id",
@@ -27,11 +31,47 @@ class BusinessMemberListByBusinessID(APIView):
                 description="ID of the business to fetch members for",
                 type=openapi.TYPE_INTEGER,
                 required=True
-            )
+            ),
+            openapi.Parameter("page", openapi.IN_QUERY, description="Page number", type=openapi.TYPE_INTEGER),
+            openapi.Parameter("page_size", openapi.IN_QUERY, description="Members per page (max 100)", type=openapi.TYPE_INTEGER),
+            openapi.Parameter(
+                "fields",
+                openapi.IN_QUERY,
+                description="Comma-separated fields to return, e.g. BizMbrCardNo,full_name. Member details are only looked up when full_name or mobile_number is requested.",
+                type=openapi.TYPE_STRING
+            ),
         ],
-        responses={200: BusinessMemberClubSerializer(many=True)}
+        responses={200: openapi.Response(
+            description="One page of members",
+            examples={"application/json": {
+                "success": True,
+                "members": [{"BizMbrCardNo": 100000000001, "full_name": "John Doe", "mobile_number": "9876543210"}],
+                "pagination_meta_data": {"page": 1, "total_pages": 5, "total_items": 100, "next_page": 2, "previous_page": None},
+            }}
+        )}
     )
     def get(self, request, business_id):
-        members = BusinessMember.objects.filter(BizMbrBizId=business_id)
-        serializer = BusinessMemberClubSerializer(members, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
\ No newline at end of file
+        fields = [field.strip() for field in request.query_params.get("fields", "").split(",") if field.strip()]
+        unknown = set(fields) - set(BusinessMemberClubSerializer.Meta.fields)
+        if unknown:
+            return Response(
+                {"success": False, "error": f"Unknown fields: {', '.join(sorted(unknown))}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        members = BusinessMember.objects.filter(BizMbrBizId=business_id).order_by("id")
+
+        page, pagination_meta_data = paginate(request, members, settings.STAFF_MEMBER_LIST_PAGE_SIZE)
+
+        # One batched lookup for the whole page instead of two per row
+        serializer = BusinessMemberClubSerializer(
+            page,
+            many=True,
+            fields=fields or None,
+            context={"member_details": prefetch_member_details(page, fields)},
+        )
+        return Response({
+            "success": True,
+            "members": serializer.data,
+            "pagination_meta_data": pagination_meta_data,
+        }, status=status.HTTP_200_OK)
@@ -1,3 +1,40 @@
-from django.test import TestCase
+from unittest.mock import patch
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+from rest_framework.test import APIRequestFactory
+from admin_dashboard.staff.staff_api import BusinessMemberListByBusinessID
+from business.models import BusinessMember, BusinessRewardRule
+
+
+BUSINESS_ID = 502
+
+
+@patch("admin_dashboard.staff.serializers.get_member_details_by_cards", lambda cards: {card: None for card in cards})
+class BusinessMemberListTests(TestCase):
+    """Staff member list: always one page in an envelope."""
+
+    @classmethod
+    def setUpTestData(cls):
+        rule = BusinessRewardRule.objects.create(RewardRuleBizId=BUSINESS_ID, RewardRuleType="flat", RewardRuleNotionalValue=1)
+        for card_number in (100000000601, 100000000602, 100000000603):
+            BusinessMember.objects.create(BizMbrBizId=BUSINESS_ID, BizMbrCardNo=card_number, BizMbrRuleId=rule)
+
+    def get(self, query=""):
+        request = APIRequestFactory().get(f"/admin/business-members/{BUSINESS_ID}/{query}")
+        return BusinessMemberListByBusinessID.as_view()(request, business_id=BUSINESS_ID)
+
+    @override_settings(STAFF_MEMBER_LIST_PAGE_SIZE=2)
+    def test_first_page_by_default(self):
+        response = self.get()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([member["BizMbrCardNo"] for member in response.data["members"]], [100000000601, 100000000602])
+        self.assertEqual(response.data["pagination_meta_data"]["total_items"], 3)
+        self.assertEqual(response.data["pagination_meta_data"]["next_page"], 2)
+
+    def test_page_size_and_fields(self):
+        response = self.get("?page_size=2&fields=BizMbrCardNo")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["members"], [{"BizMbrCardNo": 100000000601}, {"BizMbrCardNo": 100000000602}])
+        self.assertIn("pagination_meta_data", response.data)
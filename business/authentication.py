@@ -3,6 +3,12 @@ from rest_framework.exceptions import AuthenticationFailed
 import requests
 from django.conf import settings
 from django.contrib.auth.models import AnonymousUser
+from helpers.exceptions import AuthServiceUnavailable
+from helpers.http_client import auth_post
+from helpers.token_cache import TokenVerificationCache
+
+token_cache = TokenVerificationCache("business")
+
 
 class SSOBusinessTokenAuthentication(BaseAuthentication):
     def authenticate(self, request):
@@ -12,28 +18,46 @@ class SSOBusinessTokenAuthentication(BaseAuthentication):
 
         token = auth_header.split("Token ")[1]
 
+        # Serve repeat tokens from the verification cache
+        cached = token_cache.get(token)
+        if cached is not None:
+            if not cached.get("valid"):
+                raise AuthenticationFailed("Invalid or expired token.")
+            return (AuthenticatedBusinessUser(**cached["user"]), None)
+
         try:
-            response = requests.post(
-                settings.AUTH_SERVER_URL + "/api/verify-token/",
+            response = auth_post(
+                "/api/verify-token/",
                 json={"token": token},
-                timeout=5
             )
             if response.status_code != 200:
+                # Only remember definite rejections, not auth server errors
+                if response.status_code >= 500:
+                    raise AuthServiceUnavailable()
+                if 400 <= response.status_code < 500:
+                    token_cache.set_rejected(token)
                 raise AuthenticationFailed("Invalid or expired token.")
 
             data = response.json()
-            user = AuthenticatedBusinessUser(
-                id=data["user_id"],
-                business_id=data["business_id"],
-                business_name=data["business_name"]
-            )
+            user_data = {
+                "id": data["user_id"],
+                "business_id": data["business_id"],
+                "business_name": data["business_name"],
+            }
+            token_cache.set_valid(token, user_data)
+            user = AuthenticatedBusinessUser(**user_data)
 
             return (user, None)
         except requests.RequestException:
-            raise AuthenticationFailed("Authentication service unreachable.")
-        
-        
-        
+            # Includes CircuitOpenError: fail fast with 503 so clients retry instead of logging out
+            raise AuthServiceUnavailable()
+
+
+def get_token_cache_stats():
+    """Hit/miss counters of the business token verification cache for this process."""
+    return token_cache.stats()
+
+
 
 class AuthenticatedBusinessUser:
     def __init__(self, id, business_id, business_name):
@@ -44,7 +68,7 @@ class AuthenticatedBusinessUser:
 
     def __str__(self):
         return f"BusinessUser {self.business_id}"
-    
-    
-    
-    
+
+
+
+
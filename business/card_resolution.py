@@ -0,0 +1,87 @@
+"""
+    Card resolution for counter scans.
+
+    resolve_card() answers everything the scan screens need about a card in one
+    place: its primary/secondary card numbers (one cached auth-server call), the
+    membership in this business and in other businesses (one query), the
+    member's reward rule (compiled rule cache, no query) and, when asked for, the
+    balance (one query) and the member's KYC details (cached auth-server lookup).
+"""
+
+from dataclasses import dataclass
+
+from django.db.models import Case, IntegerField, Value, When
+from business.models import BusinessMember, CumulativePoints
+from business.reward_engine import get_rule
+from helpers.card_utils import get_primary_card_from_remote
+from helpers.utils import get_member_details_by_card
+
+
+@dataclass
+class CardResolution:
+    scanned_card_number: str
+    resolved: bool
+    message: str
+    primary_card_number: int = None
+    secondary_card_number: int = None
+    member: BusinessMember = None  # membership in this business
+    other_business_id: int = None  # set when only another business has the card
+    rule: object = None  # reward_engine.Rule of the membership
+    balance: CumulativePoints = None
+    member_data: dict = None
+
+    @property
+    def local_card_number(self):
+        """The card number to look up locally: the primary card, or the scanned card when unresolved."""
+        if self.primary_card_number:
+            return self.primary_card_number
+        try:
+            return int(self.scanned_card_number)
+        except (TypeError, ValueError):
+            return None
+
+
+def _memberships(card_number, business_id):
+    """This business's membership first, then the oldest membership elsewhere; one query."""
+    return list(
+        BusinessMember.objects.filter(BizMbrCardNo=card_number)
+        .annotate(other_business=Case(
+            When(BizMbrBizId=business_id, then=Value(0)),
+            default=Value(1),
+            output_field=IntegerField(),
+        ))
+        .order_by("other_business", "id")[:1]
+    )
+
+
+def resolve_card(card_number, business_id, with_balance=False, with_member_data=False):
+    resolved = get_primary_card_from_remote(card_number, business_id)
+    resolution = CardResolution(
+        scanned_card_number=card_number,
+        resolved=bool(resolved.get("success") and resolved.get("primary_card_number")),
+        message=resolved.get("message", ""),
+        primary_card_number=resolved.get("primary_card_number") if resolved.get("success") else None,
+        secondary_card_number=resolved.get("secondary_card_number"),
+    )
+
+    local_card_number = resolution.local_card_number
+    if local_card_number is None:
+        return resolution
+
+    memberships = _memberships(local_card_number, business_id)
+    if memberships and memberships[0].BizMbrBizId == int(business_id):
+        resolution.member = memberships[0]
+        resolution.rule = get_rule(business_id, resolution.member.BizMbrRuleId_id)
+    elif memberships:
+        resolution.other_business_id = memberships[0].BizMbrBizId
+
+    if with_balance:
+        resolution.balance = CumulativePoints.objects.filter(
+            CmltvPntsMbrCardNo=local_card_number,
+            CmltvPntsBizId=business_id
+        ).first()
+
+    if with_member_data and resolution.resolved:
+        resolution.member_data = get_member_details_by_card(resolution.primary_card_number)
+
+    return resolution
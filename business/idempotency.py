@@ -0,0 +1,131 @@
+import hashlib
+import json
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.http import HttpResponse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+from business.models import IdempotencyKey
+
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+
+
+def _scope(request):
+    business_id = getattr(request.user, "business_id", None)
+    if business_id is None:
+        try:
+            business_id = int(request.data.get("business_id"))
+        except (TypeError, ValueError, AttributeError):
+            business_id = 0
+    return business_id
+
+
+def _request_hash(request):
+    body = json.dumps(request.data, sort_keys=True, cls=DjangoJSONEncoder, default=str)
+    return hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+
+def _lookup(key, endpoint, business_id):
+    record = IdempotencyKey.objects.filter(key=key, endpoint=endpoint, business_id=business_id).first()
+    if record and record.expires_at <= timezone.now():
+        record.delete()
+        return None
+    return record
+
+
+def _replay(record, request_hash):
+    if record.request_hash != request_hash:
+        return Response(
+            {"success": False, "error": "Idempotency-Key was already used with a different request body."},
+            status=status.HTTP_409_CONFLICT
+        )
+    return HttpResponse(
+        bytes(record.response_content or b""),
+        status=record.response_status,
+        content_type=record.response_content_type or None,
+        headers={"Idempotent-Replayed": "true"},
+    )
+
+
+def _render(view, request, response):
+    """Render the view's Response now, as finalize_response would, so its bytes can be stored."""
+    if not isinstance(response, Response):
+        return
+    response.accepted_renderer = request.accepted_renderer
+    response.accepted_media_type = request.accepted_media_type
+    response.renderer_context = view.get_renderer_context()
+    response.render()
+
+
+def idempotent(endpoint):
+    """
+    Make a POST view method safe to retry with an Idempotency-Key header.
+
+    The first request with a key runs inside a DB transaction together with the
+    insert of its key row and stores the rendered response. A replay of the same
+    key is answered with the stored status and bytes (one lookup on the unique
+    index) without running the view again; the same key with a different body is
+    a 409. 5xx and 409 Conflict responses are rolled back and not stored, so they
+    can be retried. Requests without the header are not affected.
+
+    Because the whole view runs in that transaction, row locks taken by its
+    ledger writes are held until the view returns: decorated views must do their
+    remote calls (auth server lookups) before writing to the ledger and only
+    local work (outbox inserts) after it.
+    """
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            key = request.headers.get(IDEMPOTENCY_HEADER)
+            if not key:
+                return view_method(self, request, *args, **kwargs)
+
+            if len(key) > 255:
+                return Response(
+                    {"success": False, "error": "Idempotency-Key must be at most 255 characters."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            business_id = _scope(request)
+            request_hash = _request_hash(request)
+
+            record = _lookup(key, endpoint, business_id)
+            if record is not None:
+                return _replay(record, request_hash)
+
+            try:
+                with transaction.atomic():
+                    record = IdempotencyKey.objects.create(
+                        key=key,
+                        endpoint=endpoint,
+                        business_id=business_id,
+                        request_hash=request_hash,
+                        expires_at=timezone.now() + timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS),
+                    )
+                    response = view_method(self, request, *args, **kwargs)
+
+                    if response.status_code >= 500 or response.status_code == status.HTTP_409_CONFLICT:
+                        transaction.set_rollback(True)
+                        return response
+
+                    _render(self, request, response)
+                    record.response_status = response.status_code
+                    record.response_content = response.content
+                    record.response_content_type = response.get("Content-Type", "")
+                    record.save(update_fields=["response_status", "response_content", "response_content_type"])
+                    return response
+            except IntegrityError:
+                # A concurrent request with the same key committed first
+                record = _lookup(key, endpoint, business_id)
+                if record is None:
+                    raise
+                return _replay(record, request_hash)
+
+        return wrapper
+    return decorator
@@ -0,0 +1,191 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from business.models import BusinessMember, CardTransaction, CumulativePoints
+from business import rollups
+from business.reward_engine import compute_points_batch, get_rule, redeem_points_required
+
+
+class BalanceNotFound(Exception):
+    """No CumulativePoints row exists for the card and business."""
+
+
+class InsufficientPoints(Exception):
+    """The current balance does not cover the requested redemption."""
+
+
+def _balance_rows(card_number, business_id):
+    return CumulativePoints.objects.filter(
+        CmltvPntsMbrCardNo=card_number,
+        CmltvPntsBizId=business_id
+    )
+
+
+def _ensure_balance_row(card_number, business_id):
+    CumulativePoints.objects.get_or_create(
+        CmltvPntsMbrCardNo=card_number,
+        CmltvPntsBizId=business_id,
+        defaults={
+            "LifetimeEarnedPoints": 0,
+            "CurrentBalance": 0,
+            "TotalPurchaseAmount": 0,
+            "LifetimeRedeemedPoints": 0,
+        }
+    )
+
+
+def apply_earn(card_transaction):
+    """
+    Save an unsaved Points_Earned CardTransaction and credit its points to the
+    member's balance in the same DB transaction. The balance is changed with a
+    single F() update, so concurrent terminals never overwrite each other.
+    """
+    with transaction.atomic():
+        _ensure_balance_row(card_transaction.CrdTrnsCardNumber, card_transaction.CrdTrnsBizId)
+        card_transaction.save()
+        _balance_rows(card_transaction.CrdTrnsCardNumber, card_transaction.CrdTrnsBizId).update(
+            LifetimeEarnedPoints=F("LifetimeEarnedPoints") + card_transaction.CrdTrnsPoint,
+            CurrentBalance=F("CurrentBalance") + card_transaction.CrdTrnsPoint,
+            TotalPurchaseAmount=F("TotalPurchaseAmount") + card_transaction.CrdTrnsPurchaseAmount,
+            LastUpdated=timezone.now(),
+        )
+    return card_transaction
+
+
+def apply_redeem(card_transaction, points, create_balance=False):
+    """
+    Debit `points` from the member's balance and save the unsaved Points_Redeemed
+    CardTransaction in one DB transaction.
+
+    The debit is a conditional update (CurrentBalance >= points), so parallel
+    redemptions can never take the balance below zero. Raises InsufficientPoints
+    (or BalanceNotFound when there is no balance row) and saves nothing if the
+    debit does not apply.
+    """
+    card_number = card_transaction.CrdTrnsCardNumber
+    business_id = card_transaction.CrdTrnsBizId
+
+    with transaction.atomic():
+        if create_balance:
+            _ensure_balance_row(card_number, business_id)
+
+        updated = _balance_rows(card_number, business_id).filter(CurrentBalance__gte=points).update(
+            LifetimeRedeemedPoints=F("LifetimeRedeemedPoints") + points,
+            CurrentBalance=F("CurrentBalance") - points,
+            LastUpdated=timezone.now(),
+        )
+        if not updated:
+            if not _balance_rows(card_number, business_id).exists():
+                raise BalanceNotFound()
+            raise InsufficientPoints()
+
+        card_transaction.save()
+    return card_transaction
+
+
+def _active_rules_by_card(business_id, card_numbers):
+    """{card_number: compiled Rule} for the active members among card_numbers, in one query."""
+    rule_ids = {}
+    members = (
+        BusinessMember.objects.filter(BizMbrBizId=business_id, BizMbrCardNo__in=card_numbers, BizMbrIsActive=True)
+        .order_by("id")
+        .values_list("BizMbrCardNo", "BizMbrRuleId")
+    )
+    for card_number, rule_id in members:
+        rule_ids.setdefault(card_number, rule_id)
+    return {card_number: get_rule(business_id, rule_id) for card_number, rule_id in rule_ids.items()}
+
+
+def apply_transaction_batch(business_id, items):
+    """
+    Apply many earn/redeem items for one business with set-based queries.
+
+    `items` are dicts with CrdTrnsCardNumber, CrdTrnsPurchaseAmount and
+    CrdTrnsTransactionType. Rules and balances for all cards are loaded at once,
+    items are applied in order against the locked balances, the rows are written
+    with one bulk_create and each card's balance gets a single F() update.
+
+    Returns the saved CardTransaction for each item. All or nothing: a redeem
+    the running balance does not cover raises InsufficientPoints(position of
+    the item) and nothing is written.
+    """
+    card_numbers = {item["CrdTrnsCardNumber"] for item in items}
+    rules = _active_rules_by_card(business_id, card_numbers)
+
+    with transaction.atomic():
+        CumulativePoints.objects.bulk_create(
+            [
+                CumulativePoints(
+                    CmltvPntsMbrCardNo=card_number,
+                    CmltvPntsBizId=business_id,
+                    LifetimeEarnedPoints=0,
+                    CurrentBalance=0,
+                    TotalPurchaseAmount=0,
+                    LifetimeRedeemedPoints=0,
+                )
+                for card_number in sorted(card_numbers)
+            ],
+            ignore_conflicts=True,
+        )
+        # Locked in card order, so overlapping batches cannot deadlock
+        balances = dict(
+            CumulativePoints.objects.select_for_update()
+            .filter(CmltvPntsBizId=business_id, CmltvPntsMbrCardNo__in=card_numbers)
+            .order_by("CmltvPntsMbrCardNo")
+            .values_list("CmltvPntsMbrCardNo", "CurrentBalance")
+        )
+        deltas = defaultdict(lambda: {"earned": 0, "redeemed": 0, "purchase": 0, "required": 0})
+        accepted = []
+
+        item_rules = [rules.get(item["CrdTrnsCardNumber"]) for item in items]
+        item_points = compute_points_batch(item_rules, [item["CrdTrnsPurchaseAmount"] for item in items])
+
+        for position, (item, rule, points) in enumerate(zip(items, item_rules, item_points)):
+            card_number = item["CrdTrnsCardNumber"]
+            delta = deltas[card_number]
+            card_transaction = CardTransaction(
+                CrdTrnsBizId=business_id,
+                CrdTrnsCardNumber=card_number,
+                CrdTrnsPurchaseAmount=item["CrdTrnsPurchaseAmount"],
+                CrdTrnsTransactionType=item["CrdTrnsTransactionType"],
+                CrdTrnsPoint=points,
+            )
+
+            if card_transaction.CrdTrnsTransactionType == "Points_Earned":
+                balances[card_number] += card_transaction.CrdTrnsPoint
+                delta["earned"] += card_transaction.CrdTrnsPoint
+                delta["purchase"] += card_transaction.CrdTrnsPurchaseAmount
+            else:
+                required_points = redeem_points_required(rule, card_transaction.CrdTrnsPoint)
+                if balances[card_number] < required_points:
+                    # Raised before any write, so the atomic block rolls back only the empty balance rows
+                    raise InsufficientPoints(position)
+                # Smallest starting balance that still covers every accepted redeem so far
+                delta["required"] = max(delta["required"], required_points - (delta["earned"] - delta["redeemed"]))
+                balances[card_number] -= required_points
+                delta["redeemed"] += required_points
+
+            accepted.append(card_transaction)
+
+        CardTransaction.objects.bulk_create(accepted)
+        rollups.record_transactions(accepted)
+
+        now = timezone.now()
+        for card_number, delta in deltas.items():
+            if not (delta["earned"] or delta["redeemed"] or delta["purchase"]):
+                continue
+            # Conditional like apply_redeem, for backends without row locks
+            updated = _balance_rows(card_number, business_id).filter(CurrentBalance__gte=delta["required"]).update(
+                LifetimeEarnedPoints=F("LifetimeEarnedPoints") + delta["earned"],
+                LifetimeRedeemedPoints=F("LifetimeRedeemedPoints") + delta["redeemed"],
+                CurrentBalance=F("CurrentBalance") + delta["earned"] - delta["redeemed"],
+                TotalPurchaseAmount=F("TotalPurchaseAmount") + delta["purchase"],
+                LastUpdated=now,
+            )
+            if not updated:
+                # The balance changed underneath us; roll the whole batch back
+                raise InsufficientPoints()
+
+    return accepted
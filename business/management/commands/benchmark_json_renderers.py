@@ -0,0 +1,108 @@
+import gzip
+import json
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, force_authenticate
+from business.authentication import AuthenticatedBusinessUser
+from business.models import CardTransaction
+from business.views import CardTransactionApi, SpecificCardTransactionApi
+from helpers.renderers import FastJSONRenderer, fast_json_enabled
+
+
+BENCH_BUSINESS_ID = -1  # rows are inserted under this id and rolled back
+BENCH_CARD_NUMBER = 100000000001
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare DRF's JSONRenderer with FastJSONRenderer on the transaction list endpoints "
+        "(a 100-row page of transactions/ and a card's full history). "
+        "Rows are inserted inside a transaction that is rolled back at the end."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", default="1000,10000,100000", help="Comma-separated history sizes.")
+        parser.add_argument("--repeat", type=int, default=5, help="Requests per measurement; the median is reported.")
+
+    def _measure(self, view, path, repeat):
+        factory = APIRequestFactory()
+        user = AuthenticatedBusinessUser(id=0, business_id=BENCH_BUSINESS_ID, business_name="benchmark")
+        timings, render_timings, content = [], [], b""
+        for _ in range(repeat):
+            request = factory.get(path)
+            force_authenticate(request, user=user)
+            start = time.perf_counter()
+            response = view(request, **({"card_number": str(BENCH_CARD_NUMBER)} if "specific" in path else {}))
+            render_start = time.perf_counter()
+            response.render()
+            end = time.perf_counter()
+            timings.append((end - start) * 1000)
+            render_timings.append((end - render_start) * 1000)
+            content = response.content
+        return statistics.median(timings), statistics.median(render_timings), content
+
+    def _run(self, sizes, repeat):
+        self.stdout.write(
+            f"{'endpoint':<16} {'rows':>7} {'drf ms':>9} {'fast ms':>9} {'render drf':>11} {'render fast':>12}"
+            f" {'speedup':>8} {'bytes':>10} {'gzip':>9}  same data"
+        )
+        inserted = 0
+        for size in sizes:
+            CardTransaction.objects.bulk_create(
+                [
+                    CardTransaction(
+                        CrdTrnsBizId=BENCH_BUSINESS_ID,
+                        CrdTrnsCardNumber=BENCH_CARD_NUMBER,
+                        CrdTrnsPurchaseAmount=(i % 997) + 0.5,
+                        CrdTrnsPoint=i % 50,
+                        CrdTrnsTransactionType="Points_Earned" if i % 3 else "Points_Redeemed",
+                    )
+                    for i in range(inserted, size)
+                ],
+                batch_size=5000,
+            )
+            inserted = max(inserted, size)
+
+            endpoints = [
+                ("transactions/", CardTransactionApi, "/reward/transactions/?page_size=100"),
+                ("card history", SpecificCardTransactionApi,
+                 f"/reward/member/specific/transactions/{BENCH_CARD_NUMBER}?card_number={BENCH_CARD_NUMBER}"),
+            ]
+            for name, view_class, path in endpoints:
+                drf_ms, drf_render, drf_content = self._measure(
+                    view_class.as_view(renderer_classes=[JSONRenderer]), path, repeat)
+                fast_ms, fast_render, fast_content = self._measure(
+                    view_class.as_view(renderer_classes=[FastJSONRenderer]), path, repeat)
+                gzip_size = len(gzip.compress(fast_content, compresslevel=6))
+                # Compared parsed: float exponents may be spelled differently (1e16 vs 1e+16)
+                identical = json.loads(drf_content) == json.loads(fast_content)
+
+                self.stdout.write(
+                    f"{name:<16} {size:>7} {drf_ms:>9.1f} {fast_ms:>9.1f} {drf_render:>11.1f} {fast_render:>12.1f}"
+                    f" {drf_render / fast_render:>7.1f}x {len(fast_content):>10} {gzip_size:>9}  {identical}"
+                )
+                if not identical:
+                    raise CommandError(f"{name}: FastJSONRenderer data differs from JSONRenderer")
+
+    def handle(self, *args, **options):
+        try:
+            sizes = sorted(int(size) for size in options["rows"].split(",") if size.strip())
+        except ValueError:
+            raise CommandError("--rows must be comma-separated integers")
+        if not fast_json_enabled():
+            self.stderr.write("orjson is not installed or FAST_JSON_ENABLED is off: both columns use DRF's encoder.")
+
+        try:
+            with transaction.atomic():
+                self._run(sizes, options["repeat"])
+                raise _Rollback
+        except _Rollback:
+            pass
@@ -0,0 +1,122 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from business.models import CardTransaction, CumulativePoints, MemberJoinRequest
+from business.serializers import (
+    CardTransactionSerializer,
+    MemberJoinRequestSerializer,
+    card_transaction_rows,
+    member_join_request_rows,
+)
+from member.serializers import CumulativePointsSerializer, cumulative_points_rows
+
+
+BENCH_BUSINESS_ID = -1  # rows are inserted under this id and rolled back
+
+
+def _card_transaction(i, now):
+    return CardTransaction(
+        CrdTrnsBizId=BENCH_BUSINESS_ID,
+        CrdTrnsCardNumber=100000000000 + i % 500,
+        CrdTrnsPurchaseAmount=(i % 997) + 0.5,
+        CrdTrnsPoint=i % 50,
+        CrdTrnsTransactionType="Points_Earned" if i % 3 else "Points_Redeemed",
+    )
+
+
+def _cumulative_points(i, now):
+    return CumulativePoints(
+        CmltvPntsMbrCardNo=100000000000 + i,
+        CmltvPntsBizId=BENCH_BUSINESS_ID,
+        LifetimeEarnedPoints=i,
+        LifetimeRedeemedPoints=i // 2,
+        CurrentBalance=i - i // 2,
+        TotalPurchaseAmount=i * 10.25,
+    )
+
+
+def _member_join_request(i, now):
+    return MemberJoinRequest(
+        business=BENCH_BUSINESS_ID,
+        card_number=100000000000 + i,
+        full_name=f"Member {i}",
+        mobile_number=str(9000000000 + i),
+        responded_at=now if i % 2 else None,
+    )
+
+
+BENCHMARKS = [
+    # (name, model, filter, ModelSerializer, fast serializer, row factory)
+    ("CardTransaction", CardTransaction, {"CrdTrnsBizId": BENCH_BUSINESS_ID}, CardTransactionSerializer, card_transaction_rows, _card_transaction),
+    ("CumulativePoints", CumulativePoints, {"CmltvPntsBizId": BENCH_BUSINESS_ID}, CumulativePointsSerializer, cumulative_points_rows, _cumulative_points),
+    ("MemberJoinRequest", MemberJoinRequest, {"business": BENCH_BUSINESS_ID}, MemberJoinRequestSerializer, member_join_request_rows, _member_join_request),
+]
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare ModelSerializer and .values() fast-path serialization of list endpoints. "
+        "Rows are inserted inside a transaction that is rolled back at the end."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", default="1000,10000,100000", help="Comma-separated row counts.")
+        parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement; the fastest is reported.")
+
+    def _best(self, func, repeat):
+        best, result = None, None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = func()
+            elapsed = (time.perf_counter() - start) * 1000
+            best = elapsed if best is None else min(best, elapsed)
+        return best, result
+
+    def _run(self, sizes, repeat):
+        now = timezone.now()
+        # "total" includes fetching the rows; "serialize" only turns already fetched rows into data
+        self.stdout.write(
+            f"{'serializer':<18} {'rows':>7} {'drf total':>10} {'fast total':>10} {'speedup':>8}"
+            f" {'drf ser.':>10} {'fast ser.':>10} {'speedup':>8}  identical"
+        )
+        for name, model, filters, serializer_class, fast, make_row in BENCHMARKS:
+            inserted = 0
+            for size in sizes:
+                model.objects.bulk_create([make_row(i, now) for i in range(inserted, size)], batch_size=5000)
+                inserted = max(inserted, size)
+                queryset = model.objects.filter(**filters).order_by("id")[:size]
+
+                drf_ms, drf_data = self._best(lambda: serializer_class(queryset, many=True).data, repeat)
+                fast_ms, fast_data = self._best(lambda: fast.serialize(fast.values(queryset)), repeat)
+                identical = JSONRenderer().render(drf_data) == JSONRenderer().render(fast_data)
+
+                instances, rows = list(queryset), list(fast.values(queryset))
+                drf_ser_ms, _ = self._best(lambda: serializer_class(instances, many=True).data, repeat)
+                fast_ser_ms, _ = self._best(lambda: fast.serialize(rows), repeat)
+
+                self.stdout.write(
+                    f"{name:<18} {size:>7} {drf_ms:>10.1f} {fast_ms:>10.1f} {drf_ms / fast_ms:>7.1f}x"
+                    f" {drf_ser_ms:>10.1f} {fast_ser_ms:>10.1f} {drf_ser_ms / fast_ser_ms:>7.1f}x  {identical}"
+                )
+                if not identical:
+                    raise CommandError(f"{name}: fast-path output differs from {serializer_class.__name__}")
+
+    def handle(self, *args, **options):
+        try:
+            sizes = sorted(int(size) for size in options["rows"].split(",") if size.strip())
+        except ValueError:
+            raise CommandError("--rows must be comma-separated integers")
+
+        try:
+            with transaction.atomic():
+                self._run(sizes, options["repeat"])
+                raise _Rollback
+        except _Rollback:
+            pass
@@ -0,0 +1,92 @@
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from business.models import BusinessDailyRollup
+from business.rollups import ROLLUP_FIELDS, compute_rollups_from_ledger
+
+
+TRANSACTION_FIELDS = [field for field in ROLLUP_FIELDS if field not in ("NewMembers", "RemovedMembers")]
+
+
+class Command(BaseCommand):
+    help = "Rebuild BusinessDailyRollup rows from the raw ledger and verify they match."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--business-id", type=int, help="Only rebuild/verify this business.")
+        parser.add_argument("--verify-only", action="store_true", help="Compare stored rollups with the ledger without rewriting them.")
+
+    def _stored_rollups(self, business_id):
+        rows = BusinessDailyRollup.objects.all()
+        if business_id is not None:
+            rows = rows.filter(RollupBizId=business_id)
+        return {
+            (row["RollupBizId"], row["RollupDate"]): {field: row[field] for field in ROLLUP_FIELDS}
+            for row in rows.values("RollupBizId", "RollupDate", *ROLLUP_FIELDS)
+        }
+
+    def _mismatches(self, expected, stored):
+        """
+        Transaction totals are compared per (business, day). Member removals are
+        recorded on the day they happen and cannot be recovered from the ledger,
+        so membership is compared as a net count per business.
+        """
+        empty = dict.fromkeys(ROLLUP_FIELDS, 0)
+        mismatches = []
+        net_members = defaultdict(lambda: [0, 0])
+
+        for key in sorted(set(expected) | set(stored)):
+            want = expected.get(key, empty)
+            have = stored.get(key, empty)
+            for field in TRANSACTION_FIELDS:
+                if abs((want[field] or 0) - (have[field] or 0)) > 1e-6:
+                    mismatches.append((key, field, want[field], have[field]))
+            net_members[key[0]][0] += want["NewMembers"]
+            net_members[key[0]][1] += have["NewMembers"] - have["RemovedMembers"]
+
+        for biz_id, (want, have) in sorted(net_members.items()):
+            if want != have:
+                mismatches.append(((biz_id, "all days"), "members", want, have))
+        return mismatches
+
+    def _rebuild(self, business_id):
+        """
+        Lock the stored rows, recompute from the ledger and replace them in one
+        transaction. Rollup updates queued behind the locks are applied on top
+        of the rebuilt rows; one whose ledger write was already counted by the
+        recomputation shows up in the verification below, and re-running the
+        command settles it.
+        """
+        with transaction.atomic():
+            existing = BusinessDailyRollup.objects.all()
+            if business_id is not None:
+                existing = existing.filter(RollupBizId=business_id)
+            list(existing.select_for_update().values_list("id", flat=True))  # take the row locks
+
+            expected = compute_rollups_from_ledger(business_id)
+            existing.delete()
+            BusinessDailyRollup.objects.bulk_create(
+                [
+                    BusinessDailyRollup(RollupBizId=biz_id, RollupDate=day, **values)
+                    for (biz_id, day), values in expected.items()
+                ],
+                batch_size=1000,
+            )
+        return expected
+
+    def handle(self, *args, **options):
+        business_id = options.get("business_id")
+
+        if options["verify_only"]:
+            expected = compute_rollups_from_ledger(business_id)
+        else:
+            expected = self._rebuild(business_id)
+            self.stdout.write(f"Rebuilt {len(expected)} daily rollup rows.")
+
+        mismatches = self._mismatches(expected, self._stored_rollups(business_id))
+        if mismatches:
+            for (biz_id, day), field, want, have in mismatches[:50]:
+                self.stderr.write(f"Business {biz_id} on {day}: {field} ledger={want} rollup={have}")
+            raise CommandError(f"{len(mismatches)} rollup values do not match the ledger.")
+
+        self.stdout.write(self.style.SUCCESS("Rollups match the ledger."))
@@ -0,0 +1,66 @@
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from business.models import BusinessMember, CardMapping
+from helpers.card_utils import CardLookupUnavailable, refresh_card_mapping
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-resolve known (card, business) pairs against the auth server and refresh "
+        "the card mapping cache and CardMapping table."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--business-id", type=int, help="Only refresh this business.")
+        parser.add_argument(
+            "--seed-from-members",
+            action="store_true",
+            help="Also resolve every BusinessMember card, not only the pairs already in the table.",
+        )
+        parser.add_argument("--workers", type=int, default=settings.AUTH_LOOKUP_MAX_WORKERS)
+
+    def _pairs(self, options):
+        mappings = CardMapping.objects.all()
+        if options["business_id"]:
+            mappings = mappings.filter(business_id=options["business_id"])
+        pairs = mappings.values_list("card_number", "business_id").iterator()
+
+        if options["seed_from_members"]:
+            members = BusinessMember.objects.all()
+            if options["business_id"]:
+                members = members.filter(BizMbrBizId=options["business_id"])
+            known = set(mappings.values_list("card_number", "business_id"))
+            member_pairs = members.values_list("BizMbrCardNo", "BizMbrBizId").distinct().iterator()
+            yield from pairs
+            yield from (pair for pair in member_pairs if pair not in known)
+        else:
+            yield from pairs
+
+    def handle(self, *args, **options):
+        if not settings.CARD_MAPPING_TABLE_ENABLED:
+            self.stdout.write(self.style.WARNING("CARD_MAPPING_TABLE_ENABLED is off; only the cache will be refreshed."))
+
+        totals = {"mapped": 0, "unmapped": 0, "unavailable": 0}
+
+        def refresh(pair):
+            try:
+                return "mapped" if refresh_card_mapping(*pair)["success"] else "unmapped"
+            except CardLookupUnavailable:
+                return "unavailable"
+
+        pairs = self._pairs(options)
+        with ThreadPoolExecutor(max_workers=options["workers"]) as executor:
+            while True:
+                chunk = list(islice(pairs, 500))
+                if not chunk:
+                    break
+                for outcome in executor.map(refresh, chunk):
+                    totals[outcome] += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Refreshed card mappings: {totals['mapped']} mapped, {totals['unmapped']} unmapped, "
+            f"{totals['unavailable']} failed (auth server unavailable)."
+        ))
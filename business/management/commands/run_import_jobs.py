@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+from business.member_import import claim_next_job, fail_import_job, run_import_job
+
+
+class Command(BaseCommand):
+    help = "Run queued member import jobs, resuming interrupted ones from their last committed chunk."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Run the jobs that are due and exit.")
+        parser.add_argument("--interval", type=float, default=5, help="Seconds to sleep when no job is queued.")
+
+    def handle(self, *args, **options):
+        try:
+            while True:
+                job = claim_next_job()
+                if job is None:
+                    if options["once"]:
+                        break
+                    time.sleep(options["interval"])
+                    continue
+
+                self.stdout.write(f"Import job {job.id}: starting at row {job.next_row}")
+                try:
+                    run_import_job(job)
+                except Exception as e:
+                    fail_import_job(job, e)
+                    self.stderr.write(f"Import job {job.id}: {job.status} after error: {e}")
+                    continue
+                self.stdout.write(self.style.SUCCESS(
+                    f"Import job {job.id}: {job.rows_created} created, {job.rows_failed} failed"
+                ))
+        except KeyboardInterrupt:
+            pass
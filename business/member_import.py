@@ -0,0 +1,314 @@
+"""
+    Streaming CSV import of BusinessMember rows.
+
+    Rows are decoded incrementally from the uploaded file, validated in chunks
+    against reward rules prefetched with one query per chunk (only ids not seen
+    before), and inserted with bulk_create. Bad rows are reported by row number
+    instead of aborting the import. bulk_create sends no post_save signals, so
+    the daily rollups are updated here.
+
+    Expected columns: BizMbrBizId, BizMbrCardNo, BizMbrRuleId and optionally
+    id, BizMbrIsActive, BizMbrValidityEnd (ISO date/datetime).
+
+    Large files go through ImportJob instead: the upload is stored and
+    `manage.py run_import_jobs` imports it chunk by chunk in the background.
+"""
+
+import csv
+from collections import defaultdict
+from datetime import datetime, timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from business.models import BusinessMember, BusinessRewardRule, ImportJob
+from business import rollups
+from business.reward_engine import forget_card_rules
+from helpers.card_utils import invalidate_card_mappings
+
+
+class RowError(ValueError):
+    pass
+
+
+def iter_rows(binary_file, start_row=0, start_offset=0):
+    """
+    Yield (row_number, row, end_offset) from a binary CSV file without reading
+    it all into memory. row_number counts records the way a spreadsheet shows
+    them (the header is row 1) and end_offset is the byte offset just past the
+    row, so an interrupted import resumes at start_row/start_offset without
+    parsing the rows before it again.
+    """
+    offset = 0
+
+    def lines():
+        nonlocal offset
+        for line in iter(binary_file.readline, b""):
+            offset += len(line)
+            yield line.decode("utf-8")
+
+    reader = csv.reader(lines())
+    header = next(reader, None)
+    if not header:
+        return
+    header[0] = header[0].removeprefix("\ufeff")
+    if start_offset:
+        binary_file.seek(start_offset)
+        offset = start_offset
+    for row_number, values in enumerate(reader, start=start_row + 2):
+        if values:  # skip blank lines like csv.DictReader
+            yield row_number, dict(zip(header, values)), offset
+
+
+def _parse_int(row, field):
+    value = (row.get(field) or "").strip()
+    if not value:
+        raise RowError(f"{field} is required")
+    try:
+        return int(value)
+    except ValueError:
+        raise RowError(f"{field} must be an integer, got {value!r}")
+
+
+def _parse_validity_end(value):
+    value = (value or "").strip()
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise RowError(f"BizMbrValidityEnd must be an ISO date, got {value!r}")
+    return timezone.make_aware(parsed) if timezone.is_naive(parsed) else parsed
+
+
+def build_member(row, rules, business_id=None):
+    """
+    Validate one CSV row and return an unsaved BusinessMember. With business_id
+    set, BizMbrBizId defaults to it and rows or rules of another business are rejected.
+    """
+    rule_id = _parse_int(row, "BizMbrRuleId")
+    reward_rule = rules.get(rule_id)
+    if reward_rule is None:
+        raise RowError(f"Reward Rule with ID {rule_id} does not exist.")
+
+    row_business_id = business_id
+    if business_id is None or (row.get("BizMbrBizId") or "").strip():
+        row_business_id = _parse_int(row, "BizMbrBizId")
+    if business_id is not None:
+        if row_business_id != business_id:
+            raise RowError(f"BizMbrBizId {row_business_id} does not match the import's business {business_id}.")
+        if reward_rule.RewardRuleBizId != business_id:
+            raise RowError(f"Reward Rule with ID {rule_id} does not belong to this business.")
+
+    member = BusinessMember(
+        BizMbrBizId=row_business_id,
+        BizMbrCardNo=_parse_int(row, "BizMbrCardNo"),
+        BizMbrRuleId=reward_rule,
+        BizMbrIsActive=(row.get("BizMbrIsActive") or "False").strip().lower() in ["true", "1"],
+        BizMbrValidityEnd=_parse_validity_end(row.get("BizMbrValidityEnd")),
+    )
+    if (row.get("id") or "").strip():
+        member.id = _parse_int(row, "id")
+    return member
+
+
+def _insert(members):
+    """Insert a validated chunk; returns (created, [(member, error)])."""
+    try:
+        with transaction.atomic():
+            BusinessMember.objects.bulk_create(members)
+        return members, []
+    except IntegrityError:
+        pass
+
+    # Something in the chunk conflicts (e.g. an explicit id that already exists):
+    # retry row by row so only the offending rows are reported.
+    created, failed = [], []
+    for member in members:
+        try:
+            with transaction.atomic():
+                BusinessMember.objects.bulk_create([member])
+            created.append(member)
+        except IntegrityError as e:
+            member.pk = None
+            failed.append((member, str(e)))
+    return created, failed
+
+
+def import_chunk(rows, rules, business_id=None):
+    """
+    Validate and insert one chunk of (row_number, row) pairs.
+
+    `rules` is a {rule_id: BusinessRewardRule} dict shared across chunks; rule ids
+    not seen yet are loaded with one query. Returns (created_members, errors).
+    """
+    wanted = set()
+    for _, row in rows:
+        try:
+            wanted.add(int(row.get("BizMbrRuleId")))
+        except (TypeError, ValueError):
+            pass
+    missing = wanted - rules.keys()
+    if missing:
+        rules.update(BusinessRewardRule.objects.in_bulk(missing))
+        for rule_id in missing - rules.keys():
+            rules[rule_id] = None  # remember ids that do not exist
+
+    members, row_numbers, errors = [], [], []
+    for row_number, row in rows:
+        try:
+            members.append(build_member(row, rules, business_id))
+            row_numbers.append(row_number)
+        except RowError as e:
+            errors.append({"row": row_number, "error": str(e)})
+
+    if not members:
+        return [], errors
+
+    with transaction.atomic():
+        created, failed = _insert(members)
+        rollups.record_members_added(created)
+        cards = defaultdict(list)
+        for member in created:
+            cards[member.BizMbrBizId].append(member.BizMbrCardNo)
+        for member_business_id, business_cards in cards.items():
+            forget_card_rules(member_business_id, business_cards)
+        # Cached "not associated" answers for the new members' cards
+        created_cards = [member.BizMbrCardNo for member in created]
+        transaction.on_commit(lambda: invalidate_card_mappings(created_cards))
+
+    row_of = {id(member): number for member, number in zip(members, row_numbers)}
+    for member, error in failed:
+        errors.append({"row": row_of[id(member)], "error": error})
+    errors.sort(key=lambda error: error["row"])
+    return created, errors
+
+
+def import_members(binary_file, chunk_size=None, max_errors=None):
+    """
+    Import a whole CSV file. Returns a report:
+    {"rows": n, "created": n, "failed": n, "member_ids": [...], "errors": [{"row", "error"}]}
+    with at most max_errors error entries.
+    """
+    chunk_size = chunk_size or settings.MEMBER_IMPORT_CHUNK_SIZE
+    max_errors = settings.MEMBER_IMPORT_MAX_ERRORS if max_errors is None else max_errors
+
+    report = {"rows": 0, "created": 0, "failed": 0, "member_ids": [], "errors": []}
+    rules = {}
+    rows = iter_rows(binary_file)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        created, errors = import_chunk([(number, row) for number, row, _ in chunk], rules)
+
+        report["rows"] += len(chunk)
+        report["created"] += len(created)
+        report["failed"] += len(errors)
+        report["member_ids"].extend(member.id for member in created)
+        report["errors"].extend(errors[:max(0, max_errors - len(report["errors"]))])
+    return report
+
+
+def claim_next_job():
+    """Lock the oldest queued job (or a running one whose worker died) and mark it running."""
+    now = timezone.now()
+    with transaction.atomic():
+        job = (
+            ImportJob.objects.select_for_update(skip_locked=True)
+            .filter(Q(status="queued") | Q(status="running", locked_until__lt=now))
+            .order_by("created_at")
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = "running"
+        job.attempts += 1
+        job.started_at = job.started_at or now
+        job.locked_until = now + timedelta(seconds=settings.IMPORT_JOB_LEASE_SECONDS)
+        job.save(update_fields=["status", "attempts", "started_at", "locked_until"])
+    return job
+
+
+def run_import_job(job, chunk_size=None):
+    """
+    Import job.file from job.next_row onwards. Each chunk's rows and the job's
+    progress are committed in one transaction, which also renews the lease.
+    The file is parsed once: a resumed job seeks to job.next_offset, and
+    total_rows is only known when the import completes.
+    """
+    chunk_size = chunk_size or settings.MEMBER_IMPORT_CHUNK_SIZE
+    progress_fields = ["next_row", "next_offset", "rows_created", "rows_failed", "errors", "locked_until"]
+
+    with job.file.open("rb") as binary_file:
+        rows = iter_rows(binary_file, start_row=job.next_row, start_offset=job.next_offset)
+
+        rules = {}
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            last_row_number, _, end_offset = chunk[-1]
+            with transaction.atomic():
+                created, errors = import_chunk(
+                    [(number, row) for number, row, _ in chunk], rules, business_id=job.business_id
+                )
+                job.next_row = last_row_number - 1
+                job.next_offset = end_offset
+                job.rows_created += len(created)
+                job.rows_failed += len(errors)
+                job.errors = job.errors + errors[:max(0, settings.MEMBER_IMPORT_MAX_ERRORS - len(job.errors))]
+                job.locked_until = timezone.now() + timedelta(seconds=settings.IMPORT_JOB_LEASE_SECONDS)
+                job.save(update_fields=progress_fields)
+
+    job.status = "completed"
+    job.total_rows = job.next_row
+    job.finished_at = timezone.now()
+    job.locked_until = None
+    job.save(update_fields=["status", "total_rows", "finished_at", "locked_until"])
+
+
+def fail_import_job(job, error):
+    """Re-queue the job to resume from its last committed chunk, or fail it after IMPORT_JOB_MAX_ATTEMPTS."""
+    job.status = "failed" if job.attempts >= settings.IMPORT_JOB_MAX_ATTEMPTS else "queued"
+    job.last_error = str(error)[:2000]
+    job.locked_until = None
+    if job.status == "failed":
+        job.finished_at = timezone.now()
+    job.save(update_fields=["status", "last_error", "locked_until", "finished_at"])
+
+
+def job_progress(job):
+    """
+    Progress numbers for the status endpoint: throughput in rows/second and ETA
+    in seconds, estimated from the share of the file's bytes imported so far.
+    """
+    elapsed = None
+    if job.started_at:
+        elapsed = ((job.finished_at or timezone.now()) - job.started_at).total_seconds()
+
+    throughput = round(job.next_row / elapsed, 1) if elapsed else None
+    eta = None
+    if job.status in ("queued", "running") and elapsed and job.next_offset and job.file_size:
+        eta = int(max(job.file_size - job.next_offset, 0) * elapsed / job.next_offset)
+    if job.status == "completed":
+        eta = 0
+
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "file_name": job.original_name,
+        "total_rows": job.total_rows,
+        "rows_processed": job.next_row,
+        "rows_created": job.rows_created,
+        "rows_failed": job.rows_failed,
+        "throughput_rows_per_second": throughput,
+        "eta_seconds": eta,
+        "errors": job.errors,
+        "last_error": job.last_error,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
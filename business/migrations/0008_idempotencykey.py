@@ -0,0 +1,31 @@
+# Generated by Django 5.2 on 2026-10-17 15:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('business', '0007_alter_cumulativepoints_currentbalance_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IdempotencyKey',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=255)),
+                ('endpoint', models.CharField(max_length=100)),
+                ('business_id', models.IntegerField(default=0, verbose_name='Business ID')),
+                ('request_hash', models.CharField(max_length=64)),
+                ('response_status', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('response_content', models.BinaryField(blank=True, null=True)),
+                ('response_content_type', models.CharField(blank=True, default='', max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('expires_at', models.DateTimeField()),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('key', 'endpoint', 'business_id'), name='unique_idempotency_key')],
+            },
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2 on 2026-10-17 15:36
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def merge_duplicate_cumulative_points(apps, schema_editor):
+    """Fold duplicate (card, business) balance rows into the oldest one before adding the unique constraint."""
+    CumulativePoints = apps.get_model('business', 'CumulativePoints')
+    duplicates = (
+        CumulativePoints.objects.values('CmltvPntsMbrCardNo', 'CmltvPntsBizId')
+        .annotate(rows=Count('id'))
+        .filter(rows__gt=1)
+    )
+    for duplicate in duplicates:
+        rows = list(CumulativePoints.objects.filter(
+            CmltvPntsMbrCardNo=duplicate['CmltvPntsMbrCardNo'],
+            CmltvPntsBizId=duplicate['CmltvPntsBizId'],
+        ).order_by('id'))
+        keep, extra = rows[0], rows[1:]
+        for row in extra:
+            keep.LifetimeEarnedPoints += row.LifetimeEarnedPoints
+            keep.LifetimeRedeemedPoints += row.LifetimeRedeemedPoints
+            keep.CurrentBalance += row.CurrentBalance
+            keep.TotalPurchaseAmount += row.TotalPurchaseAmount
+        keep.save()
+        CumulativePoints.objects.filter(id__in=[row.id for row in extra]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('business', '0008_idempotencykey'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='businessmember',
+            index=models.Index(fields=['BizMbrBizId', 'BizMbrCardNo', 'BizMbrIsActive'], name='bizmbr_biz_card_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='businessmember',
+            index=models.Index(fields=['BizMbrCardNo'], name='bizmbr_card_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cardtransaction',
+            index=models.Index(fields=['CrdTrnsBizId', '-id'], name='crdtrns_biz_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cardtransaction',
+            index=models.Index(fields=['CrdTrnsBizId', '-CrdTrnsTransactionDate', '-id'], name='crdtrns_biz_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cardtransaction',
+            index=models.Index(fields=['CrdTrnsBizId', 'CrdTrnsCardNumber', '-CrdTrnsTransactionDate', '-id'], name='crdtrns_biz_card_date_idx'),
+        ),
+        migrations.RunPython(merge_duplicate_cumulative_points, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='cumulativepoints',
+            constraint=models.UniqueConstraint(fields=('CmltvPntsMbrCardNo', 'CmltvPntsBizId'), name='unique_cumulative_points_card_biz'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2 on 2026-10-17 15:38
+
+from django.db import migrations, models
+
+
+def backfill_rollups(apps, schema_editor):
+    """Fill the rollups from the existing ledger, as `manage.py rebuild_business_rollups` does."""
+    from business.rollups import compute_rollups_from_ledger
+
+    BusinessDailyRollup = apps.get_model('business', 'BusinessDailyRollup')
+    expected = compute_rollups_from_ledger(
+        transaction_model=apps.get_model('business', 'CardTransaction'),
+        member_model=apps.get_model('business', 'BusinessMember'),
+    )
+    BusinessDailyRollup.objects.bulk_create(
+        [
+            BusinessDailyRollup(RollupBizId=business_id, RollupDate=day, **values)
+            for (business_id, day), values in expected.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('business', '0009_hot_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BusinessDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('RollupBizId', models.IntegerField(verbose_name='Business ID')),
+                ('RollupDate', models.DateField(verbose_name='Day')),
+                ('EarnCount', models.IntegerField(default=0)),
+                ('EarnAmount', models.FloatField(default=0)),
+                ('EarnPoints', models.FloatField(default=0)),
+                ('RedeemCount', models.IntegerField(default=0)),
+                ('RedeemAmount', models.FloatField(default=0)),
+                ('RedeemPoints', models.FloatField(default=0)),
+                ('NewMembers', models.IntegerField(default=0)),
+                ('RemovedMembers', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Business Daily Rollup',
+                'verbose_name_plural': 'Business Daily Rollups',
+                'constraints': [models.UniqueConstraint(fields=('RollupBizId', 'RollupDate'), name='unique_business_daily_rollup')],
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
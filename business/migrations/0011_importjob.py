@@ -0,0 +1,39 @@
+# Generated by Django 5.2 on 2026-10-17 15:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('business', '0010_businessdailyrollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('business_id', models.IntegerField(verbose_name='Business ID')),
+                ('file', models.FileField(upload_to='member_imports/')),
+                ('original_name', models.CharField(blank=True, default='', max_length=255)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='queued', max_length=10)),
+                ('total_rows', models.PositiveIntegerField(blank=True, null=True)),
+                ('next_row', models.PositiveIntegerField(default=0)),
+                ('next_offset', models.PositiveBigIntegerField(default=0)),
+                ('file_size', models.PositiveBigIntegerField(default=0)),
+                ('rows_created', models.PositiveIntegerField(default=0)),
+                ('rows_failed', models.PositiveIntegerField(default=0)),
+                ('errors', models.JSONField(blank=True, default=list)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('locked_until', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'locked_until'], name='importjob_status_lock_idx')],
+            },
+        ),
+    ]
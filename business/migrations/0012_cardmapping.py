@@ -0,0 +1,29 @@
+# Generated by Django 5.2 on 2026-10-17 15:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('business', '0011_importjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CardMapping',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('card_number', models.BigIntegerField(verbose_name='Scanned Card Number')),
+                ('business_id', models.IntegerField(verbose_name='Business ID')),
+                ('primary_card_number', models.BigIntegerField(blank=True, null=True)),
+                ('secondary_card_number', models.BigIntegerField(blank=True, null=True)),
+                ('is_mapped', models.BooleanField(default=False)),
+                ('message', models.CharField(blank=True, default='', max_length=255)),
+                ('refreshed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('card_number', 'business_id'), name='unique_card_mapping')],
+            },
+        ),
+    ]
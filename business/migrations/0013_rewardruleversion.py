@@ -0,0 +1,22 @@
+# Generated by Django 5.2 on 2026-10-17 16:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('business', '0012_cardmapping'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RewardRuleVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('business_id', models.IntegerField(unique=True, verbose_name='Business ID')),
+                ('version', models.PositiveBigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
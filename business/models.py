@@ -57,6 +57,10 @@ class BusinessMember(models.Model):
     class Meta:
         verbose_name = "Business Member"
         verbose_name_plural = "Business Members"
+        indexes = [
+            models.Index(fields=["BizMbrBizId", "BizMbrCardNo", "BizMbrIsActive"], name="bizmbr_biz_card_active_idx"),
+            models.Index(fields=["BizMbrCardNo"], name="bizmbr_card_idx"),
+        ]
         
 class MemberJoinRequest(models.Model):
     business = models.IntegerField(verbose_name="Business ID")
@@ -91,6 +95,11 @@ class CardTransaction(models.Model):
     class Meta:
         verbose_name = "Card Transaction"
         verbose_name_plural = "Card Transactions"
+        indexes = [
+            models.Index(fields=["CrdTrnsBizId", "-id"], name="crdtrns_biz_id_idx"),
+            models.Index(fields=["CrdTrnsBizId", "-CrdTrnsTransactionDate", "-id"], name="crdtrns_biz_date_idx"),
+            models.Index(fields=["CrdTrnsBizId", "CrdTrnsCardNumber", "-CrdTrnsTransactionDate", "-id"], name="crdtrns_biz_card_date_idx"),
+        ]
         
 
 
@@ -117,4 +126,142 @@ class CumulativePoints(models.Model):
     LastUpdated = models.DateTimeField(auto_now=True)
 
     def __str__(self):
-        return f"{self.CmltvPntsMbrCardNo} - {self.CmltvPntsBizId} - Balance: {self.CurrentBalance}"
\ No newline at end of file
+        return f"{self.CmltvPntsMbrCardNo} - {self.CmltvPntsBizId} - Balance: {self.CurrentBalance}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["CmltvPntsMbrCardNo", "CmltvPntsBizId"], name="unique_cumulative_points_card_biz"),
+        ]
+
+
+class IdempotencyKey(models.Model):
+    """
+    Stored response for a POST made with an Idempotency-Key header, so that a
+    retried request is answered with the original result instead of being
+    applied twice.
+    """
+    key = models.CharField(max_length=255)
+    endpoint = models.CharField(max_length=100)
+    business_id = models.IntegerField(default=0, verbose_name="Business ID")
+    request_hash = models.CharField(max_length=64)
+    response_status = models.PositiveSmallIntegerField(null=True, blank=True)
+    # The rendered response, replayed byte for byte
+    response_content = models.BinaryField(null=True, blank=True)
+    response_content_type = models.CharField(max_length=100, blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.endpoint} - {self.key}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["key", "endpoint", "business_id"], name="unique_idempotency_key"),
+        ]
+
+
+
+class BusinessDailyRollup(models.Model):
+    """
+    Per-business, per-day totals maintained incrementally as transactions and
+    members are written (see business/rollups.py). BusinessReportsAPIView reads
+    from here instead of aggregating the raw ledger.
+    """
+    RollupBizId = models.IntegerField(verbose_name="Business ID")
+    RollupDate = models.DateField(verbose_name="Day")
+    # Signed: a delete may be recorded on a day whose earlier writes predate the rollups
+    EarnCount = models.IntegerField(default=0)
+    EarnAmount = models.FloatField(default=0)
+    EarnPoints = models.FloatField(default=0)
+    RedeemCount = models.IntegerField(default=0)
+    RedeemAmount = models.FloatField(default=0)
+    RedeemPoints = models.FloatField(default=0)
+    NewMembers = models.IntegerField(default=0)
+    RemovedMembers = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.RollupBizId} - {self.RollupDate}"
+
+    class Meta:
+        verbose_name = "Business Daily Rollup"
+        verbose_name_plural = "Business Daily Rollups"
+        constraints = [
+            models.UniqueConstraint(fields=["RollupBizId", "RollupDate"], name="unique_business_daily_rollup"),
+        ]
+
+
+class ImportJob(models.Model):
+    """
+    Background CSV member import (see business/member_import.py and
+    `manage.py run_import_jobs`). Progress is committed together with each
+    chunk of rows, so a crashed import resumes from next_row, read from byte
+    next_offset of the file. total_rows is set once the import completes.
+    """
+    STATUS_CHOICES = [
+        ("queued", "Queued"),
+        ("running", "Running"),
+        ("completed", "Completed"),
+        ("failed", "Failed"),
+    ]
+    business_id = models.IntegerField(verbose_name="Business ID")
+    file = models.FileField(upload_to="member_imports/")
+    original_name = models.CharField(max_length=255, blank=True, default="")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="queued")
+    total_rows = models.PositiveIntegerField(null=True, blank=True)
+    next_row = models.PositiveIntegerField(default=0)
+    next_offset = models.PositiveBigIntegerField(default=0)
+    file_size = models.PositiveBigIntegerField(default=0)
+    rows_created = models.PositiveIntegerField(default=0)
+    rows_failed = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True, default="")
+    locked_until = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"ImportJob {self.id} - {self.business_id} ({self.status})"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "locked_until"], name="importjob_status_lock_idx"),
+        ]
+
+
+class CardMapping(models.Model):
+    """
+    Last known auth-server resolution of a scanned card for a business
+    (helpers/card_utils.py). Used to keep resolving cards while the auth server
+    is unreachable and refreshed by `manage.py refresh_card_mappings`.
+    """
+    card_number = models.BigIntegerField(verbose_name="Scanned Card Number")
+    business_id = models.IntegerField(verbose_name="Business ID")
+    primary_card_number = models.BigIntegerField(null=True, blank=True)
+    secondary_card_number = models.BigIntegerField(null=True, blank=True)
+    is_mapped = models.BooleanField(default=False)
+    message = models.CharField(max_length=255, blank=True, default="")
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.card_number} -> {self.primary_card_number} ({self.business_id})"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["card_number", "business_id"], name="unique_card_mapping"),
+        ]
+
+
+class RewardRuleVersion(models.Model):
+    """
+    Per-business counter bumped in the same transaction as every reward rule
+    change (business/reward_engine.py). Workers compare it with the version of
+    their compiled rules to know when to reload them.
+    """
+    business_id = models.IntegerField(unique=True, verbose_name="Business ID")
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.business_id} v{self.version}"
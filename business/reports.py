@@ -0,0 +1,138 @@
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, DateField, Q, Sum
+from django.db.models.functions import Trunc
+from django.utils import timezone
+from business.models import CardTransaction
+
+
+BUCKETS = ("day", "week", "month")
+
+
+def bucket_start(day, bucket):
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())  # ISO weeks start on Monday, like TruncWeek
+    if bucket == "month":
+        return day.replace(day=1)
+    return day
+
+
+def next_bucket(start, bucket):
+    if bucket == "week":
+        return start + timedelta(days=7)
+    if bucket == "month":
+        return (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return start + timedelta(days=1)
+
+
+def bucket_starts(start_date, end_date, bucket):
+    current = bucket_start(start_date, bucket)
+    while current <= end_date:
+        yield current
+        current = next_bucket(current, bucket)
+
+
+def bucket_count(start_date, end_date, bucket):
+    """Number of buckets bucket_starts() yields, computed without walking them."""
+    first, last = bucket_start(start_date, bucket), bucket_start(end_date, bucket)
+    if bucket == "week":
+        return (last - first).days // 7 + 1
+    if bucket == "month":
+        return (last.year - first.year) * 12 + last.month - first.month + 1
+    return (last - first).days + 1
+
+
+def _empty_point(period_start):
+    return {
+        "period_start": period_start.isoformat(),
+        "earn_count": 0,
+        "earn_amount": 0,
+        "earn_points": 0,
+        "redeem_count": 0,
+        "redeem_points": 0,
+        "active_cards": 0,
+        "average_basket": 0,
+    }
+
+
+def _cache_key(business_id, bucket, period_start):
+    return f"report_series:{business_id}:{bucket}:{period_start.isoformat()}"
+
+
+def invalidate_report_series(business_id, day):
+    """Drop the cached day, week and month buckets containing day, e.g. after a transaction is corrected or deleted."""
+    cache.delete_many([_cache_key(business_id, bucket, bucket_start(day, bucket)) for bucket in BUCKETS])
+
+
+def _query_series(business_id, bucket, start_date, end_date):
+    """One grouped query over the ledger for [start_date, end_date] (whole buckets)."""
+    start_dt = timezone.make_aware(datetime.combine(start_date, time.min))
+    end_dt = timezone.make_aware(datetime.combine(end_date + timedelta(days=1), time.min))
+    earned = Q(CrdTrnsTransactionType="Points_Earned")
+    redeemed = ~earned
+
+    rows = (
+        CardTransaction.objects.filter(
+            CrdTrnsBizId=business_id,
+            CrdTrnsTransactionDate__gte=start_dt,
+            CrdTrnsTransactionDate__lt=end_dt,
+        )
+        .annotate(period=Trunc("CrdTrnsTransactionDate", bucket, output_field=DateField()))
+        .values("period")
+        .annotate(
+            earn_count=Count("id", filter=earned),
+            earn_amount=Sum("CrdTrnsPurchaseAmount", filter=earned),
+            earn_points=Sum("CrdTrnsPoint", filter=earned),
+            redeem_count=Count("id", filter=redeemed),
+            redeem_points=Sum("CrdTrnsPoint", filter=redeemed),
+            active_cards=Count("CrdTrnsCardNumber", distinct=True),
+        )
+    )
+
+    points = {}
+    for row in rows:
+        point = _empty_point(row["period"])
+        for field in ["earn_count", "earn_amount", "earn_points", "redeem_count", "redeem_points", "active_cards"]:
+            point[field] = row[field] or 0
+        point["average_basket"] = round(point["earn_amount"] / point["earn_count"], 2) if point["earn_count"] else 0
+        points[row["period"]] = point
+    return points
+
+
+def get_report_series(business_id, start_date, end_date, bucket="day"):
+    """
+    Earn/redeem totals, distinct active cards and average basket per bucket.
+
+    The range is widened to whole buckets. Buckets that ended before today only
+    change when a past transaction is corrected or deleted (business/signals.py
+    drops them then), so they are cached and only the missing or still-open
+    buckets are recomputed, with a single grouped query.
+    """
+    today = timezone.localdate()
+    starts = list(bucket_starts(start_date, end_date, bucket))
+    closed = [start for start in starts if next_bucket(start, bucket) <= today]
+
+    cached = cache.get_many([_cache_key(business_id, bucket, start) for start in closed])
+    series = {}
+    for start in closed:
+        point = cached.get(_cache_key(business_id, bucket, start))
+        if point is not None:
+            series[start] = point
+
+    missing = [start for start in starts if start not in series]
+    if missing:
+        query_end = next_bucket(starts[-1], bucket) - timedelta(days=1)
+        computed = _query_series(business_id, bucket, missing[0], query_end)
+
+        to_cache = {}
+        for start in missing:
+            point = computed.get(start, _empty_point(start))
+            series[start] = point
+            if start in closed:
+                to_cache[_cache_key(business_id, bucket, start)] = point
+        if to_cache:
+            cache.set_many(to_cache, settings.REPORT_SERIES_CACHE_TTL)
+
+    return [series[start] for start in starts]
@@ -0,0 +1,189 @@
+"""
+    Reward rule engine.
+
+    Each business's BusinessRewardRule rows are loaded once per process into
+    immutable Rule objects and reused until the business's rule version changes.
+    The version is a RewardRuleVersion row, bumped in the same DB transaction
+    whenever a rule is saved or deleted (business/signals.py) or changed with
+    queryset.update() (call bump_rules_version). Workers cache the version for
+    REWARD_RULES_VERSION_CACHE_TTL seconds, so with a per-process cache
+    (LocMem) every worker reloads within that time, and with a shared cache
+    right after the change.
+
+    get_card_rule also caches which rule a card's active membership points at,
+    until the membership changes (forget_card_rules, called from
+    business/signals.py and after bulk imports).
+
+    compute_points / compute_points_batch are pure functions of a Rule and the
+    purchase amount(s) and never touch the database.
+"""
+
+import threading
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from business.models import BusinessMember, BusinessRewardRule, RewardRuleVersion
+
+
+@dataclass(frozen=True)
+class Rule:
+    id: int
+    business_id: int
+    rule_type: str
+    value: float
+    notional_value: float
+    milestone: int  # None when the rule has no milestone
+    is_default: bool
+
+
+_rules = {}  # {business_id: (version, {rule_id: Rule})}
+_rules_lock = threading.Lock()
+
+
+def compile_rule(reward_rule):
+    return Rule(
+        id=reward_rule.id,
+        business_id=reward_rule.RewardRuleBizId,
+        rule_type=reward_rule.RewardRuleType,
+        value=float(reward_rule.RewardRuleValue or 1),
+        notional_value=float(reward_rule.RewardRuleNotionalValue or 1),
+        milestone=reward_rule.RewardRuleMilestone,
+        is_default=reward_rule.RewardRuleIsDefault,
+    )
+
+
+def compute_points(rule, amount):
+    """Points earned for a purchase of `amount` under `rule` (0 without a rule)."""
+    if rule is None:
+        return 0
+    if rule.rule_type in ("percentage", "purchase_value_to_points"):
+        return int((amount * rule.value) / 100)
+    if rule.rule_type == "flat":
+        return int(rule.value)
+    return 0
+
+
+def compute_points_batch(rules, amounts):
+    """compute_points over parallel sequences of rules and amounts."""
+    return [compute_points(rule, amount) for rule, amount in zip(rules, amounts)]
+
+
+def redeem_points_required(rule, points):
+    """Points debited for a redemption: the rule's milestone if it has one, else `points`."""
+    if rule is not None and (rule.milestone or 0) > 0:
+        return rule.milestone
+    return points
+
+
+def milestone_progress(milestone, earned, current_balance):
+    """Milestone fields shown to members; all zero/False when there is no milestone."""
+    milestone = milestone or 0
+    achieved = points_to_next = 0
+    is_eligible = False
+    if milestone > 0:
+        achieved = earned // milestone
+        points_to_next = milestone - (earned % milestone)
+        is_eligible = current_balance >= milestone
+    return {
+        "MilestoneValue": milestone,
+        "AchievedMilestones": achieved,
+        "PointsToNextMilestone": points_to_next if current_balance < milestone else 0,
+        "IsEligible": is_eligible,
+    }
+
+
+def _version_key(business_id):
+    return f"reward_rules_version:{business_id}"
+
+
+def _current_version(business_id):
+    key = _version_key(business_id)
+    version = cache.get(key)
+    if version is None:
+        version = (
+            RewardRuleVersion.objects.filter(business_id=business_id)
+            .values_list("version", flat=True)
+            .first()
+        ) or 0
+        cache.set(key, version, settings.REWARD_RULES_VERSION_CACHE_TTL)
+    return version
+
+
+def bump_rules_version(business_id):
+    """
+    Invalidate every process's compiled rules for the business. The counter is
+    bumped in the current DB transaction, so it commits together with the rule
+    change; the cached copies are dropped once it has committed.
+    """
+    versions = RewardRuleVersion.objects.filter(business_id=business_id)
+    if not versions.update(version=F("version") + 1):
+        RewardRuleVersion.objects.bulk_create([RewardRuleVersion(business_id=business_id)], ignore_conflicts=True)
+        versions.update(version=F("version") + 1)
+
+    def forget():
+        cache.delete(_version_key(business_id))
+        with _rules_lock:
+            _rules.pop(business_id, None)
+
+    transaction.on_commit(forget)
+
+
+def get_rules(business_id):
+    """{rule_id: Rule} for the business; one cache read, plus a query when the version is re-read or changed."""
+    version = _current_version(business_id)
+    cached = _rules.get(business_id)
+    if cached and cached[0] == version:
+        return cached[1]
+
+    rules = {
+        reward_rule.id: compile_rule(reward_rule)
+        for reward_rule in BusinessRewardRule.objects.filter(RewardRuleBizId=business_id)
+    }
+    with _rules_lock:
+        _rules[business_id] = (version, rules)
+    return rules
+
+
+def get_rule(business_id, rule_id):
+    """The compiled rule `rule_id`, normally from the business's cached rules."""
+    if rule_id is None:
+        return None
+    rule = get_rules(business_id).get(rule_id)
+    if rule is None:
+        # A member can point at a rule of another business; load it directly
+        reward_rule = BusinessRewardRule.objects.filter(id=rule_id).first()
+        rule = compile_rule(reward_rule) if reward_rule else None
+    return rule
+
+
+def _card_rule_key(business_id, card_number):
+    return f"reward_card_rule:{business_id}:{card_number}"
+
+
+def get_card_rule(business_id, card_number):
+    """
+    The compiled rule of the card's active membership in the business, or None.
+    The membership's rule id is cached (0 for no active membership), so a repeat
+    scan of the card runs no query.
+    """
+    key = _card_rule_key(business_id, card_number)
+    rule_id = cache.get(key)
+    if rule_id is None:
+        rule_id = (
+            BusinessMember.objects.filter(BizMbrCardNo=card_number, BizMbrBizId=business_id, BizMbrIsActive=True)
+            .order_by("id")
+            .values_list("BizMbrRuleId", flat=True)
+            .first()
+        ) or 0
+        cache.set(key, rule_id, settings.REWARD_CARD_RULE_CACHE_TTL)
+    return get_rule(business_id, rule_id or None)
+
+
+def forget_card_rules(business_id, card_numbers):
+    """Drop the cached membership rule ids of the cards once the current transaction commits."""
+    keys = [_card_rule_key(business_id, card_number) for card_number in card_numbers]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
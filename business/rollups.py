@@ -0,0 +1,134 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from business.models import BusinessDailyRollup, BusinessMember, CardTransaction
+
+
+ROLLUP_FIELDS = [
+    "EarnCount", "EarnAmount", "EarnPoints",
+    "RedeemCount", "RedeemAmount", "RedeemPoints",
+    "NewMembers", "RemovedMembers",
+]
+
+
+def _day(value):
+    return timezone.localdate(value) if timezone.is_aware(value) else value.date()
+
+
+def _bump(business_id, day, deltas):
+    """
+    Add deltas to the (business, day) row once the surrounding transaction
+    commits. Every ledger write for a business touches the same row, so the
+    update runs after commit and holds the row lock for one statement only,
+    instead of serializing the writers' transactions on it. A crash between
+    the commit and the update loses that delta; `manage.py
+    rebuild_business_rollups` recomputes the rows from the ledger.
+    """
+    deltas = {field: value for field, value in deltas.items() if value}
+    if deltas:
+        transaction.on_commit(lambda: _apply(business_id, day, deltas))
+
+
+def _apply(business_id, day, deltas):
+    rows = BusinessDailyRollup.objects.filter(RollupBizId=business_id, RollupDate=day)
+    updates = {field: F(field) + value for field, value in deltas.items()}
+    if rows.update(**updates):
+        return
+    # First write of the day: create the row with zeros, then apply the deltas
+    # like any other writer (a decrement may arrive before any increment)
+    BusinessDailyRollup.objects.bulk_create(
+        [BusinessDailyRollup(RollupBizId=business_id, RollupDate=day)],
+        ignore_conflicts=True,
+    )
+    rows.update(**updates)
+
+
+def _transaction_deltas(card_transaction, sign=1):
+    points = card_transaction.CrdTrnsPoint or 0
+    amount = card_transaction.CrdTrnsPurchaseAmount or 0
+    if card_transaction.CrdTrnsTransactionType == "Points_Earned":
+        return {"EarnCount": sign, "EarnAmount": sign * amount, "EarnPoints": sign * points}
+    return {"RedeemCount": sign, "RedeemAmount": sign * amount, "RedeemPoints": sign * points}
+
+
+def record_transactions(card_transactions, sign=1):
+    """Fold saved CardTransactions into the rollups, one update per (business, day)."""
+    grouped = defaultdict(lambda: defaultdict(float))
+    for card_transaction in card_transactions:
+        key = (card_transaction.CrdTrnsBizId, _day(card_transaction.CrdTrnsTransactionDate))
+        for field, value in _transaction_deltas(card_transaction, sign).items():
+            grouped[key][field] += value
+
+    for (business_id, day), deltas in grouped.items():
+        _bump(business_id, day, {
+            field: int(value) if field.endswith("Count") else value
+            for field, value in deltas.items()
+        })
+
+
+def record_members_added(members):
+    """Count newly created BusinessMembers, one update per (business, day)."""
+    grouped = defaultdict(int)
+    for member in members:
+        grouped[(member.BizMbrBizId, _day(member.BizMbrIssueDate or timezone.now()))] += 1
+    for (business_id, day), count in grouped.items():
+        _bump(business_id, day, {"NewMembers": count})
+
+
+def record_member_removed(member):
+    _bump(member.BizMbrBizId, _day(timezone.now()), {"RemovedMembers": 1})
+
+
+def get_business_totals(business_id):
+    """Lifetime totals for a business, summed from its daily rollup rows."""
+    totals = BusinessDailyRollup.objects.filter(RollupBizId=business_id).aggregate(
+        **{field: Sum(field) for field in ROLLUP_FIELDS}
+    )
+    return {field: totals[field] or 0 for field in ROLLUP_FIELDS}
+
+
+def compute_rollups_from_ledger(business_id=None, transaction_model=CardTransaction, member_model=BusinessMember):
+    """
+    Recompute {(business_id, day): {field: value}} from the raw CardTransaction
+    and BusinessMember tables with grouped queries. Migrations pass their
+    historical models.
+    """
+    transactions = transaction_model.objects.all()
+    members = member_model.objects.all()
+    if business_id is not None:
+        transactions = transactions.filter(CrdTrnsBizId=business_id)
+        members = members.filter(BizMbrBizId=business_id)
+
+    earned = Q(CrdTrnsTransactionType="Points_Earned")
+    redeemed = ~earned
+    rollups = defaultdict(lambda: dict.fromkeys(ROLLUP_FIELDS, 0))
+
+    transaction_rows = (
+        transactions.annotate(day=TruncDate("CrdTrnsTransactionDate"))
+        .values("CrdTrnsBizId", "day")
+        .annotate(
+            EarnCount=Count("id", filter=earned),
+            EarnAmount=Sum("CrdTrnsPurchaseAmount", filter=earned),
+            EarnPoints=Sum("CrdTrnsPoint", filter=earned),
+            RedeemCount=Count("id", filter=redeemed),
+            RedeemAmount=Sum("CrdTrnsPurchaseAmount", filter=redeemed),
+            RedeemPoints=Sum("CrdTrnsPoint", filter=redeemed),
+        )
+    )
+    for row in transaction_rows:
+        rollup = rollups[(row["CrdTrnsBizId"], row["day"])]
+        for field in ["EarnCount", "EarnAmount", "EarnPoints", "RedeemCount", "RedeemAmount", "RedeemPoints"]:
+            rollup[field] = row[field] or 0
+
+    member_rows = (
+        members.annotate(day=TruncDate("BizMbrIssueDate"))
+        .values("BizMbrBizId", "day")
+        .annotate(NewMembers=Count("id"))
+    )
+    for row in member_rows:
+        rollups[(row["BizMbrBizId"], row["day"])]["NewMembers"] = row["NewMembers"]
+
+    return dict(rollups)
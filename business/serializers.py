@@ -7,6 +7,7 @@ from rest_framework.exceptions import AuthenticationFailed
 import requests
 from django.conf import settings
 from .authentication import SSOBusinessTokenAuthentication
+from helpers.fast_serializers import ValuesSerializer
 
 
 class BusinessMemberSerializer(serializers.ModelSerializer):
@@ -164,6 +165,20 @@ class CardTransactionSerializer(serializers.ModelSerializer):
         model = CardTransaction
         fields = "__all__"
 
+
+# Same output from .values() rows, for list endpoints (helpers/fast_serializers.py)
+card_transaction_rows = ValuesSerializer(CardTransactionSerializer)
+
+
+class CardTransactionBatchItemSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = CardTransaction
+        fields = ["CrdTrnsCardNumber", "CrdTrnsPurchaseAmount", "CrdTrnsTransactionType"]
+
+
+class CardTransactionBatchSerializer(serializers.Serializer):
+    transactions = CardTransactionBatchItemSerializer(many=True)
+
     
 
 
@@ -207,4 +222,7 @@ class MemberByCardSerializer(serializers.Serializer):
 class MemberJoinRequestSerializer(serializers.ModelSerializer):
     class Meta:
         model = MemberJoinRequest
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
+
+
+member_join_request_rows = ValuesSerializer(MemberJoinRequestSerializer)
@@ -0,0 +1,60 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from business.models import BusinessMember, BusinessRewardRule, CardTransaction
+from business import rollups
+from business.reports import invalidate_report_series
+from business.reward_engine import bump_rules_version, forget_card_rules
+
+
+# Keep the daily rollups in step with single-row writes.
+# Bulk writes (bulk_create) do not send signals and call business.rollups directly.
+
+@receiver(post_save, sender=CardTransaction)
+def rollup_transaction_saved(sender, instance, created, **kwargs):
+    if created:
+        rollups.record_transactions([instance])
+
+
+@receiver(post_delete, sender=CardTransaction)
+def rollup_transaction_deleted(sender, instance, **kwargs):
+    rollups.record_transactions([instance], sign=-1)
+
+
+# Cached report series buckets (business/reports.py) of a corrected or deleted transaction.
+# New transactions are dated now and land in the still-open buckets, which are not cached.
+
+@receiver(post_save, sender=CardTransaction)
+@receiver(post_delete, sender=CardTransaction)
+def report_series_transaction_changed(sender, instance, created=False, **kwargs):
+    if not created:
+        business_id, day = instance.CrdTrnsBizId, timezone.localdate(instance.CrdTrnsTransactionDate)
+        transaction.on_commit(lambda: invalidate_report_series(business_id, day))
+
+
+@receiver(post_save, sender=BusinessMember)
+def rollup_member_saved(sender, instance, created, **kwargs):
+    if created:
+        rollups.record_members_added([instance])
+
+
+@receiver(post_delete, sender=BusinessMember)
+def rollup_member_deleted(sender, instance, **kwargs):
+    rollups.record_member_removed(instance)
+
+
+# Compiled reward rules are cached per process (business/reward_engine.py)
+
+@receiver(post_save, sender=BusinessRewardRule)
+@receiver(post_delete, sender=BusinessRewardRule)
+def reward_rule_changed(sender, instance, **kwargs):
+    bump_rules_version(instance.RewardRuleBizId)
+
+
+# Cached membership rule ids (business/reward_engine.get_card_rule)
+
+@receiver(post_save, sender=BusinessMember)
+@receiver(post_delete, sender=BusinessMember)
+def card_rule_changed(sender, instance, **kwargs):
+    forget_card_rules(instance.BizMbrBizId, [instance.BizMbrCardNo])
@@ -1,3 +1,1787 @@
-from django.test import TestCase
+import base64
+import gzip
+import json
+import shutil
+import socket
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO, StringIO
+from threading import Barrier, Event, Thread
 
-# Create your tests here.
+from unittest import skipUnless
+from unittest.mock import patch
+
+import requests
+import urllib3.util.connection
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.http import HttpResponse
+from django.utils import timezone
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings, skipUnlessDBFeature
+from rest_framework.exceptions import AuthenticationFailed, NotFound
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory, force_authenticate
+from rest_framework.views import APIView
+from business.authentication import AuthenticatedBusinessUser, SSOBusinessTokenAuthentication
+from business.card_resolution import resolve_card
+from business.idempotency import idempotent
+from business.ledger import BalanceNotFound, InsufficientPoints, apply_earn, apply_redeem
+from business.member_import import (
+    claim_next_job, fail_import_job, import_chunk, import_members, job_progress, run_import_job,
+)
+from business.models import (
+    BusinessDailyRollup, BusinessMember, BusinessRewardRule, CardMapping, CardTransaction, CumulativePoints,
+    IdempotencyKey, ImportJob, MemberJoinRequest, RewardRuleVersion,
+)
+from business.reports import bucket_count, bucket_starts
+from business.reward_engine import get_card_rule, get_rules, redeem_points_required
+from business.rollups import get_business_totals
+from business.serializers import BusinessRewardRuleSerializer, CardTransactionSerializer, MemberJoinRequestSerializer
+from business.views import (
+    ApproveJoinRequestView, BusinessMemberListCreateApi, BusinessReportSeriesAPIView, CardTransactionApi,
+    CardTransactionBatchApi, CheckMemberActive, MemberRequestListApi, NewMemberEnrollAPI, RedeemPointsAPIView,
+)
+from helpers import http_client, remote_cache
+from helpers.card_utils import _store_mapping, get_primary_card_from_remote, invalidate_card_mappings
+from helpers.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+from helpers.exceptions import AuthServiceUnavailable
+from helpers.fast_serializers import ValuesSerializer
+from helpers.middleware import ResponseCompressionMiddleware
+from helpers.pagination import KeysetPagination, cursor_paginate
+from helpers.renderers import FastJSONRenderer, fast_json_enabled, has_non_finite
+from helpers.singleflight import SingleFlight
+from helpers.token_cache import revoke_token
+from helpers.utils import get_member_details_by_card, get_member_details_by_cards, queue_sms
+from member.authentication import AuthenticatedMemberUser
+from member.serializers import CumulativePointsSerializer
+from member.views import MemberTransactionHistoryApi
+from notifications.models import EmailOutbox, SmsOutbox
+from notifications.outbox import PermanentDeliveryError, claim_batch, process_batch
+
+
+BUSINESS_ID = 501
+CARD_NUMBER = 100000000501
+
+
+def _run_concurrently(workers, func, calls):
+    """Run func(i) for i in range(calls) on `workers` threads released at the same time."""
+    barrier = Barrier(workers)
+
+    def worker(indexes):
+        barrier.wait()
+        try:
+            return [func(i) for i in indexes]
+        finally:
+            connection.close()  # each thread has its own connection
+
+    chunks = [range(start, calls, workers) for start in range(workers)]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return [result for results in executor.map(worker, chunks) for result in results]
+
+
+def _earn(points, amount):
+    return apply_earn(CardTransaction(
+        CrdTrnsBizId=BUSINESS_ID,
+        CrdTrnsCardNumber=CARD_NUMBER,
+        CrdTrnsPurchaseAmount=amount,
+        CrdTrnsPoint=points,
+        CrdTrnsTransactionType="Points_Earned",
+    ))
+
+
+def _redeem(points):
+    try:
+        apply_redeem(CardTransaction(
+            CrdTrnsBizId=BUSINESS_ID,
+            CrdTrnsCardNumber=CARD_NUMBER,
+            CrdTrnsPurchaseAmount=0,
+            CrdTrnsPoint=points,
+            CrdTrnsTransactionType="Points_Redeemed",
+        ), points)
+        return True
+    except (InsufficientPoints, BalanceNotFound):
+        return False
+
+
+@skipUnlessDBFeature("test_db_allows_multiple_connections")
+class LedgerConcurrencyTests(TransactionTestCase):
+    """Many terminals writing to one card's balance at the same time (business/ledger.py)."""
+
+    workers = 8
+    calls = 200
+
+    def balance(self):
+        return CumulativePoints.objects.get(CmltvPntsMbrCardNo=CARD_NUMBER, CmltvPntsBizId=BUSINESS_ID)
+
+    def test_concurrent_earns_match_serial_sums(self):
+        _run_concurrently(self.workers, lambda i: _earn(i % 7 + 1, i + 0.5), self.calls)
+
+        balance = self.balance()
+        expected_points = sum(i % 7 + 1 for i in range(self.calls))
+        self.assertEqual(balance.LifetimeEarnedPoints, expected_points)
+        self.assertEqual(balance.CurrentBalance, expected_points)
+        self.assertAlmostEqual(balance.TotalPurchaseAmount, sum(i + 0.5 for i in range(self.calls)))
+        self.assertEqual(CardTransaction.objects.filter(CrdTrnsCardNumber=CARD_NUMBER).count(), self.calls)
+
+    def test_concurrent_redeems_never_overdraw(self):
+        _earn(100, 1000)
+
+        redeemed = _run_concurrently(self.workers, lambda i: _redeem(7), self.calls)
+
+        balance = self.balance()
+        self.assertEqual(sum(redeemed), 100 // 7)
+        self.assertEqual(balance.CurrentBalance, 100 - 7 * sum(redeemed))
+        self.assertEqual(balance.LifetimeRedeemedPoints, 7 * sum(redeemed))
+        self.assertGreaterEqual(balance.CurrentBalance, 0)
+        self.assertEqual(
+            CardTransaction.objects.filter(CrdTrnsCardNumber=CARD_NUMBER, CrdTrnsTransactionType="Points_Redeemed").count(),
+            sum(redeemed),
+        )
+
+    def test_mixed_earns_and_redeems_match_serial_sums(self):
+        def step(i):
+            if i % 2:
+                return ("redeem", _redeem(5))
+            _earn(3, 30)
+            return ("earn", True)
+
+        results = _run_concurrently(self.workers, step, self.calls)
+
+        earned = 3 * sum(1 for kind, _ in results if kind == "earn")
+        redeemed = 5 * sum(1 for kind, ok in results if kind == "redeem" and ok)
+        balance = self.balance()
+        self.assertEqual(balance.LifetimeEarnedPoints, earned)
+        self.assertEqual(balance.LifetimeRedeemedPoints, redeemed)
+        self.assertEqual(balance.CurrentBalance, earned - redeemed)
+        self.assertGreaterEqual(balance.CurrentBalance, 0)
+
+
+def _render(response):
+    """Render a view's response as the request handler would (replays are already plain HttpResponses)."""
+    if hasattr(response, "render"):
+        response.render()
+    return response
+
+
+class _IdempotentView(APIView):
+    authentication_classes = []
+    permission_classes = []
+    calls = 0
+
+    @idempotent("test")
+    def post(self, request):
+        type(self).calls += 1
+        return Response({
+            "amount": Decimal("12.50"),
+            "recorded_at": datetime(2026, 10, 17, 9, 30, 0, 123456, tzinfo=dt_timezone.utc),
+            "note": None,
+            "points": 5,
+        }, status=request.data.get("status", 201))
+
+
+class IdempotencyKeyTests(TestCase):
+    """Retries with the same Idempotency-Key are answered from the stored response (business/idempotency.py)."""
+
+    def setUp(self):
+        _IdempotentView.calls = 0
+
+    def post(self, body, key="key-1"):
+        request = APIRequestFactory().post("/test/", body, format="json", HTTP_IDEMPOTENCY_KEY=key)
+        return _render(_IdempotentView.as_view()(request))
+
+    def test_replay_returns_stored_status_and_bytes(self):
+        first = self.post({"card": 1})
+        replay = self.post({"card": 1})
+
+        self.assertEqual(_IdempotentView.calls, 1)
+        self.assertEqual((replay.status_code, replay.content), (201, first.content))
+        self.assertEqual(replay["Content-Type"], first["Content-Type"])
+        self.assertEqual(replay["Idempotent-Replayed"], "true")
+        self.assertEqual(json.loads(replay.content)["amount"], 12.5)  # a number, as first rendered
+
+    def test_same_key_different_body_conflicts(self):
+        self.post({"card": 1})
+
+        response = self.post({"card": 2})
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(_IdempotentView.calls, 1)
+
+    def test_server_error_and_conflict_not_stored(self):
+        for status_code in (503, 409):
+            with self.subTest(status=status_code):
+                response = self.post({"status": status_code}, key=f"key-{status_code}")
+
+                self.assertEqual(response.status_code, status_code)
+                self.assertFalse(IdempotencyKey.objects.filter(key=f"key-{status_code}").exists())
+
+        self.assertEqual(self.post({"status": 503}, key="key-503").status_code, 503)
+        self.assertEqual(_IdempotentView.calls, 3)  # the retry ran the view again
+
+    def test_requests_without_key_not_recorded(self):
+        for _ in range(2):
+            _IdempotentView.as_view()(APIRequestFactory().post("/test/", {"card": 1}, format="json"))
+
+        self.assertEqual(_IdempotentView.calls, 2)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+
+@skipUnlessDBFeature("test_db_allows_multiple_connections")
+class IdempotentRedeemConcurrencyTests(TransactionTestCase):
+    """Terminals retrying one redemption at the same time debit it once."""
+
+    def test_concurrent_requests_with_one_key_debit_once(self):
+        rule = BusinessRewardRule.objects.create(
+            RewardRuleBizId=BUSINESS_ID, RewardRuleType="flat", RewardRuleNotionalValue=1, RewardRuleMilestone=10,
+        )
+        BusinessMember.objects.create(BizMbrBizId=BUSINESS_ID, BizMbrCardNo=CARD_NUMBER, BizMbrRuleId=rule, BizMbrIsActive=True)
+        _earn(100, 1000)
+
+        def redeem(_):
+            request = APIRequestFactory().post(
+                "/reward/redeem/", {"card_number": CARD_NUMBER, "business_id": BUSINESS_ID}, format="json",
+                HTTP_IDEMPOTENCY_KEY="redeem-1",
+            )
+            response = _render(RedeemPointsAPIView.as_view()(request))
+            return response.status_code, response.content
+
+        with patch("business.views.get_member_details_by_card", return_value={}):
+            responses = _run_concurrently(8, redeem, 16)
+
+        self.assertEqual(len(set(responses)), 1)  # every caller got the same response
+        self.assertEqual(responses[0][0], 201)
+        self.assertEqual(CardTransaction.objects.filter(CrdTrnsTransactionType="Points_Redeemed").count(), 1)
+        balance = CumulativePoints.objects.get(CmltvPntsMbrCardNo=CARD_NUMBER, CmltvPntsBizId=BUSINESS_ID)
+        self.assertEqual((balance.CurrentBalance, balance.LifetimeRedeemedPoints), (90, 10))
+
+
+@skipUnlessDBFeature("test_db_allows_multiple_connections")
+class SmsDedupTests(TransactionTestCase):
+    """Repeated taps queue one SMS, even when they arrive together (helpers.utils.queue_sms)."""
+
+    def test_concurrent_requests_queue_one_sms(self):
+        payload = {"mobile_number": "9000000501", "message": "Your OTP is 1234"}
+
+        queued = _run_concurrently(8, lambda i: queue_sms(payload, BUSINESS_ID).pk, 16)
+
+        self.assertEqual(SmsOutbox.objects.count(), 1)
+        self.assertEqual(set(queued), {SmsOutbox.objects.get().pk})
+
+    def test_dead_message_can_be_queued_again(self):
+        payload = {"mobile_number": "9000000501", "message": "Your OTP is 1234"}
+        first = queue_sms(payload, BUSINESS_ID)
+        SmsOutbox.objects.filter(pk=first.pk).update(status=SmsOutbox.STATUS_DEAD)
+
+        self.assertNotEqual(queue_sms(payload, BUSINESS_ID).pk, first.pk)
+
+
+class NewMemberEnrollTests(TestCase):
+    """The signup link is only queued; the response says so and names the outbox row to poll."""
+
+    def test_signup_link_is_reported_as_queued(self):
+        request = APIRequestFactory().post(
+            "/reward/new-member/", {"full_name": "New Member", "mobile_number": "9000000502"}, format="json"
+        )
+        force_authenticate(request, user=AuthenticatedBusinessUser(id=1, business_id=BUSINESS_ID, business_name="Test"))
+        with patch("business.views.get_member_details_by_mobile", return_value={}):
+            response = NewMemberEnrollAPI.as_view()(request)
+
+        sms = SmsOutbox.objects.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["message"], "Signup link queued for SMS")
+        self.assertEqual((response.data["sms_message_id"], response.data["sms_status"]), (sms.pk, SmsOutbox.STATUS_PENDING))
+
+
+def _queue_email(**fields):
+    return EmailOutbox.objects.create(subject="Hi", template_name="email.html", recipient="a@example.com", **fields)
+
+
+@skipUnlessDBFeature("has_select_for_update_skip_locked")
+class OutboxClaimTests(TransactionTestCase):
+    """Workers claim disjoint batches and skip rows another worker holds (notifications/outbox.py)."""
+
+    def test_locked_rows_are_skipped(self):
+        messages = [_queue_email() for _ in range(3)]
+        locked, release = Event(), Event()
+
+        def hold_first_row():
+            try:
+                with transaction.atomic():
+                    list(EmailOutbox.objects.select_for_update().filter(pk=messages[0].pk))
+                    locked.set()
+                    release.wait(10)
+            finally:
+                connection.close()
+
+        holder = Thread(target=hold_first_row)
+        holder.start()
+        try:
+            self.assertTrue(locked.wait(10))
+            claimed = claim_batch(EmailOutbox, batch_size=10, lease_seconds=60)
+        finally:
+            release.set()
+            holder.join()
+
+        self.assertEqual([m.pk for m in claimed], [m.pk for m in messages[1:]])
+        self.assertEqual(EmailOutbox.objects.get(pk=messages[0].pk).status, EmailOutbox.STATUS_PENDING)
+
+    @skipUnlessDBFeature("test_db_allows_multiple_connections")
+    def test_concurrent_workers_claim_disjoint_batches(self):
+        for _ in range(20):
+            _queue_email()
+
+        batches = _run_concurrently(4, lambda i: [m.pk for m in claim_batch(EmailOutbox, 5, 60)], 4)
+
+        claimed = [pk for batch in batches for pk in batch]
+        self.assertEqual(len(claimed), 20)
+        self.assertEqual(len(set(claimed)), 20)
+        self.assertFalse(EmailOutbox.objects.exclude(status=EmailOutbox.STATUS_SENDING).exists())
+
+
+class _InlineExecutor:
+    """Runs process_batch deliveries on the calling thread."""
+
+    def map(self, fn, items):
+        return map(fn, items)
+
+
+class OutboxRetryTests(TransactionTestCase):
+    """Failed deliveries back off exponentially and are dead-lettered after max attempts."""
+
+    retry_base = 60
+
+    def process(self, deliver, max_attempts=3):
+        return process_batch(
+            EmailOutbox, deliver, _InlineExecutor(), batch_size=10, lease_seconds=60,
+            max_attempts=max_attempts, retry_base_seconds=self.retry_base,
+        )
+
+    @staticmethod
+    def make_due(message):
+        EmailOutbox.objects.filter(pk=message.pk).update(next_attempt_at=timezone.now())
+
+    @staticmethod
+    def fail(message):
+        raise requests.ConnectionError("SES unreachable")
+
+    def assert_backoff(self, message, low, high, before):
+        message.refresh_from_db()
+        self.assertEqual(message.status, EmailOutbox.STATUS_PENDING)
+        self.assertGreaterEqual(message.next_attempt_at, before + timedelta(seconds=low))
+        self.assertLessEqual(message.next_attempt_at, timezone.now() + timedelta(seconds=high))
+
+    def test_delivered_message_is_sent(self):
+        message = _queue_email()
+
+        self.assertEqual(self.process(lambda m: None), {"sent": 1, "retried": 0, "dead": 0})
+        message.refresh_from_db()
+        self.assertEqual(message.status, EmailOutbox.STATUS_SENT)
+        self.assertIsNotNone(message.sent_at)
+
+    def test_failed_delivery_backs_off_exponentially(self):
+        message = _queue_email()
+
+        before = timezone.now()
+        self.assertEqual(self.process(self.fail), {"sent": 0, "retried": 1, "dead": 0})
+        self.assert_backoff(message, self.retry_base / 2, self.retry_base, before)
+        self.assertEqual(message.attempts, 1)
+        self.assertIn("SES unreachable", message.last_error)
+
+        # not due again until the backoff has passed
+        self.assertEqual(self.process(self.fail), {"sent": 0, "retried": 0, "dead": 0})
+
+        self.make_due(message)
+        before = timezone.now()
+        self.process(self.fail)
+        self.assert_backoff(message, self.retry_base, self.retry_base * 2, before)
+        self.assertEqual(message.attempts, 2)
+
+    def test_dead_lettered_after_max_attempts(self):
+        message = _queue_email()
+
+        self.process(self.fail, max_attempts=2)
+        self.make_due(message)
+        self.assertEqual(self.process(self.fail, max_attempts=2), {"sent": 0, "retried": 0, "dead": 1})
+
+        message.refresh_from_db()
+        self.assertEqual(message.status, EmailOutbox.STATUS_DEAD)
+        self.assertEqual(message.attempts, 2)
+        self.make_due(message)
+        self.assertEqual(claim_batch(EmailOutbox, 10, 60), [])
+
+    def test_permanent_error_is_dead_lettered_at_once(self):
+        message = _queue_email()
+
+        def reject(message):
+            raise PermanentDeliveryError("Template error")
+
+        self.assertEqual(self.process(reject), {"sent": 0, "retried": 0, "dead": 1})
+        message.refresh_from_db()
+        self.assertEqual((message.status, message.attempts), (EmailOutbox.STATUS_DEAD, 1))
+
+    def test_expired_lease_is_claimed_again(self):
+        message = _queue_email(status=EmailOutbox.STATUS_SENDING, attempts=1)
+        leased = _queue_email(status=EmailOutbox.STATUS_SENDING, attempts=1,
+                              next_attempt_at=timezone.now() + timedelta(minutes=5))
+
+        claimed = claim_batch(EmailOutbox, 10, 60)
+
+        self.assertEqual([m.pk for m in claimed], [message.pk])
+        self.assertEqual(claimed[0].attempts, 2)
+        leased.refresh_from_db()
+        self.assertEqual(leased.attempts, 1)
+
+
+@override_settings(SSO_TOKEN_CACHE_TTL=300, SSO_TOKEN_NEGATIVE_CACHE_TTL=30)
+class SSOTokenCacheTests(SimpleTestCase):
+    """Token verification results are reused until they expire or are revoked (helpers/token_cache.py)."""
+
+    def setUp(self):
+        cache.clear()
+        self.now = 1000.0
+        clock = patch("django.core.cache.backends.locmem.time.time", side_effect=lambda: self.now)
+        clock.start()
+        self.addCleanup(clock.stop)
+
+    def authenticate(self, token="token-1"):
+        request = RequestFactory().get("/reward/transactions/", HTTP_AUTHORIZATION=f"Token {token}")
+        return SSOBusinessTokenAuthentication().authenticate(request)
+
+    def verify_response(self, status_code):
+        payload = {"user_id": 7, "business_id": BUSINESS_ID, "business_name": "Test"}
+        return patch("business.authentication.auth_post", return_value=type("Response", (), {
+            "status_code": status_code, "json": lambda self: payload,
+        })())
+
+    def test_accepted_token_cached_until_ttl(self):
+        with self.verify_response(200) as auth_post:
+            self.authenticate()
+            user, _ = self.authenticate()
+            self.assertEqual((user.id, user.business_id), (7, BUSINESS_ID))
+            self.assertEqual(auth_post.call_count, 1)
+
+            self.now += 301
+            self.authenticate()
+            self.assertEqual(auth_post.call_count, 2)
+
+    def test_rejected_token_cached_for_negative_ttl(self):
+        with self.verify_response(401) as auth_post:
+            for _ in range(2):
+                with self.assertRaises(AuthenticationFailed):
+                    self.authenticate()
+            self.assertEqual(auth_post.call_count, 1)
+
+            self.now += 31
+            with self.assertRaises(AuthenticationFailed):
+                self.authenticate()
+            self.assertEqual(auth_post.call_count, 2)
+
+    def test_server_errors_not_cached(self):
+        with self.verify_response(502) as auth_post:
+            for _ in range(2):
+                with self.assertRaises(AuthServiceUnavailable):
+                    self.authenticate()
+            self.assertEqual(auth_post.call_count, 2)
+
+    def test_revoked_token_verified_again(self):
+        with self.verify_response(200) as auth_post:
+            self.authenticate()
+            revoke_token("token-1")
+            self.authenticate()
+            self.assertEqual(auth_post.call_count, 2)
+
+
+class CardTransactionBatchTests(TestCase):
+    """Batch ingestion: per-item results, all-or-nothing redeems, no remote call or email under the row locks."""
+
+    def setUp(self):
+        cache.clear()
+        # Committed callbacks drop this process's compiled rules from earlier tests
+        with self.captureOnCommitCallbacks(execute=True):
+            # 10% of the purchase amount per earn; a redeem debits the 30-point milestone
+            rule = BusinessRewardRule.objects.create(
+                RewardRuleBizId=BUSINESS_ID, RewardRuleType="percentage", RewardRuleNotionalValue=1, RewardRuleValue=10,
+                RewardRuleMilestone=30,
+            )
+            BusinessMember.objects.create(
+                BizMbrBizId=BUSINESS_ID, BizMbrCardNo=CARD_NUMBER + 1, BizMbrRuleId=rule, BizMbrIsActive=True,
+            )
+        CumulativePoints.objects.create(
+            CmltvPntsMbrCardNo=CARD_NUMBER + 1, CmltvPntsBizId=BUSINESS_ID, LifetimeEarnedPoints=20, CurrentBalance=20,
+            TotalPurchaseAmount=200, LifetimeRedeemedPoints=0,
+        )
+
+    @staticmethod
+    def item(transaction_type, amount, card_number=CARD_NUMBER + 1):
+        return {"CrdTrnsCardNumber": card_number, "CrdTrnsPurchaseAmount": amount, "CrdTrnsTransactionType": transaction_type}
+
+    def balance(self):
+        return CumulativePoints.objects.filter(CmltvPntsMbrCardNo=CARD_NUMBER + 1).values(
+            "CurrentBalance", "LifetimeEarnedPoints", "LifetimeRedeemedPoints", "TotalPurchaseAmount"
+        ).get()
+
+    def post_batch(self, items):
+        request = APIRequestFactory().post(
+            "/reward/transactions/batch/", {"transactions": items}, format="json", HTTP_IDEMPOTENCY_KEY="batch-1"
+        )
+        force_authenticate(request, user=AuthenticatedBusinessUser(id=1, business_id=BUSINESS_ID, business_name="Test"))
+        return CardTransactionBatchApi.as_view()(request)
+
+    def test_lookup_before_ledger_write_and_emails_after_commit(self):
+        def lookup(card_numbers):
+            self.assertFalse(CardTransaction.objects.exists())  # nothing written or locked yet
+            return {CARD_NUMBER: {"full_name": "Member", "email": "member@example.com"}}
+
+        items = [
+            {"CrdTrnsCardNumber": CARD_NUMBER, "CrdTrnsPurchaseAmount": 100, "CrdTrnsTransactionType": "Points_Earned"},
+            {"CrdTrnsCardNumber": CARD_NUMBER, "CrdTrnsPurchaseAmount": 50, "CrdTrnsTransactionType": "Points_Earned"},
+        ]
+        with patch("business.views.get_member_details_by_cards", side_effect=lookup) as get_members:
+            with self.captureOnCommitCallbacks() as callbacks:
+                response = self.post_batch(items)
+                self.assertFalse(EmailOutbox.objects.exists())
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["accepted"], 2)
+        get_members.assert_called_once_with({CARD_NUMBER})
+        for callback in callbacks:
+            callback()
+        self.assertEqual(EmailOutbox.objects.filter(recipient="member@example.com").count(), 2)
+
+    def test_result_per_item_in_request_order(self):
+        items = [
+            self.item("Points_Earned", 100),
+            {"CrdTrnsCardNumber": CARD_NUMBER + 1, "CrdTrnsTransactionType": "Points_Earned"},
+            self.item("Points_Redeemed", 0),
+        ]
+        with patch("business.views.get_member_details_by_cards", return_value={}):
+            response = self.post_batch(items)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.data["accepted"], response.data["rejected"]), (2, 1))
+        results = response.data["results"]
+        self.assertEqual([result["index"] for result in results], [0, 1, 2])
+        self.assertEqual([result["success"] for result in results], [True, False, True])
+        self.assertIn("CrdTrnsPurchaseAmount", results[1]["error"])
+        saved = CardTransaction.objects.in_bulk([results[0]["transaction_id"], results[2]["transaction_id"]])
+        self.assertEqual(saved[results[0]["transaction_id"]].CrdTrnsTransactionType, "Points_Earned")
+        self.assertEqual(saved[results[2]["transaction_id"]].CrdTrnsTransactionType, "Points_Redeemed")
+        self.assertEqual(results[0]["points"], 10)
+
+    def test_same_card_items_apply_in_order(self):
+        # 20 + 10 = 30 covers the 30-point redeem only because the earn comes first
+        items = [self.item("Points_Earned", 100), self.item("Points_Redeemed", 0), self.item("Points_Earned", 200)]
+        with patch("business.views.get_member_details_by_cards", return_value={}):
+            response = self.post_batch(items)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([result["points"] for result in response.data["results"]], [10, 0, 20])
+        self.assertEqual(self.balance(), {
+            "CurrentBalance": 20, "LifetimeEarnedPoints": 50, "LifetimeRedeemedPoints": 30, "TotalPurchaseAmount": 500,
+        })
+
+    def test_uncovered_redeem_rejects_the_whole_batch(self):
+        before, rollups_before = self.balance(), list(BusinessDailyRollup.objects.values())
+        items = [
+            self.item("Points_Earned", 100, card_number=CARD_NUMBER),
+            self.item("Points_Earned", 100),
+            self.item("Points_Redeemed", 0),
+            self.item("Points_Redeemed", 0),  # 30 - 30 leaves nothing for a second redeem
+            self.item("Points_Earned", 500),
+        ]
+        with patch("business.views.get_member_details_by_cards", return_value={}):
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.post_batch(items)
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data["index"], 3)
+        self.assertFalse(CardTransaction.objects.exists())
+        self.assertFalse(CumulativePoints.objects.filter(CmltvPntsMbrCardNo=CARD_NUMBER).exists())
+        self.assertEqual(self.balance(), before)
+        self.assertEqual(list(BusinessDailyRollup.objects.values()), rollups_before)
+        self.assertFalse(EmailOutbox.objects.exists())
+
+    @override_settings(TRANSACTION_BATCH_MAX_ITEMS=2)
+    def test_batch_size_limit(self):
+        with patch("business.views.get_member_details_by_cards") as get_members:
+            response = self.post_batch([self.item("Points_Earned", 100)] * 3)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["error"], "At most 2 transactions per batch")
+        get_members.assert_not_called()
+        self.assertFalse(CardTransaction.objects.exists())
+
+    def test_all_items_invalid(self):
+        items = [self.item("Points_Earned", "not a number"), {"CrdTrnsPurchaseAmount": 100}]
+        with patch("business.views.get_member_details_by_cards") as get_members:
+            response = self.post_batch(items)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual((response.data["accepted"], response.data["rejected"]), (0, 2))
+        self.assertIn("CrdTrnsPurchaseAmount", response.data["results"][0]["error"])
+        self.assertEqual(set(response.data["results"][1]["error"]), {"CrdTrnsCardNumber", "CrdTrnsTransactionType"})
+        get_members.assert_not_called()
+        self.assertFalse(CardTransaction.objects.exists())
+
+
+class BusinessMemberListTests(TestCase):
+    """Business member list: one page by default, a capped bare list only with ?all=true."""
+
+    cards = (100000000511, 100000000512, 100000000513)
+
+    @classmethod
+    def setUpTestData(cls):
+        rule = BusinessRewardRule.objects.create(
+            RewardRuleBizId=BUSINESS_ID, RewardRuleType="flat", RewardRuleNotionalValue=1,
+        )
+        for card_number in cls.cards:
+            BusinessMember.objects.create(BizMbrBizId=BUSINESS_ID, BizMbrCardNo=card_number, BizMbrRuleId=rule)
+
+    def get(self, query=""):
+        request = APIRequestFactory().get(f"/reward/business-members/{query}")
+        force_authenticate(request, user=AuthenticatedBusinessUser(id=1, business_id=BUSINESS_ID, business_name="Test"))
+        details = {card_number: {"full_name": f"Member {card_number}"} for card_number in self.cards}
+        with patch("business.views.get_member_details_by_cards", side_effect=lambda cards: {card: details[card] for card in cards}) as lookup:
+            response = BusinessMemberListCreateApi.as_view()(request)
+        self.assertEqual(lookup.call_count, 1)  # one batched lookup, paged or not
+        return response
+
+    @override_settings(MEMBER_LIST_PAGE_SIZE=2)
+    def test_first_page_by_default(self):
+        response = self.get()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([member["BizMbrCardNo"] for member in response.data["data"]], list(self.cards[:2]))
+        self.assertEqual(response.data["data"][0]["full_name"], "Member 100000000511")
+        self.assertEqual(response.data["pagination_meta_data"]["total_items"], 3)
+
+    def test_page_size_parameter(self):
+        response = self.get("?page_size=1&page=2")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([member["BizMbrCardNo"] for member in response.data["data"]], [self.cards[1]])
+        self.assertEqual(response.data["pagination_meta_data"]["total_pages"], 3)
+
+    @override_settings(MEMBER_LIST_MAX_ITEMS=2)
+    def test_full_list_is_opt_in_and_capped(self):
+        response = self.get("?all=true")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(response.data, list)
+        self.assertEqual([member["BizMbrCardNo"] for member in response.data], list(self.cards[:2]))
+
+    def test_enrollment_during_auth_outage_is_503(self):
+        rule = BusinessRewardRule.objects.get(RewardRuleBizId=BUSINESS_ID)
+        rule.RewardRuleValidityPeriodYears = 1
+        rule.save()
+        request = APIRequestFactory().post(
+            "/reward/business-members/", {"BizMbrCardNo": CARD_NUMBER, "BizMbrRuleId": rule.pk}, format="json"
+        )
+        force_authenticate(request, user=AuthenticatedBusinessUser(id=1, business_id=BUSINESS_ID, business_name="Test"))
+        with patch("business.views.get_member_details_by_card", side_effect=AuthServiceUnavailable()):
+            response = BusinessMemberListCreateApi.as_view()(request)
+
+        self.assertEqual(response.status_code, 503)
+        self.assertFalse(BusinessMember.objects.filter(BizMbrCardNo=CARD_NUMBER).exists())
+
+
+def _csv(*lines):
+    return BytesIO(("\n".join(lines) + "\n").encode("utf-8"))
+
+
+class MemberImportTests(TestCase):
+    """CSV rows are inserted in chunks; bad rows are reported by row number (business/member_import.py)."""
+
+    header = "BizMbrBizId,BizMbrCardNo,BizMbrRuleId,BizMbrIsActive"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.rule = BusinessRewardRule.objects.create(
+            RewardRuleBizId=BUSINESS_ID, RewardRuleType="flat", RewardRuleNotionalValue=1,
+        )
+
+    def row(self, card_number, rule_id=None, business_id=BUSINESS_ID):
+        return f"{business_id},{card_number},{rule_id or self.rule.pk},true"
+
+    def test_clean_import(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            report = import_members(_csv(self.header, *(self.row(CARD_NUMBER + i) for i in range(5))), chunk_size=2)
+
+        self.assertEqual((report["rows"], report["created"], report["failed"]), (5, 5, 0))
+        members = BusinessMember.objects.filter(BizMbrBizId=BUSINESS_ID)
+        self.assertEqual(sorted(members.values_list("id", flat=True)), sorted(report["member_ids"]))
+        self.assertTrue(all(member.BizMbrIsActive for member in members))
+        self.assertEqual(get_business_totals(BUSINESS_ID)["NewMembers"], 5)
+
+    def test_bad_rows_reported_while_good_rows_commit(self):
+        report = import_members(_csv(
+            self.header,
+            self.row(CARD_NUMBER),
+            self.row("not-a-card"),
+            self.row(CARD_NUMBER + 1, rule_id=999999),
+            self.row(CARD_NUMBER + 2),
+        ), chunk_size=2)
+
+        self.assertEqual((report["rows"], report["created"], report["failed"]), (4, 2, 2))
+        self.assertEqual([error["row"] for error in report["errors"]], [3, 4])
+        self.assertIn("BizMbrCardNo", report["errors"][0]["error"])
+        self.assertIn("999999", report["errors"][1]["error"])
+        self.assertEqual(
+            set(BusinessMember.objects.values_list("BizMbrCardNo", flat=True)), {CARD_NUMBER, CARD_NUMBER + 2}
+        )
+
+    def test_conflicting_chunk_falls_back_to_row_by_row(self):
+        existing = BusinessMember.objects.create(BizMbrBizId=BUSINESS_ID, BizMbrCardNo=CARD_NUMBER, BizMbrRuleId=self.rule)
+
+        report = import_members(_csv(
+            "id," + self.header,
+            "," + self.row(CARD_NUMBER + 1),
+            f"{existing.pk}," + self.row(CARD_NUMBER + 2),
+            "," + self.row(CARD_NUMBER + 3),
+        ), chunk_size=10)
+
+        self.assertEqual((report["created"], report["failed"]), (2, 1))
+        self.assertEqual(report["errors"][0]["row"], 3)
+        self.assertEqual(
+            set(BusinessMember.objects.values_list("BizMbrCardNo", flat=True)),
+            {CARD_NUMBER, CARD_NUMBER + 1, CARD_NUMBER + 3},
+        )
+        self.assertEqual(BusinessMember.objects.get(pk=existing.pk).BizMbrCardNo, CARD_NUMBER)
+
+
+class ImportJobResumeTests(TestCase):
+    """A crashed job resumes at the next uncommitted row without parsing the file again."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.rule = BusinessRewardRule.objects.create(
+            RewardRuleBizId=BUSINESS_ID, RewardRuleType="flat", RewardRuleNotionalValue=1,
+        )
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+
+        rows = [f"{CARD_NUMBER + i},{self.rule.pk}" for i in range(7)]
+        rows[4] = f"{CARD_NUMBER + 4},999999"
+        content = ("BizMbrCardNo,BizMbrRuleId\n" + "\n".join(rows) + "\n").encode("utf-8")
+        self.job = ImportJob.objects.create(
+            business_id=BUSINESS_ID, file=ContentFile(content, name="members.csv"), file_size=len(content),
+        )
+
+    def test_resumes_from_next_row_after_crash(self):
+        chunks = []
+
+        def crash_on_third_chunk(rows, rules, business_id=None):
+            chunks.append([number for number, _ in rows])
+            if len(chunks) == 3:
+                raise RuntimeError("worker killed")
+            return import_chunk(rows, rules, business_id)
+
+        job = claim_next_job()
+        with patch("business.member_import.import_chunk", crash_on_third_chunk):
+            with self.assertRaises(RuntimeError):
+                run_import_job(job, chunk_size=2)
+        fail_import_job(job, "worker killed")
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.next_row, job.total_rows), ("queued", 4, None))
+        self.assertEqual(job_progress(job)["rows_processed"], 4)
+
+        job = claim_next_job()
+        with patch("business.member_import.import_chunk", crash_on_third_chunk):
+            run_import_job(job, chunk_size=2)
+
+        self.assertEqual(chunks, [[2, 3], [4, 5], [6, 7], [6, 7], [8]])
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.total_rows, job.rows_created, job.rows_failed), ("completed", 7, 6, 1))
+        self.assertEqual(job.next_offset, job.file_size)
+        self.assertEqual([error["row"] for error in job.errors], [6])
+        self.assertEqual(BusinessMember.objects.filter(BizMbrBizId=BUSINESS_ID).count(), 6)
+
+
+class RewardRuleVersionTests(TestCase):
+    """Compiled rules are reloaded after a change, also by workers that do not share the cache."""
+
+    def setUp(self):
+        cache.clear()
+
+    def create_rule(self, value):
+        return BusinessRewardRule.objects.create(
+            RewardRuleBizId=BUSINESS_ID, RewardRuleType="percentage", RewardRuleNotionalValue=1, RewardRuleValue=value,
+        )
+
+    def test_version_bumped_with_the_rule_change(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_rule(5)
+        self.assertEqual(RewardRuleVersion.objects.get(business_id=BUSINESS_ID).version, 1)
+
+    def test_reloaded_after_change_committed_elsewhere(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            rule = self.create_rule(5)
+        self.assertEqual(get_rules(BUSINESS_ID)[rule.id].value, 5)
+
+        # Another worker changes the rule; this worker's cache is not told about it
+        with self.captureOnCommitCallbacks(execute=False):
+            BusinessRewardRule.objects.filter(pk=rule.pk).update(RewardRuleValue=7)
+            RewardRuleVersion.objects.filter(business_id=BUSINESS_ID).update(version=2)
+        self.assertEqual(get_rules(BUSINESS_ID)[rule.id].value, 5)
+
+        cache.clear()  # REWARD_RULES_VERSION_CACHE_TTL passed
+        self.assertEqual(get_rules(BUSINESS_ID)[rule.id].value, 7)
+
+
+class CardRuleTests(TestCase):
+    """A card's membership rule is served from cache until the membership changes."""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_rule_without_milestone_keeps_none(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            rule = BusinessRewardRule.objects.create(
+                RewardRuleBizId=BUSINESS_ID, RewardRuleType="flat", RewardRuleNotionalValue=1, RewardRuleValue=5,
+            )
+
+        compiled = get_rules(BUSINESS_ID)[rule.id]
+        self.assertIsNone(compiled.milestone)
+        self.assertEqual(redeem_points_required(compiled, 40), 40)
+
+    def test_cached_until_membership_changes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            flat = BusinessRewardRule.objects.create(
+                RewardRuleBizId=BUSINESS_ID, RewardRuleType="flat", RewardRuleNotionalValue=1, RewardRuleValue=5,
+            )
+            member = BusinessMember.objects.create(
+                BizMbrBizId=BUSINESS_ID, BizMbrCardNo=CARD_NUMBER, BizMbrRuleId=flat, BizMbrIsActive=True,
+            )
+
+        self.assertEqual(get_card_rule(BUSINESS_ID, CARD_NUMBER).id, flat.id)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_card_rule(BUSINESS_ID, CARD_NUMBER).id, flat.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            member.BizMbrIsActive = False
+            member.save()
+        self.assertIsNone(get_card_rule(BUSINESS_ID, CARD_NUMBER))
+        with self.assertNumQueries(0):
+            self.assertIsNone(get_card_rule(BUSINESS_ID, CARD_NUMBER))
+
+    def test_imported_members_replace_cached_misses(self):
+        rule = BusinessRewardRule.objects.create(
+            RewardRuleBizId=BUSINESS_ID, RewardRuleType="flat", RewardRuleNotionalValue=1, RewardRuleValue=5,
+        )
+        self.assertIsNone(get_card_rule(BUSINESS_ID, CARD_NUMBER))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            import_members(_csv(MemberImportTests.header, f"{BUSINESS_ID},{CARD_NUMBER},{rule.pk},true"))
+
+        self.assertEqual(get_card_rule(BUSINESS_ID, CARD_NUMBER).id, rule.id)
+
+
+def _primary_card(primary_card_number=None, secondary_card_number=None):
+    """Stands in for helpers.card_utils.get_primary_card_from_remote."""
+    if primary_card_number is None:
+        result = {"success": False, "primary_card_number": None, "message": "Card is not associated with this business."}
+    else:
+        result = {"success": True, "primary_card_number": primary_card_number,
+                  "secondary_card_number": secondary_card_number, "message": ""}
+    return lambda card_number, business_id: result
+
+
+class CardResolutionTests(TestCase):
+    """resolve_card for active, inactive, unknown and foreign cards, and the scan view built on it."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.rule = BusinessRewardRule.objects.create(
+            RewardRuleBizId=BUSINESS_ID, RewardRuleType="flat", RewardRuleNotionalValue=1, RewardRuleMilestone=50,
+        )
+        cls.active = BusinessMember.objects.create(
+            BizMbrBizId=BUSINESS_ID, BizMbrCardNo=CARD_NUMBER, BizMbrRuleId=cls.rule, BizMbrIsActive=True,
+        )
+        cls.inactive = BusinessMember.objects.create(
+            BizMbrBizId=BUSINESS_ID, BizMbrCardNo=CARD_NUMBER + 1, BizMbrRuleId=cls.rule, BizMbrIsActive=False,
+        )
+        cls.foreign = BusinessMember.objects.create(
+            BizMbrBizId=BUSINESS_ID + 1, BizMbrCardNo=CARD_NUMBER + 2, BizMbrRuleId=cls.rule, BizMbrIsActive=True,
+        )
+        CumulativePoints.objects.create(
+            CmltvPntsMbrCardNo=CARD_NUMBER, CmltvPntsBizId=BUSINESS_ID, LifetimeEarnedPoints=30, CurrentBalance=30,
+            TotalPurchaseAmount=300, LifetimeRedeemedPoints=0,
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def resolve(self, scanned, remote, **kwargs):
+        with patch("business.card_resolution.get_primary_card_from_remote", remote):
+            return resolve_card(scanned, BUSINESS_ID, **kwargs)
+
+    def check(self, scanned, remote):
+        request = APIRequestFactory().get("/reward/check-member-active/", {"card_number": scanned})
+        force_authenticate(request, user=AuthenticatedBusinessUser(id=1, business_id=BUSINESS_ID, business_name="Test"))
+        with patch("business.card_resolution.get_primary_card_from_remote", remote):
+            return CheckMemberActive.as_view()(request).data
+
+    def test_active_secondary_card(self):
+        resolution = self.resolve("900", _primary_card(CARD_NUMBER, "900"), with_balance=True)
+
+        self.assertTrue(resolution.resolved)
+        self.assertEqual((resolution.primary_card_number, resolution.secondary_card_number), (CARD_NUMBER, "900"))
+        self.assertEqual(resolution.member, self.active)
+        self.assertEqual((resolution.rule.id, resolution.rule.milestone), (self.rule.id, 50))
+        self.assertEqual(resolution.balance.CurrentBalance, 30)
+        self.assertIsNone(resolution.other_business_id)
+        self.assertTrue(self.check("900", _primary_card(CARD_NUMBER, "900"))["success"])
+
+    def test_inactive_member(self):
+        resolution = self.resolve(str(CARD_NUMBER + 1), _primary_card(CARD_NUMBER + 1))
+
+        self.assertEqual(resolution.member, self.inactive)
+        self.assertEqual(self.check(str(CARD_NUMBER + 1), _primary_card(CARD_NUMBER + 1)), {
+            "success": False, "message": "Member is not active.", "BizMbrIsActive": False,
+        })
+
+    def test_unknown_card(self):
+        resolution = self.resolve("not-a-card", _primary_card(), with_balance=True)
+
+        self.assertFalse(resolution.resolved)
+        self.assertIsNone(resolution.local_card_number)
+        self.assertIsNone(resolution.member)
+        self.assertIsNone(resolution.balance)
+        self.assertEqual(self.check("not-a-card", _primary_card())["message"], "Card is not associated with this business.")
+
+    def test_card_of_another_business(self):
+        resolution = self.resolve(str(CARD_NUMBER + 2), _primary_card())
+
+        self.assertFalse(resolution.resolved)
+        self.assertIsNone(resolution.member)
+        self.assertIsNone(resolution.rule)
+        self.assertEqual(resolution.other_business_id, BUSINESS_ID + 1)
+        self.assertEqual(self.check(str(CARD_NUMBER + 2), _primary_card())["other_business_id"], BUSINESS_ID + 1)
+
+    def test_one_query_without_balance(self):
+        self.resolve(str(CARD_NUMBER), _primary_card(CARD_NUMBER))  # warm the compiled rules
+
+        with self.assertNumQueries(1):
+            self.resolve(str(CARD_NUMBER), _primary_card(CARD_NUMBER))
+
+
+class CardMappingStoreTests(TestCase):
+    """A cache miss only writes the CardMapping row when the resolution changed (helpers/card_utils.py)."""
+
+    result = {"success": True, "primary_card_number": CARD_NUMBER, "secondary_card_number": None, "message": ""}
+
+    def test_unchanged_mapping_is_read_only(self):
+        _store_mapping(CARD_NUMBER, BUSINESS_ID, self.result)
+
+        with self.assertNumQueries(1):
+            _store_mapping(CARD_NUMBER, BUSINESS_ID, self.result)
+
+    def test_changed_mapping_is_written(self):
+        _store_mapping(CARD_NUMBER, BUSINESS_ID, self.result)
+        _store_mapping(CARD_NUMBER, BUSINESS_ID, {"success": False, "primary_card_number": None, "message": "Card is not mapped."})
+
+        mapping = CardMapping.objects.get(card_number=CARD_NUMBER, business_id=BUSINESS_ID)
+        self.assertEqual((mapping.is_mapped, mapping.primary_card_number), (False, None))
+
+
+@patch("helpers.card_utils._fetch_primary_card")
+class CardMappingCacheTests(TestCase):
+    """Cached "not associated" answers are dropped once the card is enrolled (helpers/card_utils.py)."""
+
+    not_associated = {"success": False, "primary_card_number": None, "message": "Not associated."}
+
+    def setUp(self):
+        cache.clear()
+
+    def test_cached_lookup_is_one_round_trip(self, fetch):
+        fetch.return_value = self.not_associated
+        get_primary_card_from_remote(CARD_NUMBER, BUSINESS_ID)
+
+        with patch("helpers.card_utils.cache", wraps=cache) as spy, self.assertNumQueries(0):
+            self.assertEqual(get_primary_card_from_remote(CARD_NUMBER, BUSINESS_ID), self.not_associated)
+        self.assertEqual(spy.get_many.call_count, 1)
+        self.assertEqual(spy.get.call_count, 0)
+        self.assertEqual(fetch.call_count, 1)
+
+    def test_approved_join_request_drops_cached_miss(self, fetch):
+        fetch.return_value = self.not_associated
+        get_primary_card_from_remote(CARD_NUMBER, BUSINESS_ID)
+        join_request = MemberJoinRequest.objects.create(business=BUSINESS_ID, card_number=CARD_NUMBER)
+
+        request = APIRequestFactory().post(
+            f"/reward/member/join-requests/approve/{join_request.pk}/", {"is_approved": True}, format="json"
+        )
+        force_authenticate(request, user=AuthenticatedBusinessUser(id=1, business_id=BUSINESS_ID, business_name="Test"))
+        with self.captureOnCommitCallbacks(execute=True):
+            ApproveJoinRequestView.as_view()(request, request_id=join_request.pk)
+
+        fetch.return_value = {"success": True, "primary_card_number": CARD_NUMBER, "secondary_card_number": None, "message": ""}
+        self.assertTrue(get_primary_card_from_remote(CARD_NUMBER, BUSINESS_ID)["success"])
+        self.assertEqual(fetch.call_count, 2)
+
+    def test_imported_member_drops_cached_miss(self, fetch):
+        fetch.return_value = self.not_associated
+        get_primary_card_from_remote(CARD_NUMBER, BUSINESS_ID)
+        rule = BusinessRewardRule.objects.create(
+            RewardRuleBizId=BUSINESS_ID, RewardRuleType="flat", RewardRuleNotionalValue=1,
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            import_members(_csv(MemberImportTests.header, f"{BUSINESS_ID},{CARD_NUMBER},{rule.pk},true"))
+
+        get_primary_card_from_remote(CARD_NUMBER, BUSINESS_ID)
+        self.assertEqual(fetch.call_count, 2)
+
+    def test_evicted_version_key_is_a_miss(self, fetch):
+        fetch.return_value = self.not_associated
+        get_primary_card_from_remote(CARD_NUMBER, BUSINESS_ID)
+        invalidate_card_mappings([CARD_NUMBER])
+        cache.delete(f"card_mapping_version:{CARD_NUMBER}")  # evicted before the card was looked up again
+
+        get_primary_card_from_remote(CARD_NUMBER, BUSINESS_ID)
+        self.assertEqual(fetch.call_count, 2)
+        get_primary_card_from_remote(CARD_NUMBER, BUSINESS_ID)
+        self.assertEqual(fetch.call_count, 2)  # cached again under a new version
+
+
+class _ScriptedAuthServer(ThreadingHTTPServer):
+    """Local HTTP server answering each request with the next status of `statuses`."""
+
+    def __init__(self, statuses):
+        self.statuses = list(statuses)
+        self.hits = 0
+
+        class Handler(BaseHTTPRequestHandler):
+            def respond(handler):
+                self.hits += 1
+                status_code = self.statuses.pop(0) if self.statuses else 200
+                handler.send_response(status_code)
+                handler.send_header("Content-Length", "2")
+                handler.end_headers()
+                handler.wfile.write(b"{}")
+
+            do_GET = do_POST = respond
+
+            def log_message(handler, *args):
+                pass
+
+        super().__init__(("127.0.0.1", 0), Handler)
+        Thread(target=self.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+@override_settings(AUTH_HTTP_MAX_RETRIES=2, AUTH_HTTP_BACKOFF_FACTOR=0.1, AUTH_HTTP_BACKOFF_JITTER=0)
+class AuthHttpClientRetryTests(SimpleTestCase):
+    """GETs are retried with backoff on 502/503/504 and connection errors, POSTs never (helpers/http_client.py)."""
+
+    def setUp(self):
+        http_client._session = None  # rebuilt with the overridden retry settings
+        self.addCleanup(setattr, http_client, "_session", None)
+        sleep = patch("urllib3.util.retry.time.sleep")
+        self.sleep = sleep.start()
+        self.addCleanup(sleep.stop)
+
+    def serve(self, statuses):
+        server = _ScriptedAuthServer(statuses)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server
+
+    def backoffs(self):
+        return [call.args[0] for call in self.sleep.call_args_list]
+
+    def test_get_retried_on_5xx_with_backoff(self):
+        server = self.serve([503, 502])
+
+        with self.settings(AUTH_SERVER_URL=server.url):
+            response = http_client.auth_get("/api/test/retry-5xx/")
+
+        self.assertEqual((response.status_code, server.hits), (200, 3))
+        self.assertEqual(self.backoffs(), [0.2])  # the first retry is immediate
+
+    def test_gives_up_after_max_retries(self):
+        server = self.serve([503, 503, 503, 503])
+
+        with self.settings(AUTH_SERVER_URL=server.url):
+            response = http_client.auth_get("/api/test/retry-exhausted/")
+
+        self.assertEqual((response.status_code, server.hits), (503, 3))
+
+    def test_post_not_retried(self):
+        server = self.serve([503])
+
+        with self.settings(AUTH_SERVER_URL=server.url):
+            response = http_client.auth_post("/api/test/post/", json={})
+
+        self.assertEqual((response.status_code, server.hits), (503, 1))
+
+    def test_get_retried_on_connection_error(self):
+        with socket.socket() as unused:
+            unused.bind(("127.0.0.1", 0))
+            port = unused.getsockname()[1]  # nothing listens here once closed
+
+        create_connection = urllib3.util.connection.create_connection
+        with patch("urllib3.util.connection.create_connection", side_effect=create_connection) as connect:
+            with self.settings(AUTH_SERVER_URL=f"http://127.0.0.1:{port}"):
+                with self.assertRaises(requests.ConnectionError):
+                    http_client.auth_get("/api/test/refused/")
+
+        self.assertEqual(connect.call_count, 3)
+        self.assertEqual(self.backoffs(), [0.2])
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    """State machine of helpers/circuit_breaker.py, on a fake clock."""
+
+    def setUp(self):
+        self.now = 1000.0
+        clock = patch("helpers.circuit_breaker.time.monotonic", side_effect=lambda: self.now)
+        clock.start()
+        self.addCleanup(clock.stop)
+        self.breaker = CircuitBreaker(
+            "/api/test/", window_seconds=60, min_calls=4, failure_rate=50, open_seconds=30, half_open_calls=1,
+        )
+
+    def call(self, failed):
+        self.breaker.before_call()
+        self.breaker.record(failed)
+
+    def trip(self):
+        for failed in (False, True, False, True):
+            self.call(failed)
+
+    def test_opens_at_failure_rate_once_min_calls_reached(self):
+        for failed in (True, True, True):
+            self.call(failed)
+        self.assertEqual(self.breaker.stats()["state"], CLOSED)  # below min_calls
+
+        self.call(False)
+        self.assertEqual(self.breaker.stats()["state"], OPEN)
+
+    def test_stays_closed_below_failure_rate(self):
+        for failed in (False, False, False, True):
+            self.call(failed)
+        self.assertEqual(self.breaker.stats()["state"], CLOSED)
+
+    def test_old_outcomes_leave_the_window(self):
+        for failed in (True, True, True):
+            self.call(failed)
+        self.now += 61
+        self.call(True)
+        self.assertEqual(self.breaker.stats()["state"], CLOSED)
+
+    def test_open_rejects_without_calling(self):
+        self.trip()
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.before_call()
+        self.assertEqual(self.breaker.stats()["rejected_calls"], 1)
+
+    def test_half_open_probe_success_closes(self):
+        self.trip()
+        self.now += 30
+        self.assertEqual(self.breaker.stats()["state"], HALF_OPEN)
+
+        self.breaker.before_call()
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.before_call()  # only half_open_calls probes at a time
+        self.breaker.record(False)
+
+        self.assertEqual(self.breaker.stats()["state"], CLOSED)
+        self.call(False)
+
+    def test_half_open_probe_failure_reopens(self):
+        self.trip()
+        self.now += 30
+        self.call(True)
+
+        stats = self.breaker.stats()
+        self.assertEqual((stats["state"], stats["times_opened"]), (OPEN, 2))
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.before_call()
+
+
+class _ManualExecutor:
+    """Stands in for the refresh executor: submitted refreshes run only when run() is called."""
+
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, fn, *args):
+        self.submitted.append((fn, args))
+
+    def run(self):
+        for fn, args in self.submitted:
+            fn(*args)
+
+
+class RemoteCacheStaleWhileRevalidateTests(SimpleTestCase):
+    """Stale entries are served while one background refresh reloads them (helpers/remote_cache.py)."""
+
+    def setUp(self):
+        cache.clear()
+        self.executor = _ManualExecutor()
+        executor = patch("helpers.remote_cache._get_refresh_executor", return_value=self.executor)
+        executor.start()
+        self.addCleanup(executor.stop)
+        remote_cache.store("member_card", CARD_NUMBER, {"full_name": "Old"}, ttl=-1, stale_ttl=3600)
+
+    def read(self, loader):
+        return remote_cache.read_through("member_card", CARD_NUMBER, loader, ttl=300, stale_ttl=3600)
+
+    def test_stale_value_served_while_refreshing(self):
+        loader = lambda: {"full_name": "New"}
+
+        self.assertEqual(self.read(loader), {"full_name": "Old"})
+        self.assertEqual(len(self.executor.submitted), 1)
+
+        self.executor.run()
+        self.assertEqual(self.read(lambda: self.fail("fresh entry reloaded")), {"full_name": "New"})
+
+    def test_refreshing_lock_prevents_duplicate_refreshes(self):
+        loader = lambda: {"full_name": "New"}
+
+        for _ in range(5):
+            self.assertEqual(self.read(loader), {"full_name": "Old"})
+        self.assertEqual(len(self.executor.submitted), 1)
+
+        self.executor.run()  # releases the lock
+        remote_cache.store("member_card", CARD_NUMBER, {"full_name": "New"}, ttl=-1, stale_ttl=3600)
+        self.read(loader)
+        self.assertEqual(len(self.executor.submitted), 2)
+
+    def test_failed_refresh_keeps_stale_value_and_releases_lock(self):
+        def loader():
+            raise AuthServiceUnavailable()
+
+        self.read(loader)
+        with self.assertLogs("helpers.remote_cache", "ERROR"):
+            self.executor.run()
+
+        self.assertEqual(self.read(loader), {"full_name": "Old"})
+        self.assertEqual(len(self.executor.submitted), 2)
+
+
+class SingleFlightTests(SimpleTestCase):
+    """Concurrent callers of the same key share one call (helpers/singleflight.py)."""
+
+    callers = 8
+
+    def call_together(self, fn):
+        """Start `callers` threads on one key, release fn once all but the leader are waiting on it."""
+        flight = SingleFlight()
+        release = Event()
+        calls = []
+
+        def leader_call():
+            calls.append(1)
+            release.wait(5)
+            return fn()
+
+        def caller(_):
+            try:
+                return flight.do("member_card:1", leader_call)
+            except Exception as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=self.callers) as executor:
+            results = executor.map(caller, range(self.callers))
+            for _ in range(500):
+                if flight.stats()["deduplicated"] == self.callers - 1:
+                    break
+                release.wait(0.01)
+            release.set()
+            results = list(results)
+
+        self.assertEqual(flight.stats(), {"calls": 1, "deduplicated": self.callers - 1, "in_flight": 0})
+        self.assertEqual(len(calls), 1)
+        return results
+
+    def test_concurrent_callers_share_one_fetch(self):
+        results = self.call_together(lambda: {"full_name": "Member"})
+
+        self.assertEqual(results, [{"full_name": "Member"}] * self.callers)
+
+    def test_exception_raised_to_every_waiter(self):
+        error = AuthServiceUnavailable()
+
+        def fail():
+            raise error
+
+        results = self.call_together(fail)
+
+        self.assertTrue(all(result is error for result in results))
+
+    def test_next_call_after_completion_runs_again(self):
+        flight = SingleFlight()
+
+        self.assertEqual([flight.do("key", lambda: i) for i in range(2)], [0, 1])
+
+
+class AuthLookupUnavailableTests(SimpleTestCase):
+    """An unreachable auth server is a 503, not "member not found" (helpers/utils.py)."""
+
+    def setUp(self):
+        cache.clear()
+        auth_get = patch("helpers.utils.auth_get", side_effect=CircuitOpenError("Circuit open for /api/cardno/member-details/"))
+        auth_get.start()
+        self.addCleanup(auth_get.stop)
+
+    def test_open_circuit_without_cached_value_raises(self):
+        with self.assertRaises(AuthServiceUnavailable):
+            get_member_details_by_card(CARD_NUMBER)
+
+    def test_stale_value_still_served(self):
+        remote_cache.store("member_card", CARD_NUMBER, {"full_name": "Member"}, ttl=-1, stale_ttl=3600)
+
+        self.assertEqual(get_member_details_by_card(CARD_NUMBER), {"full_name": "Member"})
+
+    def test_bulk_lookup_returns_none(self):
+        self.assertEqual(get_member_details_by_cards([CARD_NUMBER]), {CARD_NUMBER: None})
+
+
+@skipUnless(fast_json_enabled(), "orjson is not installed")
+class FastJSONRendererTests(SimpleTestCase):
+    """FastJSONRenderer matches DRF's JSONRenderer (helpers/renderers.py)."""
+
+    def test_same_data(self):
+        data = {"amount": 1e16, "small": 1e-7, "points": 12, "name": "caf\u00e9 \u2028", "none": None}
+
+        self.assertEqual(json.loads(FastJSONRenderer().render(data)), json.loads(JSONRenderer().render(data)))
+
+    def test_non_finite_floats_rejected_like_drf(self):
+        for value in (float("nan"), float("inf"), float("-inf")):
+            with self.subTest(value=value):
+                with self.assertRaises(ValueError):
+                    JSONRenderer().render({"rows": [{"amount": value}]})
+                with self.assertRaises(ValueError):
+                    FastJSONRenderer().render({"rows": [{"amount": value}]})
+
+    def test_decimal_datetime_and_null(self):
+        data = {
+            "rows": [
+                {"amount": Decimal("12.50"), "at": datetime(2025, 3, 1, 12, 0, tzinfo=dt_timezone.utc), "note": None},
+            ],
+            "total": Decimal("12.50"),
+            "last_updated": None,
+        }
+
+        with patch("helpers.renderers.has_non_finite", wraps=has_non_finite) as walk:
+            rendered = FastJSONRenderer().render(data)
+        self.assertEqual(json.loads(rendered), json.loads(JSONRenderer().render(data)))
+        self.assertEqual(walk.call_count, 1)  # only walked because of the nulls
+
+        data["rows"][0]["amount"] = Decimal("NaN")
+        with self.assertRaises(ValueError):
+            FastJSONRenderer().render(data)
+
+
+@override_settings(RESPONSE_COMPRESSION_MIN_BYTES=1024, RESPONSE_COMPRESSION_EXCLUDE_PATHS=["/secret/"])
+class ResponseCompressionTests(SimpleTestCase):
+    """helpers/middleware.py: gzip goes through GZipMiddleware and keeps its BREACH padding."""
+
+    body = json.dumps([{"card_number": 100000000000 + i, "points": i} for i in range(200)]).encode()
+
+    def respond(self, path="/reward/transactions/", body=None, accept="gzip"):
+        request = RequestFactory().get(path, HTTP_ACCEPT_ENCODING=accept)
+        response = HttpResponse(self.body if body is None else body, content_type="application/json")
+        return ResponseCompressionMiddleware(lambda request: response)(request)
+
+    def test_gzip_is_padded(self):
+        response = self.respond()
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertTrue(response.content[3] & gzip.FNAME)  # random filename added by GZipMiddleware
+        self.assertEqual(gzip.decompress(response.content), self.body)
+        self.assertIn("Accept-Encoding", response["Vary"])
+
+    def test_small_excluded_and_unaccepted_responses_untouched(self):
+        for response in (
+            self.respond(body=b'{"success": true}'),
+            self.respond(path="/secret/login/"),
+            self.respond(accept="identity"),
+        ):
+            with self.subTest(response=response):
+                self.assertFalse(response.has_header("Content-Encoding"))
+
+
+class DailyRollupTests(TestCase):
+    """Rollup rows follow ledger writes once they commit (business/rollups.py)."""
+
+    def create_transaction(self, points=4, amount=40.0):
+        return CardTransaction.objects.create(
+            CrdTrnsBizId=BUSINESS_ID,
+            CrdTrnsCardNumber=CARD_NUMBER,
+            CrdTrnsPurchaseAmount=amount,
+            CrdTrnsPoint=points,
+            CrdTrnsTransactionType="Points_Earned",
+        )
+
+    def test_applied_on_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.create_transaction()
+            self.assertFalse(BusinessDailyRollup.objects.exists())
+        for callback in callbacks:
+            callback()
+
+        totals = get_business_totals(BUSINESS_ID)
+        self.assertEqual((totals["EarnCount"], totals["EarnPoints"], totals["EarnAmount"]), (1, 4, 40.0))
+
+    def test_delete_before_any_rollup_row_is_kept(self):
+        with self.captureOnCommitCallbacks(execute=False):
+            card_transaction = self.create_transaction()  # written before the rollups existed
+        with self.captureOnCommitCallbacks(execute=True):
+            card_transaction.delete()
+
+        totals = get_business_totals(BUSINESS_ID)
+        self.assertEqual((totals["EarnCount"], totals["EarnPoints"]), (-1, -4))
+
+    def test_rebuild_replaces_rows_from_ledger(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_transaction()
+            self.create_transaction(points=6, amount=60.0)
+        BusinessDailyRollup.objects.update(EarnCount=99)
+
+        call_command("rebuild_business_rollups", business_id=BUSINESS_ID, stdout=StringIO())
+
+        totals = get_business_totals(BUSINESS_ID)
+        self.assertEqual((totals["EarnCount"], totals["EarnPoints"], totals["EarnAmount"]), (2, 10, 100.0))
+
+
+class KeysetPaginationTests(TestCase):
+    """Cursor encoding and page boundaries of helpers/pagination.py."""
+
+    ordering = ("-CrdTrnsTransactionDate", "-id")
+
+    @classmethod
+    def setUpTestData(cls):
+        start = datetime(2026, 10, 1, 9, 0, tzinfo=dt_timezone.utc)
+        for i in range(7):
+            card_transaction = CardTransaction.objects.create(
+                CrdTrnsBizId=BUSINESS_ID, CrdTrnsCardNumber=CARD_NUMBER, CrdTrnsPurchaseAmount=i,
+                CrdTrnsPoint=i, CrdTrnsTransactionType="Points_Earned",
+            )
+            # Two transactions share each timestamp, so the id breaks ties
+            CardTransaction.objects.filter(pk=card_transaction.pk).update(CrdTrnsTransactionDate=start + timedelta(hours=i // 2))
+        cls.newest_first = list(
+            CardTransaction.objects.order_by(*cls.ordering).values_list("id", flat=True)
+        )
+
+    def page(self, **params):
+        request = Request(RequestFactory().get("/transactions/", {"page_size": 3, **params}))
+        rows, meta = cursor_paginate(request, CardTransaction.objects.all(), ordering=self.ordering)
+        return [row.id for row in rows], meta
+
+    def test_cursor_round_trip(self):
+        paginator = KeysetPagination(self.ordering)
+        row = CardTransaction.objects.get(pk=self.newest_first[0])
+
+        values, reverse = paginator.decode_cursor(paginator.encode_cursor(row, reverse=True))
+
+        self.assertEqual(values, [row.CrdTrnsTransactionDate, row.id])
+        self.assertTrue(reverse)
+
+    def test_garbage_and_tampered_cursors_are_not_found(self):
+        paginator = KeysetPagination(self.ordering)
+        tampered = [
+            "not a cursor!",
+            base64.urlsafe_b64encode(b"{not json").decode(),
+            base64.urlsafe_b64encode(b'{"v": [1]}').decode(),  # wrong number of values
+            base64.urlsafe_b64encode(b'{"v": [{"dt": "yesterday"}, 5]}').decode(),  # unparseable date
+            base64.urlsafe_b64encode(b'{"x": 1}').decode(),
+        ]
+        for cursor in tampered:
+            with self.subTest(cursor=cursor):
+                with self.assertRaises(NotFound):
+                    paginator.decode_cursor(cursor)
+                with self.assertRaises(NotFound):
+                    self.page(cursor=cursor)
+
+    def test_walk_forward_and_back(self):
+        first, meta = self.page()
+        self.assertEqual(first, self.newest_first[:3])
+        self.assertIsNone(meta["previous_cursor"])
+
+        second, meta = self.page(cursor=meta["next_cursor"])
+        self.assertEqual(second, self.newest_first[3:6])
+
+        last, meta = self.page(cursor=meta["next_cursor"])
+        self.assertEqual(last, self.newest_first[6:])
+        self.assertIsNone(meta["next_cursor"])
+
+        back, meta = self.page(cursor=meta["previous_cursor"])
+        self.assertEqual(back, second)
+        self.assertIsNotNone(meta["next_cursor"])
+
+        back, meta = self.page(cursor=meta["previous_cursor"])
+        self.assertEqual(back, first)
+        self.assertIsNone(meta["previous_cursor"])
+
+    def test_exact_multiple_has_no_empty_last_page(self):
+        rows, meta = self.page(page_size=7)
+
+        self.assertEqual(rows, self.newest_first)
+        self.assertEqual((meta["next_cursor"], meta["previous_cursor"]), (None, None))
+
+    def test_total_only_on_request(self):
+        self.assertNotIn("total_items", self.page()[1])
+        self.assertEqual(self.page(include_total="true")[1]["total_items"], 7)
+
+
+class ValuesSerializerTests(TestCase):
+    """List endpoints built from .values() rows render exactly what their ModelSerializer did (helpers/fast_serializers.py)."""
+
+    # Microseconds and a non-UTC offset in the stored values; the time zones cover UTC and a half-hour offset
+    stamp = datetime(2026, 3, 8, 23, 45, 1, 123456, tzinfo=dt_timezone(timedelta(hours=-5)))
+    time_zones = {"UTC": "Z", "Asia/Kolkata": "+05:30"}
+
+    @classmethod
+    def setUpTestData(cls):
+        for amount, points in ((12.5, 3), (0.1, None), (7, 0)):
+            card_transaction = CardTransaction.objects.create(
+                CrdTrnsBizId=BUSINESS_ID, CrdTrnsCardNumber=CARD_NUMBER, CrdTrnsPurchaseAmount=amount,
+                CrdTrnsPoint=points, CrdTrnsTransactionType="Points_Earned",
+            )
+            CardTransaction.objects.filter(pk=card_transaction.pk).update(
+                CrdTrnsTransactionDate=cls.stamp + timedelta(days=card_transaction.pk)
+            )
+        CumulativePoints.objects.create(
+            CmltvPntsMbrCardNo=CARD_NUMBER, CmltvPntsBizId=BUSINESS_ID, LifetimeEarnedPoints=Decimal("10.25"),
+            CurrentBalance=Decimal("10.25"), TotalPurchaseAmount=Decimal("19.60"), LifetimeRedeemedPoints=0,
+        )
+        CumulativePoints.objects.update(LastUpdated=cls.stamp)
+        MemberJoinRequest.objects.create(business=BUSINESS_ID, card_number=CARD_NUMBER)  # null name, number, response
+        MemberJoinRequest.objects.create(
+            business=BUSINESS_ID, card_number=CARD_NUMBER + 1, full_name="Member", mobile_number="9000000501",
+            responded_at=cls.stamp,
+        )
+        BusinessRewardRule.objects.create(
+            RewardRuleBizId=BUSINESS_ID, RewardRuleType="percentage", RewardRuleNotionalValue=Decimal("2.50"),
+            RewardRuleValue=1.5, RewardRuleValidityPeriodYears=1,
+        )
+        BusinessRewardRule.objects.create(RewardRuleBizId=BUSINESS_ID, RewardRuleType="flat", RewardRuleNotionalValue=1)
+
+    def assertRendersLike(self, data, expected):
+        # Compared as JSON so that types (Decimal string vs float, datetime format) count, not just equality
+        self.assertEqual(JSONRenderer().render(data), JSONRenderer().render(expected))
+
+    def business_get(self, view, query=""):
+        request = APIRequestFactory().get(f"/reward/{query}")
+        force_authenticate(request, user=AuthenticatedBusinessUser(id=1, business_id=BUSINESS_ID, business_name="Test"))
+        return view.as_view()(request)
+
+    def test_card_transaction_list(self):
+        for time_zone, suffix in self.time_zones.items():
+            with self.subTest(time_zone=time_zone), override_settings(TIME_ZONE=time_zone):
+                page = self.business_get(CardTransactionApi).data["data"]
+                expected = CardTransactionSerializer(CardTransaction.objects.order_by("-id"), many=True).data
+                self.assertRendersLike(page, expected)
+                self.assertTrue(page[0]["CrdTrnsTransactionDate"].endswith(suffix))
+
+                cursor_page = self.business_get(CardTransactionApi, "?mode=cursor").data["data"]
+                expected = CardTransactionSerializer(
+                    CardTransaction.objects.order_by("-CrdTrnsTransactionDate", "-id"), many=True
+                ).data
+                self.assertRendersLike(cursor_page, expected)
+
+    def test_cumulative_points(self):
+        for time_zone in self.time_zones:
+            with self.subTest(time_zone=time_zone), override_settings(TIME_ZONE=time_zone):
+                request = APIRequestFactory().get(f"/member/reward/transactions/{BUSINESS_ID}/")
+                force_authenticate(request, user=AuthenticatedMemberUser(id=1, mbrcardno=CARD_NUMBER, full_name="Member"))
+                with patch("member.views.get_business_details_by_id", return_value={"business_id": BUSINESS_ID}):
+                    response = MemberTransactionHistoryApi.as_view()(request, biz_id=BUSINESS_ID)
+
+                self.assertRendersLike(
+                    response.data["cumulative_points"], CumulativePointsSerializer(CumulativePoints.objects.get()).data
+                )
+
+    def test_member_join_request_list(self):
+        for time_zone in self.time_zones:
+            with self.subTest(time_zone=time_zone), override_settings(TIME_ZONE=time_zone):
+                data = self.business_get(MemberRequestListApi, "member/join-requests/").data
+                expected = MemberJoinRequestSerializer(MemberJoinRequest.objects.order_by("id"), many=True).data
+                self.assertRendersLike(sorted(data, key=lambda row: row["id"]), expected)
+
+    def test_decimal_and_choice_fields(self):
+        rows = ValuesSerializer(BusinessRewardRuleSerializer)
+        rules = BusinessRewardRule.objects.order_by("id")
+        with override_settings(TIME_ZONE="Asia/Kolkata"):
+            data = rows.serialize(rows.values(rules))
+            self.assertRendersLike(data, BusinessRewardRuleSerializer(rules, many=True).data)
+        self.assertEqual(data[0]["RewardRuleNotionalValue"], "2.50")
+        self.assertIsNone(data[1]["RewardRuleValue"])
+
+
+class BusinessReportSeriesTests(TestCase):
+    """Day/week/month series of BusinessReportSeriesAPIView and its cached closed buckets."""
+
+    def setUp(self):
+        cache.clear()
+        self.today = timezone.localdate()
+
+    def create_transaction(self, days_ago, points=5, amount=50.0, kind="Points_Earned", card_number=CARD_NUMBER):
+        card_transaction = CardTransaction.objects.create(
+            CrdTrnsBizId=BUSINESS_ID, CrdTrnsCardNumber=card_number, CrdTrnsPurchaseAmount=amount,
+            CrdTrnsPoint=points, CrdTrnsTransactionType=kind,
+        )
+        dated = timezone.now() - timedelta(days=days_ago)
+        CardTransaction.objects.filter(pk=card_transaction.pk).update(CrdTrnsTransactionDate=dated)
+        card_transaction.CrdTrnsTransactionDate = dated
+        return card_transaction
+
+    def get(self, **params):
+        request = APIRequestFactory().get("/reward/business-reports/series/", params)
+        force_authenticate(request, user=AuthenticatedBusinessUser(id=1, business_id=BUSINESS_ID, business_name="Test"))
+        return BusinessReportSeriesAPIView.as_view()(request)
+
+    def day(self, days_ago):
+        return (self.today - timedelta(days=days_ago)).isoformat()
+
+    def test_bucket_count_matches_bucket_starts(self):
+        ranges = [
+            (datetime(2024, 1, 1).date(), datetime(2024, 1, 1).date()),
+            (datetime(2024, 1, 3).date(), datetime(2024, 3, 10).date()),
+            (datetime(2023, 12, 31).date(), datetime(2025, 2, 1).date()),
+        ]
+        for start, end in ranges:
+            for bucket in ("day", "week", "month"):
+                with self.subTest(start=start, end=end, bucket=bucket):
+                    self.assertEqual(bucket_count(start, end, bucket), len(list(bucket_starts(start, end, bucket))))
+
+    def test_huge_range_rejected_without_walking_buckets(self):
+        with patch("business.reports.bucket_starts", side_effect=AssertionError("buckets walked")):
+            response = self.get(start_date="0001-01-01", end_date="9999-12-31", bucket="day")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("3652059 buckets", response.data["error"])
+
+    def test_invalid_parameters(self):
+        for params in ({"bucket": "year"}, {"start_date": "2025-13-01"}, {"start_date": "2025-02-02", "end_date": "2025-02-01"}):
+            with self.subTest(params=params):
+                self.assertEqual(self.get(**params).status_code, 400)
+
+    def test_daily_series_includes_empty_days(self):
+        self.create_transaction(days_ago=3, points=5, amount=50.0)
+        self.create_transaction(days_ago=3, points=7, amount=70.0, card_number=CARD_NUMBER + 1)
+        self.create_transaction(days_ago=3, points=4, kind="Points_Redeemed", amount=0)
+
+        response = self.get(start_date=self.day(5), end_date=self.day(1))
+
+        series = {point["period_start"]: point for point in response.data["series"]}
+        self.assertEqual(len(series), 5)
+        point = series[self.day(3)]
+        self.assertEqual(
+            (point["earn_count"], point["earn_points"], point["earn_amount"], point["redeem_count"], point["redeem_points"]),
+            (2, 12, 120.0, 1, 4),
+        )
+        self.assertEqual((point["active_cards"], point["average_basket"]), (2, 60.0))
+        self.assertEqual(series[self.day(4)]["earn_count"], 0)
+
+    def test_month_buckets(self):
+        self.create_transaction(days_ago=40)
+        self.create_transaction(days_ago=0)
+
+        response = self.get(start_date=self.day(40), end_date=self.day(0), bucket="month")
+
+        series = response.data["series"]
+        self.assertEqual(series[0]["period_start"], (self.today - timedelta(days=40)).replace(day=1).isoformat())
+        self.assertEqual(sum(point["earn_count"] for point in series), 2)
+
+    def test_closed_buckets_cached_until_transaction_deleted(self):
+        card_transaction = self.create_transaction(days_ago=3)
+        params = {"start_date": self.day(5), "end_date": self.day(1)}
+        self.get(**params)
+
+        with self.assertNumQueries(0):
+            self.get(**params)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            card_transaction.delete()
+
+        series = {point["period_start"]: point for point in self.get(**params).data["series"]}
+        self.assertEqual(series[self.day(3)]["earn_count"], 0)
+
+
+class DailyRollupBackfillMigrationTests(TransactionTestCase):
+    """Migration 0010 fills the new rollup table from the existing ledger."""
+
+    before = [("business", "0009_hot_lookup_indexes")]
+    after = [("business", "0010_businessdailyrollup")]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        self.migrate(MigrationExecutor(connection).loader.graph.leaf_nodes())
+
+    def test_backfilled_from_ledger(self):
+        apps = self.migrate(self.before)
+        CardTransaction = apps.get_model("business", "CardTransaction")
+        for points, kind in ((4, "Points_Earned"), (6, "Points_Earned"), (3, "Points_Redeemed")):
+            CardTransaction.objects.create(
+                CrdTrnsBizId=BUSINESS_ID, CrdTrnsCardNumber=CARD_NUMBER, CrdTrnsPurchaseAmount=points * 10,
+                CrdTrnsPoint=points, CrdTrnsTransactionType=kind,
+            )
+
+        apps = self.migrate(self.after)
+
+        rows = apps.get_model("business", "BusinessDailyRollup").objects.filter(RollupBizId=BUSINESS_ID)
+        self.assertEqual(
+            list(rows.values_list("EarnCount", "EarnPoints", "EarnAmount", "RedeemCount", "RedeemPoints")),
+            [(2, 10, 100.0, 1, 3)],
+        )
+
+
+@skipUnless(connection.vendor in ("postgresql", "sqlite"), "query plan format is backend specific")
+class HotQueryIndexTests(TestCase):
+    """The list/lookup queries of the hot endpoints are planned on the indexes added for them (migration 0009)."""
+
+    def explain(self, queryset):
+        if connection.vendor == "postgresql":
+            # Tiny test tables would otherwise be scanned sequentially or through a bitmap and sorted
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+                cursor.execute("SET LOCAL enable_bitmapscan = off")
+                cursor.execute("SET LOCAL enable_sort = off")
+        return queryset.explain()
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = self.explain(queryset)
+        self.assertIn(index_name, plan, f"expected {index_name} in plan:\n{plan}")
+
+    def test_business_transaction_list_keyset(self):
+        transactions = CardTransaction.objects.filter(CrdTrnsBizId=BUSINESS_ID)
+        self.assertUsesIndex(transactions.order_by("-CrdTrnsTransactionDate", "-id")[:11], "crdtrns_biz_date_idx")
+
+    def test_business_transaction_list_pages(self):
+        transactions = CardTransaction.objects.filter(CrdTrnsBizId=BUSINESS_ID)
+        self.assertUsesIndex(transactions.order_by("-id")[:10], "crdtrns_biz_id_idx")
+
+    def test_card_transaction_history(self):
+        transactions = CardTransaction.objects.filter(CrdTrnsBizId=BUSINESS_ID, CrdTrnsCardNumber=CARD_NUMBER)
+        self.assertUsesIndex(transactions.order_by("-CrdTrnsTransactionDate", "-id")[:21], "crdtrns_biz_card_date_idx")
+
+    def test_active_member_lookup(self):
+        members = BusinessMember.objects.filter(BizMbrBizId=BUSINESS_ID, BizMbrCardNo=CARD_NUMBER, BizMbrIsActive=True)
+        self.assertUsesIndex(members, "bizmbr_biz_card_active_idx")
+
+    def test_memberships_by_card(self):
+        self.assertUsesIndex(BusinessMember.objects.filter(BizMbrCardNo=CARD_NUMBER), "bizmbr_card_idx")
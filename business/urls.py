@@ -16,13 +16,17 @@ urlpatterns = [
     path("business-card/", views.BusinessCardDesignAPI.as_view(), name="business-card-list"),
 
     path('new-member/', views.NewMemberEnrollAPI.as_view(), name='new-member'),
+    path('sms/<int:message_id>/status/', views.SmsStatusAPIView.as_view(), name='sms-status'),
     path("member/<int:card_number>/", views.MemberDetailByCardNumberApi.as_view(), name="member-by-card"),
 
     path("check-member-active/", views.CheckMemberActive.as_view(), name="business-check-member-active"),
     path("member-active/by-mobile-no/", views.CheckMemberActiveByCardmobileNo.as_view(), name="check-member-active"),
     path("business-members/", views.BusinessMemberListCreateApi.as_view(), name="business-member-list-create"),
     path("business-members/<int:pk>/", views.BusinessMemberDetailApi.as_view(), name="business-member-detail"),
+    path("business-members/import-jobs/", views.MemberImportJobCreateApi.as_view(), name="member-import-job-create"),
+    path("business-members/import-jobs/<int:job_id>/", views.MemberImportJobStatusApi.as_view(), name="member-import-job-status"),
     path("transactions/", views.CardTransactionApi.as_view(), name="card-transactions"),
+    path("transactions/batch/", views.CardTransactionBatchApi.as_view(), name="card-transactions-batch"),
 
     path("transactions/<int:transaction_id>/", views.CardTransactionDetailApi.as_view(), name="card-transaction-detail"),
 
@@ -31,8 +35,13 @@ urlpatterns = [
     path('redeem/', views.RedeemPointsAPIView.as_view(), name="redeem-points"),
     
     path("business-reports/", views.BusinessReportsAPIView.as_view(), name="business_reports"),
+    path("business-reports/series/", views.BusinessReportSeriesAPIView.as_view(), name="business_report_series"),
     
     path('member/join-requests/', views.MemberRequestListApi.as_view(), name='list-join-requests'),
     path('member/join-requests/approve/<int:request_id>/', views.ApproveJoinRequestView.as_view(), name='approve-join-request'),
+
+    path("internal/card-mappings/invalidate/", views.CardMappingInvalidateApi.as_view(), name="card-mappings-invalidate"),
+    path("internal/tokens/revoke/", views.TokenRevokeApi.as_view(), name="token-revoke"),
+    path("internal/metrics/", views.AuthDependencyMetricsApi.as_view(), name="auth-dependency-metrics"),
   
 ]
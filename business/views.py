@@ -5,7 +5,7 @@ from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
-from business.models import BusinessRewardRule,BusinessMember, CardTransaction, BusinessCardDesign, CumulativePoints, MemberJoinRequest
+from business.models import BusinessRewardRule,BusinessMember, CardTransaction, BusinessCardDesign, CumulativePoints, MemberJoinRequest, ImportJob
 from .serializers import (
                           BusinessRewardRuleSerializer, 
                           BusinessMemberSerializer,
@@ -18,22 +18,39 @@ from .serializers import (
                           CheckMemberActiveSerializer,
                           MemberByCardSerializer,
                           BusinessMemberSerializer,
-                          MemberJoinRequestSerializer
+                          MemberJoinRequestSerializer,
+                          CardTransactionBatchItemSerializer,
+                          CardTransactionBatchSerializer,
+                          card_transaction_rows,
+                          member_join_request_rows
                           
                           )
-from helpers.utils import send_sms, get_member_details_by_mobile, get_member_details_by_card
-from helpers.card_utils import get_primary_card_from_remote
+from helpers.utils import queue_sms, get_member_details_by_mobile, get_member_details_by_card, get_member_details_by_cards, invalidate_member_details
+from helpers.exceptions import AuthServiceUnavailable
 from datetime import datetime, timedelta
 from django.db.models import Q
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
 from django.shortcuts import get_object_or_404
 from django.db.models import Sum, Avg, Count
 from rest_framework.exceptions import ValidationError
-from .authentication import SSOBusinessTokenAuthentication
-import csv, io
+from .authentication import SSOBusinessTokenAuthentication, get_token_cache_stats
+from .ledger import apply_earn, apply_redeem, apply_transaction_batch, BalanceNotFound, InsufficientPoints
+from .idempotency import idempotent
+from .reward_engine import bump_rules_version, compute_points, get_card_rule, get_rule, redeem_points_required
+from .rollups import get_business_totals
+from .reports import BUCKETS, bucket_count, get_report_series
+from .member_import import import_members, job_progress
+from .card_resolution import resolve_card
 from django.utils import timezone
 from helpers.emails import send_template_email
-from helpers.pagination import paginate
+from helpers.pagination import paginate, cursor_paginate
+from helpers.card_utils import invalidate_card_mappings
+from helpers.permissions import HasInternalToken
+from helpers.circuit_breaker import get_breaker_states
+from helpers.http_client import get_latency_metrics
+from helpers.singleflight import auth_flight
+from helpers.token_cache import revoke_token
+from notifications.models import SmsOutbox
 
 
 class BulkBusinessMemberUpload(APIView):
@@ -42,52 +59,65 @@ class BulkBusinessMemberUpload(APIView):
         if not file:
             return Response({"error": "CSV file is required"}, status=status.HTTP_400_BAD_REQUEST)
 
-        data_set = file.read().decode("UTF-8")
-        io_string = io.StringIO(data_set)
-        csv_reader = csv.DictReader(io_string)
+        # Streams the upload in chunks; bad rows are reported instead of aborting the import
+        report = import_members(file)
 
-        created_members = []
+        if report["failed"] and not report["created"]:
+            return Response({
+                "error": "No business members were uploaded.",
+                **report
+            }, status=status.HTTP_400_BAD_REQUEST)
 
-        for row in csv_reader:
-            try:
-                # Validate Rule ID exists
-                rule_id = row.get("BizMbrRuleId")
-                try:
-                    reward_rule = BusinessRewardRule.objects.get(id=rule_id)
-                except BusinessRewardRule.DoesNotExist:
-                    return Response({
-                        "error": f"Reward Rule with ID {rule_id} does not exist.",
-                        "row": row
-                    }, status=status.HTTP_400_BAD_REQUEST)
-
-                # Parse BizMbrValidityEnd date if provided
-                validity_end = row.get("BizMbrValidityEnd")
-                validity_end_date = None
-                if validity_end:
-                    validity_end_date = datetime.fromisoformat(validity_end)
-
-                # Create BusinessMember object
-                member = BusinessMember.objects.create(
-                    id = row.get("id"),
-                    BizMbrBizId=int(row.get("BizMbrBizId")),
-                    BizMbrCardNo=int(row.get("BizMbrCardNo")),
-                    BizMbrRuleId=reward_rule,
-                    BizMbrIsActive=row.get("BizMbrIsActive", "False").lower() in ["true", "1"],
-                    BizMbrValidityEnd=validity_end_date
-                )
+        return Response({
+            "message": f"{report['created']} business members uploaded successfully.",
+            **report
+        }, status=status.HTTP_201_CREATED)
 
-                created_members.append(member.id)
 
-            except Exception as e:
-                return Response({
-                    "error": f"Failed to process row: {row}",
-                    "details": str(e)
-                }, status=status.HTTP_400_BAD_REQUEST)
 
-        return Response({
-            "message": f"{len(created_members)} business members uploaded successfully.",
-            "member_ids": created_members
-        }, status=status.HTTP_201_CREATED)
+class MemberImportJobCreateApi(APIView):
+    """
+    Queue a large member CSV for background import (manage.py run_import_jobs).
+    Rows are imported into the caller's business; BizMbrBizId may be omitted.
+    """
+    authentication_classes = [SSOBusinessTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter("file", openapi.IN_FORM, description="Member CSV", type=openapi.TYPE_FILE, required=True),
+        ],
+        responses={
+            202: openapi.Response(
+                description="Import job queued",
+                examples={"application/json": {"success": True, "job_id": 7, "status": "queued"}}
+            ),
+        }
+    )
+    def post(self, request, *args, **kwargs):
+        file = request.FILES.get("file")
+        if not file:
+            return Response({"success": False, "error": "CSV file is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        job = ImportJob.objects.create(
+            business_id=request.user.business_id,
+            file=file,
+            original_name=file.name[:255],
+            file_size=file.size,
+        )
+        return Response({"success": True, "job_id": job.id, "status": job.status}, status=status.HTTP_202_ACCEPTED)
+
+
+class MemberImportJobStatusApi(APIView):
+    """Progress of an import job: rows processed/failed, throughput and ETA."""
+    authentication_classes = [SSOBusinessTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, job_id):
+        job = ImportJob.objects.filter(id=job_id, business_id=request.user.business_id).first()
+        if not job:
+            return Response({"success": False, "error": "Import job not found"}, status=status.HTTP_404_NOT_FOUND)
+        return Response({"success": True, **job_progress(job)}, status=status.HTTP_200_OK)
 
 
 
@@ -219,6 +249,8 @@ class SetDefaultRewardRuleAPI(APIView):
             return Response({"success": False, "error": "Reward Rule not found for this business."}, status=status.HTTP_404_NOT_FOUND)
 
         BusinessRewardRule.objects.filter(RewardRuleBizId=business_id).update(RewardRuleIsDefault=False)
+        # queryset.update() sends no signals
+        bump_rules_version(business_id)
 
         rule_to_set_default.RewardRuleIsDefault = True
         rule_to_set_default.save()
@@ -351,7 +383,7 @@ class BusinessCardDesignAPI(APIView):
 
 class NewMemberEnrollAPI(APIView):
     """
-    API to generate a signup link with query parameters and send via SMS.
+    API to generate a signup link with query parameters and queue it for SMS.
     """
 
     authentication_classes = [SSOBusinessTokenAuthentication]
@@ -359,7 +391,9 @@ class NewMemberEnrollAPI(APIView):
 
     @swagger_auto_schema(
         request_body=NewMemberSerializer,
-        operation_description="New member enrollment (Send link via SMS)."
+        operation_description=(
+            "New member enrollment (queue the signup link for SMS). Poll sms-status with sms_message_id for delivery."
+        )
     )
     def post(self, request):
         serializer = NewMemberSerializer(data=request.data)
@@ -377,7 +411,7 @@ class NewMemberEnrollAPI(APIView):
                 )
 
             # Fetch member data from external AUTH service
-            member_data = get_member_details_by_mobile(mobile_number)
+            member_data = get_member_details_by_mobile(mobile_number) or {}
             mbrcardno = member_data.get("mbrcardno")
             if mbrcardno:
                 
@@ -400,6 +434,8 @@ class NewMemberEnrollAPI(APIView):
                         status=status.HTTP_200_OK
                     )
                 else:
+                    # About to be enrolled; do not keep serving a cached "not associated" answer
+                    transaction.on_commit(lambda: invalidate_card_mappings([mbrcardno]))
                     return Response(
                         {
                             "is_present": True,
@@ -422,19 +458,166 @@ class NewMemberEnrollAPI(APIView):
             base_url = settings.SITE_BASE_URL
             signup_url = f"{base_url}/member/sign-up/?referId={refer_id}&name={full_name}&phone={mobile_number}"
 
-            send_sms({
+            # Queued for run_sms_queue; repeated taps within the dedup window reuse the same message
+            sms = queue_sms({
                 "mobile_number": mobile_number,
                 "message": f"Welcome {full_name}! Complete your signup here: {signup_url}"
-            })
+            }, business_id=refer_id)
 
             response_data["signup_url"] = signup_url
-            response_data["message"] = "Signup link sent via SMS"
+            response_data["message"] = "Signup link queued for SMS"
+            response_data["sms_message_id"] = sms.id if sms else None
+            response_data["sms_status"] = sms.status if sms else None
 
             return Response(response_data, status=status.HTTP_200_OK)
 
         return Response({"error": "Invalid data", "details": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
 
 
+class SmsStatusAPIView(APIView):
+    """Delivery status of an SMS queued by this business (e.g. sms_message_id from new-member/)."""
+
+    authentication_classes = [SSOBusinessTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        responses={
+            200: openapi.Response(
+                description="SMS delivery status",
+                examples={
+                    "application/json": {
+                        "success": True,
+                        "sms_message_id": 42,
+                        "status": "sent",
+                        "attempts": 1,
+                        "created_at": "2025-01-01T10:00:00Z",
+                        "sent_at": "2025-01-01T10:00:02Z"
+                    }
+                }
+            ),
+            404: openapi.Response(
+                description="Not found",
+                examples={"application/json": {"success": False, "error": "SMS not found"}}
+            ),
+        }
+    )
+    def get(self, request, message_id):
+        sms = SmsOutbox.objects.filter(id=message_id, business_id=request.user.business_id).first()
+        if not sms:
+            return Response({"success": False, "error": "SMS not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        return Response({
+            "success": True,
+            "sms_message_id": sms.id,
+            "status": sms.status,
+            "attempts": sms.attempts,
+            "created_at": sms.created_at,
+            "sent_at": sms.sent_at
+        }, status=status.HTTP_200_OK)
+
+
+
+
+class CardMappingInvalidateApi(APIView):
+    """
+    Called by the auth server when cards are remapped: drops the cached card
+    resolutions (for every business), the local CardMapping rows and the cached
+    member details of the given cards.
+
+    The cache entries are dropped in the shared Django cache, so every worker
+    sees the remap only when CACHE_BACKEND is shared (e.g. redis); with the
+    default LocMem cache only the worker serving this request does.
+    """
+    authentication_classes = []
+    permission_classes = [HasInternalToken]
+
+    @swagger_auto_schema(
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            required=["card_numbers"],
+            properties={
+                "card_numbers": openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_STRING)),
+            },
+        ),
+        manual_parameters=[
+            openapi.Parameter("X-Internal-Token", openapi.IN_HEADER, description="Shared internal API token", type=openapi.TYPE_STRING, required=True),
+        ],
+        responses={200: openapi.Response(description="Invalidated", examples={"application/json": {"success": True, "invalidated": 2}})}
+    )
+    def post(self, request):
+        card_numbers = request.data.get("card_numbers")
+        if not isinstance(card_numbers, list) or not card_numbers:
+            return Response({"success": False, "error": "card_numbers must be a non-empty list"}, status=status.HTTP_400_BAD_REQUEST)
+
+        card_numbers = [str(card_number) for card_number in card_numbers]
+        invalidate_card_mappings(card_numbers)
+        for card_number in card_numbers:
+            invalidate_member_details(card_number=card_number)
+
+        return Response({"success": True, "invalidated": len(card_numbers)}, status=status.HTTP_200_OK)
+
+
+class TokenRevokeApi(APIView):
+    """
+    Called by the auth server on logout or token revocation: drops the token
+    from the business, member and staff verification caches, so it is rejected
+    on its next use instead of staying valid until SSO_TOKEN_CACHE_TTL expires.
+    """
+    authentication_classes = []
+    permission_classes = [HasInternalToken]
+
+    @swagger_auto_schema(
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            required=["token"],
+            properties={
+                "token": openapi.Schema(type=openapi.TYPE_STRING),
+            },
+        ),
+        manual_parameters=[
+            openapi.Parameter("X-Internal-Token", openapi.IN_HEADER, description="Shared internal API token", type=openapi.TYPE_STRING, required=True),
+        ],
+        responses={200: openapi.Response(description="Revoked", examples={"application/json": {"success": True}})}
+    )
+    def post(self, request):
+        token = request.data.get("token")
+        if not isinstance(token, str) or not token:
+            return Response({"success": False, "error": "token is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        revoke_token(token)
+        return Response({"success": True}, status=status.HTTP_200_OK)
+
+
+class AuthDependencyMetricsApi(APIView):
+    """
+    Health of the auth-server dependency in this worker process: circuit breaker
+    state per endpoint, call latency, token cache hit rate and coalesced lookups.
+    """
+    authentication_classes = []
+    permission_classes = [HasInternalToken]
+
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter("X-Internal-Token", openapi.IN_HEADER, description="Shared internal API token", type=openapi.TYPE_STRING, required=True),
+        ],
+        responses={200: openapi.Response(description="Metrics", examples={"application/json": {
+            "success": True,
+            "circuit_breakers": {"/api/verify-token/": {"state": "closed", "window_calls": 42, "window_failure_rate": 0.0, "open_for_seconds": 0.0, "times_opened": 0, "rejected_calls": 0}},
+            "latency": {"/api/verify-token/": {"count": 42, "errors": 0, "avg_ms": 14.2, "p50_ms": 12.5, "p95_ms": 40.1, "max_ms": 55.0}},
+            "token_cache": {"hits": 310, "negative_hits": 4, "misses": 42, "invalidations": 1, "hit_ratio": 0.8807},
+            "single_flight": {"calls": 52, "deduplicated": 12, "in_flight": 0},
+        }})}
+    )
+    def get(self, request):
+        return Response({
+            "success": True,
+            "circuit_breakers": get_breaker_states(),
+            "latency": get_latency_metrics(),
+            "token_cache": get_token_cache_stats(),
+            "single_flight": auth_flight.stats(),
+        }, status=status.HTTP_200_OK)
+
+
 
 
 # -------------- this function for getting the member information through card Number -------------------     
@@ -452,19 +635,19 @@ class MemberDetailByCardNumberApi(APIView):
 
         business_id = request.user.business_id
 
-        # ✅ Step 1: Resolve primary card number from external AUTH service
-        resolved = get_primary_card_from_remote(card_number, business_id)
-        primary_card_number = resolved.get("primary_card_number")
-        secondary_card_number = resolved.get("secondary_card_number")  
+        # ✅ Step 1: Resolve the card: primary card, membership, rule, balance and member details
+        resolution = resolve_card(card_number, business_id, with_balance=True, with_member_data=True)
+        primary_card_number = resolution.primary_card_number
+        secondary_card_number = resolution.secondary_card_number
 
-        if not resolved.get("success") or not primary_card_number:
+        if not resolution.resolved:
             return Response(
-                {"success": False, "message": resolved.get("message", "Card is not associated with this business.")},
+                {"success": False, "message": resolution.message or "Card is not associated with this business."},
                 status=status.HTTP_200_OK
             )
 
-        # ✅ Step 2: Fetch member data from external AUTH service using primary card
-        member_data = get_member_details_by_card(primary_card_number)
+        # ✅ Step 2: Member data from the AUTH service (cached)
+        member_data = resolution.member_data
         if not member_data or not member_data.get("mbrcardno"):
             return Response({"message": "Member not found."}, status=status.HTTP_200_OK)
 
@@ -472,22 +655,11 @@ class MemberDetailByCardNumberApi(APIView):
         mobile_number = member_data.get("mobile_number")
         full_name = member_data.get("full_name")
 
-        # ✅ Step 4: Fetch local business member
-        business_member = BusinessMember.objects.filter(
-            BizMbrCardNo=primary_card_number,
-            BizMbrBizId=business_id
-        ).first()
+        # ✅ Step 4: Milestone of the member's reward rule in this business
+        milestone = resolution.rule.milestone if resolution.member and resolution.rule else None
 
-        milestone = (
-            business_member.BizMbrRuleId.RewardRuleMilestone
-            if business_member and business_member.BizMbrRuleId else None
-        )
-
-        # ✅ Step 5: Fetch cumulative points
-        cumulative_points = CumulativePoints.objects.filter(
-            CmltvPntsMbrCardNo=primary_card_number,
-            CmltvPntsBizId=business_id
-        ).first()
+        # ✅ Step 5: Cumulative points
+        cumulative_points = resolution.balance
 
         # ✅ Step 6: Prepare response
         response_data = {
@@ -628,75 +800,51 @@ class CheckMemberActive(APIView):
 
         business_id = request.user.business_id
 
-        # Step 1: Resolve primary card (external Auth Server)
-        resolved = get_primary_card_from_remote(card_number, business_id)
-        primary_card_number = resolved.get("primary_card_number")
+        # Step 1: Resolve primary card and memberships (one cached remote call, one query)
+        resolution = resolve_card(card_number, business_id)
+        business_member = resolution.member
 
         # Step 1a: Fallback if resolution failed
-        if not resolved.get("success") or not primary_card_number:
+        if not resolution.resolved:
             # Check if card exists in current business anyway
-            fallback_member = BusinessMember.objects.filter(
-                BizMbrCardNo=card_number,
-                BizMbrBizId=business_id
-            ).first()
-
-            if fallback_member:
-                if not fallback_member.BizMbrIsActive:
+            if business_member:
+                if not business_member.BizMbrIsActive:
                     return Response(
                         {"success": False, "message": "Member is not active."},
                         status=status.HTTP_200_OK
                     )
-                serializer = CheckMemberActiveSerializer(fallback_member)
+                serializer = CheckMemberActiveSerializer(business_member)
                 return Response(
                     {"success": True, "message": "Active member found (primary fallback).", "data": serializer.data},
                     status=status.HTTP_200_OK
                 )
 
             # Check if card exists in other business
-            other_business_member = BusinessMember.objects.filter(
-                BizMbrCardNo=card_number
-            ).first()
-            if other_business_member:
+            if resolution.other_business_id:
                 return Response(
                     {
                         "success": False,
                         "physical_card":False,
                         "message": "This card belongs to another business.",
-                        "other_business_id": other_business_member.BizMbrBizId
+                        "other_business_id": resolution.other_business_id
                     },
                     status=status.HTTP_200_OK
                 )
 
             return Response(
-                {"success": False, "message": resolved.get("message", "This card is not registered.")},
-                status=status.HTTP_200_OK
-            )
-
-        # Step 2: Confirm member exists via Auth Server
-        member_data = get_member_details_by_card(primary_card_number)
-        if not member_data:
-            return Response(
-                {"success": False, "message": "Card is not associated with your business."},
+                {"success": False, "message": resolution.message or "This card is not registered."},
                 status=status.HTTP_200_OK
             )
 
-        # Step 3: Find BusinessMember in current business
-        business_member = BusinessMember.objects.filter(
-            BizMbrCardNo=primary_card_number,
-            BizMbrBizId=business_id
-        ).first()
-
+        # Step 2: Membership in current business
         if not business_member:
             # Card exists, but belongs to other business?
-            other_business_member = BusinessMember.objects.filter(
-                BizMbrCardNo=primary_card_number
-            ).first()
-            if other_business_member:
+            if resolution.other_business_id:
                 return Response(
                     {
                         "success": False,
                         "message": "This card belongs to another business.",
-                        "other_business_id": other_business_member.BizMbrBizId
+                        "other_business_id": resolution.other_business_id
                     },
                     status=status.HTTP_200_OK
                 )
@@ -706,14 +854,14 @@ class CheckMemberActive(APIView):
                 status=status.HTTP_200_OK
             )
 
-        # Step 4: Check active status
+        # Step 3: Check active status
         if not business_member.BizMbrIsActive:
             return Response(
                 {"success": False, "message": "Member is not active.", "BizMbrIsActive": False},
                 status=status.HTTP_200_OK
             )
 
-        # Step 5: Return success
+        # Step 4: Return success
         serializer = CheckMemberActiveSerializer(business_member)
         return Response(
             {"success": True, "message": "Active member found.", "data": serializer.data},
@@ -756,7 +904,7 @@ class CheckMemberActiveByCardmobileNo(APIView):
 
         
         # Fetch member data from external AUTH service
-        member_data = get_member_details_by_mobile(mobile_number)
+        member_data = get_member_details_by_mobile(mobile_number) or {}
         mbrcardno = member_data.get("mbrcardno")
         if not mbrcardno:
             return Response(
@@ -799,33 +947,63 @@ class BusinessMemberListCreateApi(APIView):
     permission_classes = [IsAuthenticated]
 
     @swagger_auto_schema(
-        operation_description="Retrieve a list of all Business Members.",
+        operation_description=(
+            "Retrieve the Business Members one page at a time (MEMBER_LIST_PAGE_SIZE by default). "
+            "?all=true returns the bare list of up to MEMBER_LIST_MAX_ITEMS members instead."
+        ),
+        manual_parameters=[
+            openapi.Parameter("page", openapi.IN_QUERY, description="Page number", type=openapi.TYPE_INTEGER),
+            openapi.Parameter(
+                "page_size", openapi.IN_QUERY, description="Members per page (max 100)", type=openapi.TYPE_INTEGER
+            ),
+            openapi.Parameter(
+                "all", openapi.IN_QUERY, description="true for the bare list of the first MEMBER_LIST_MAX_ITEMS members",
+                type=openapi.TYPE_BOOLEAN
+            ),
+        ],
         responses={200: BusinessMemberSerializer(many=True)}
     )
     def get(self, request):
         """
-        List all Business Members.
+        List Business Members, with member details resolved in bulk.
         """
-        business_members = BusinessMember.objects.filter(BizMbrBizId=request.user.business_id)
-        
+        business_members = BusinessMember.objects.filter(BizMbrBizId=request.user.business_id).order_by("id")
+
+        if request.query_params.get("all") == "true":
+            # Legacy bare list, capped: every listed member costs a member-details lookup
+            members = list(business_members[:settings.MEMBER_LIST_MAX_ITEMS])
+            return Response(self.member_rows(members), status=status.HTTP_200_OK)
+
+        page, pagination_meta = paginate(
+            request,
+            business_members,
+            data_per_page=settings.MEMBER_LIST_PAGE_SIZE  # ?page_size= is read and clamped by CustomPagination
+        )
+        return Response({
+            "status": 200,
+            "data": self.member_rows(page),
+            "pagination_meta_data": pagination_meta
+        }, status=status.HTTP_200_OK)
+
+    @staticmethod
+    def member_rows(members):
+        # One bulk lookup for the cards listed instead of one call per member
+        member_details = get_member_details_by_cards([member.BizMbrCardNo for member in members])
+
         data = []
-        for member in business_members:
-            print(member.BizMbrRuleId.id, "-----")
-            member_data = get_member_details_by_card(card_number=member.BizMbrCardNo)
-            full_name = member_data.get("full_name")
-            mobile_number = member_data.get("mobile_number")
+        for member in members:
+            member_data = member_details.get(member.BizMbrCardNo) or {}
             data.append({
-                "BizMbrBizId": member.BizMbrBizId,  
-                "BizMbrCardNo": member.BizMbrCardNo, 
-                "BizMbrRuleId": member.BizMbrRuleId.id,  
-                "BizMbrIssueDate": member.BizMbrIssueDate,  
+                "BizMbrBizId": member.BizMbrBizId,
+                "BizMbrCardNo": member.BizMbrCardNo,
+                "BizMbrRuleId": member.BizMbrRuleId_id,
+                "BizMbrIssueDate": member.BizMbrIssueDate,
                 "BizMbrValidityEnd": member.BizMbrValidityEnd,
                 "BizMbrIsActive": member.BizMbrIsActive,
-                "full_name": full_name,  
-                "mobile_number": mobile_number  # Fetch member's mobile number
+                "full_name": member_data.get("full_name"),
+                "mobile_number": member_data.get("mobile_number")  # Fetch member's mobile number
             })
-        serializer = BusinessMemberSerializer(business_members, many=True)
-        return Response(data, status=status.HTTP_200_OK)
+        return data
 
     @swagger_auto_schema(
     request_body=BusinessMemberSerializer,
@@ -858,7 +1036,9 @@ class BusinessMemberListCreateApi(APIView):
             # ✅ Fetch the Member from the card number
             
             member_data = get_member_details_by_card(card_number)
-            
+            if not member_data or not member_data.get("mbrcardno"):
+                return Response({"success": False, "BizMbrIsActive": False, "error": "Member not found."}, status=status.HTTP_404_NOT_FOUND)
+
             member = member_data.get("mbrcardno")
             email = member_data.get("email")
             full_name = member_data.get("full_name")
@@ -888,6 +1068,8 @@ class BusinessMemberListCreateApi(APIView):
             if serializer.is_valid():
                 # Save the BusinessMember
                 serializer.save()
+                # A cached "not associated" answer for the card is wrong from now on
+                transaction.on_commit(lambda: invalidate_card_mappings([member]))
                 
                  # ✅ Add business_name to email context
                 context = {
@@ -919,6 +1101,9 @@ class BusinessMemberListCreateApi(APIView):
         except IntegrityError:
             return Response({"success": False, "error": "Failed to insert the record into BusinessMember table."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+        except AuthServiceUnavailable:
+            raise
+
         except Exception as e:
             return Response({"success": False, "error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
@@ -1006,20 +1191,38 @@ class CardTransactionApi(APIView):
     authentication_classes = [SSOBusinessTokenAuthentication]
     permission_classes = [IsAuthenticated]
 
-    @swagger_auto_schema(responses={200: CardTransactionSerializer(many=True)})
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter("page", openapi.IN_QUERY, description="Page number (default mode)", type=openapi.TYPE_INTEGER),
+            openapi.Parameter("page_size", openapi.IN_QUERY, description="Items per page (max 100)", type=openapi.TYPE_INTEGER),
+            openapi.Parameter("mode", openapi.IN_QUERY, description="Set to 'cursor' for keyset pagination (no COUNT/OFFSET)", type=openapi.TYPE_STRING, enum=["page", "cursor"]),
+            openapi.Parameter("cursor", openapi.IN_QUERY, description="Cursor mode: next_cursor / previous_cursor from the previous response", type=openapi.TYPE_STRING),
+            openapi.Parameter("include_total", openapi.IN_QUERY, description="Cursor mode: also return total_items (runs a COUNT)", type=openapi.TYPE_BOOLEAN),
+        ],
+        responses={200: CardTransactionSerializer(many=True)}
+    )
     def get(self, request):
-        transactions = CardTransaction.objects.filter(
+        transactions = card_transaction_rows.values(CardTransaction.objects.filter(
             CrdTrnsBizId=request.user.business_id
-        ).order_by("-id")
-
-        # Use custom paginate function
-        page, pagination_meta = paginate(
-            request,
-            transactions,
-            data_per_page=int(request.GET.get("page_size", 10))
-        )
+        ))
+
+        if request.GET.get("mode") == "cursor" or "cursor" in request.GET:
+            # Opt-in keyset mode: every page costs the same, no COUNT/OFFSET
+            page, pagination_meta = cursor_paginate(
+                request,
+                transactions,
+                ordering=("-CrdTrnsTransactionDate", "-id"),
+                data_per_page=10
+            )
+        else:
+            # Page-number mode, unchanged for existing clients
+            page, pagination_meta = paginate(
+                request,
+                transactions.order_by("-id"),
+                data_per_page=10  # ?page_size= is read and clamped by CustomPagination
+            )
 
-        serialized_data = CardTransactionSerializer(page, many=True).data
+        serialized_data = card_transaction_rows.serialize(page)
 
         return Response({
             "status": 200,
@@ -1028,6 +1231,7 @@ class CardTransactionApi(APIView):
         }, status=status.HTTP_200_OK)
 
     @swagger_auto_schema(request_body=CardTransactionSerializer)
+    @idempotent("transactions")
     def post(self, request):
         data = request.data.copy()
         data["CrdTrnsBizId"] = request.user.business_id
@@ -1046,65 +1250,33 @@ class CardTransactionApi(APIView):
                     CrdTrnsTransactionType=validated_data["CrdTrnsTransactionType"],
                 )
 
-                # Default points
-                transaction.CrdTrnsPoint = 0
+                # 🔢 Point Calculation Logic (rules are compiled and cached per business)
+                reward_rule = get_card_rule(transaction.CrdTrnsBizId, transaction.CrdTrnsCardNumber)
+                transaction.CrdTrnsPoint = compute_points(reward_rule, transaction.CrdTrnsPurchaseAmount)
 
-                # 🔢 Point Calculation Logic
-                business_member = BusinessMember.objects.filter(
-                    BizMbrCardNo=transaction.CrdTrnsCardNumber,
-                    BizMbrBizId=transaction.CrdTrnsBizId,
-                    BizMbrIsActive=True
-                ).select_related("BizMbrRuleId").first()
-
-                reward_rule = None
-                if business_member and business_member.BizMbrRuleId:
-                    reward_rule = business_member.BizMbrRuleId
-                    reward_notional_value = float(reward_rule.RewardRuleNotionalValue or 1)
-                    reward_value = float(reward_rule.RewardRuleValue or 1)
-
-                    if reward_rule.RewardRuleType == "percentage":
-                        transaction.CrdTrnsPoint = int((transaction.CrdTrnsPurchaseAmount * reward_value) / 100)
-                    elif reward_rule.RewardRuleType == "purchase_value_to_points":
-                        transaction.CrdTrnsPoint = int((transaction.CrdTrnsPurchaseAmount * reward_value) / 100)
-                    elif reward_rule.RewardRuleType == "flat":
-                        transaction.CrdTrnsPoint = int(reward_value)
-
-                # Save the transaction
-                transaction.save()
-                member_data = get_member_details_by_card(transaction.CrdTrnsCardNumber)
-                full_name = member_data.get("full_name")
-                email = member_data.get("email")
-                # 💡 Update Cumulative Points
-                cumulative_points, created = CumulativePoints.objects.get_or_create(
-                    CmltvPntsMbrCardNo=transaction.CrdTrnsCardNumber,
-                    CmltvPntsBizId=transaction.CrdTrnsBizId,
-                    defaults={
-                        "LifetimeEarnedPoints": 0,
-                        "CurrentBalance": 0,
-                        "TotalPurchaseAmount": 0,
-                        "LifetimeRedeemedPoints": 0,
-                    }
-                )
+                # Remote lookup before the ledger write, so no row lock is held across it
+                try:
+                    member_data = get_member_details_by_card(transaction.CrdTrnsCardNumber) or {}
+                except AuthServiceUnavailable:
+                    member_data = {}  # only needed for the notification email
 
+                # 💡 Save the transaction and update Cumulative Points atomically
                 if transaction.CrdTrnsTransactionType == "Points_Earned":
-                    cumulative_points.LifetimeEarnedPoints += transaction.CrdTrnsPoint
-                    cumulative_points.CurrentBalance += transaction.CrdTrnsPoint
-                    cumulative_points.TotalPurchaseAmount += transaction.CrdTrnsPurchaseAmount
+                    apply_earn(transaction)
 
                 elif transaction.CrdTrnsTransactionType == "Points_Redeemed":
-                    milestone = reward_rule.RewardRuleMilestone if reward_rule and reward_rule.RewardRuleMilestone else 0
-                    required_points = milestone if milestone > 0 else transaction.CrdTrnsPoint
+                    required_points = redeem_points_required(reward_rule, transaction.CrdTrnsPoint)
 
-                    if cumulative_points.CurrentBalance >= required_points:
-                        cumulative_points.LifetimeRedeemedPoints += required_points
-                        cumulative_points.CurrentBalance -= required_points
-                    else:
+                    try:
+                        apply_redeem(transaction, required_points, create_balance=True)
+                    except InsufficientPoints:
                         return Response({
                             "success": False,
                             "message": "Insufficient points for redemption."
                         }, status=status.HTTP_400_BAD_REQUEST)
 
-                cumulative_points.save()
+                full_name = member_data.get("full_name")
+                email = member_data.get("email")
                 # Prepare context for email
                 email_context = {
                     "full_name": full_name,
@@ -1129,6 +1301,9 @@ class CardTransactionApi(APIView):
                     "business_name": request.user.business_name,
                 }, status=status.HTTP_201_CREATED)
 
+            except AuthServiceUnavailable:
+                raise
+
             except Exception as e:
                 import traceback
                 traceback.print_exc()
@@ -1142,7 +1317,115 @@ class CardTransactionApi(APIView):
 
 
 
-    
+
+
+class CardTransactionBatchApi(APIView):
+    """
+    Record a batch of transactions (e.g. a POS replaying purchases queued while offline).
+
+    Items are applied in order. Invalid items are rejected individually and the
+    rest are written together; a redeem the running balance cannot cover rejects
+    the whole batch with 409 and nothing is written.
+    """
+    authentication_classes = [SSOBusinessTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        request_body=CardTransactionBatchSerializer,
+        responses={
+            201: openapi.Response(
+                description="Per-item results, in request order",
+                examples={
+                    "application/json": {
+                        "success": True,
+                        "accepted": 1,
+                        "rejected": 1,
+                        "results": [
+                            {"index": 0, "success": True, "transaction_id": 101, "points": 50},
+                            {"index": 1, "success": False, "error": {"CrdTrnsPurchaseAmount": ["This field is required."]}}
+                        ]
+                    }
+                }
+            ),
+            409: openapi.Response(
+                description="A redeem is not covered by the card's running balance; no item was written",
+                examples={
+                    "application/json": {"success": False, "index": 3, "error": "Insufficient points for redemption."}
+                }
+            ),
+        }
+    )
+    @idempotent("transactions_batch")
+    def post(self, request):
+        items = request.data.get("transactions") if isinstance(request.data, dict) else None
+        if not isinstance(items, list) or not items:
+            return Response({"success": False, "error": "transactions must be a non-empty list"}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > settings.TRANSACTION_BATCH_MAX_ITEMS:
+            return Response({
+                "success": False,
+                "error": f"At most {settings.TRANSACTION_BATCH_MAX_ITEMS} transactions per batch"
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        results = [None] * len(items)
+        valid_indexes, valid_items = [], []
+        for index, item in enumerate(items):
+            serializer = CardTransactionBatchItemSerializer(data=item)
+            if serializer.is_valid():
+                valid_indexes.append(index)
+                valid_items.append(serializer.validated_data)
+            else:
+                results[index] = {"index": index, "success": False, "error": serializer.errors}
+
+        # Remote lookup before the ledger write, so no row lock is held across it
+        members = get_member_details_by_cards({item["CrdTrnsCardNumber"] for item in valid_items}) if valid_items else {}
+
+        saved = []
+        if valid_items:
+            try:
+                saved = apply_transaction_batch(request.user.business_id, valid_items)
+            except InsufficientPoints as exc:
+                if not exc.args:
+                    return Response({
+                        "success": False,
+                        "message": "Balances changed while the batch was applied; retry the batch."
+                    }, status=status.HTTP_409_CONFLICT)
+                return Response({
+                    "success": False,
+                    "index": valid_indexes[exc.args[0]],
+                    "error": "Insufficient points for redemption."
+                }, status=status.HTTP_409_CONFLICT)
+
+            for index, card_transaction in zip(valid_indexes, saved):
+                results[index] = {
+                    "index": index, "success": True, "transaction_id": card_transaction.id, "points": card_transaction.CrdTrnsPoint
+                }
+
+        def queue_emails():
+            for card_transaction in saved:
+                member_data = members.get(card_transaction.CrdTrnsCardNumber) or {}
+                send_template_email(
+                    subject="Your JSJ Card Transaction Summary",
+                    template_name="email_template/transaction_notification.html",
+                    context={
+                        "full_name": member_data.get("full_name"),
+                        "transaction_type": card_transaction.CrdTrnsTransactionType.replace("_", " "),
+                        "points": card_transaction.CrdTrnsPoint,
+                        "purchase_amount": card_transaction.CrdTrnsPurchaseAmount,
+                        "card_number": card_transaction.CrdTrnsCardNumber,
+                        "business_name": request.user.business_name,
+                    },
+                    recipient_list=[member_data.get("email")]
+                )
+
+        # Queued once the balances are committed and their row locks released
+        transaction.on_commit(queue_emails)
+
+        return Response({
+            "success": bool(saved),
+            "accepted": len(saved),
+            "rejected": len(items) - len(saved),
+            "results": results
+        }, status=status.HTTP_201_CREATED if saved else status.HTTP_400_BAD_REQUEST)    
     
     
 # ---------------- transaction details ----------------
@@ -1238,12 +1521,10 @@ class SpecificCardTransactionApi(APIView):
                 status=status.HTTP_200_OK
             )
 
-        transaction_serializer = CardTransactionSerializer(transactions, many=True)
-        
         return Response(
             {
                 "success": True,
-                "transactions": transaction_serializer.data,
+                "transactions": card_transaction_rows.serialize(card_transaction_rows.values(transactions)),
                 "cumulative_points": cumulative_data,
                 "reward_info": reward_info
             },
@@ -1280,6 +1561,7 @@ class RedeemPointsAPIView(APIView):
             ),
         }
     )
+    @idempotent("redeem")
     def post(self, request):
         serializer = RedeemPointsSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -1288,35 +1570,27 @@ class RedeemPointsAPIView(APIView):
         business_id = serializer.validated_data["business_id"]
         custom_points = serializer.validated_data.get("custom_points")
         
-        member_data = get_member_details_by_card(card_number)
+        try:
+            member_data = get_member_details_by_card(card_number) or {}
+        except AuthServiceUnavailable:
+            member_data = {}  # only needed for the notification email
         full_name = member_data.get("full_name")
         email = member_data.get("email")
-        # 🔍 Fetch cumulative points
-        try:
-            cumulative_points = CumulativePoints.objects.get(
-                CmltvPntsMbrCardNo=card_number,
-                CmltvPntsBizId=business_id
-            )
-        except CumulativePoints.DoesNotExist:
-            return Response(
-                {"success": False, "message": "No cumulative points found for this card and business."},
-                status=status.HTTP_200_OK
-            )
 
-        # 🔍 Fetch active business member and reward rule
-        business_member = BusinessMember.objects.filter(
+        # 🔍 Fetch active business member and its (cached, compiled) reward rule
+        rule_id = BusinessMember.objects.filter(
             BizMbrCardNo=card_number,
             BizMbrBizId=business_id,
             BizMbrIsActive=True
-        ).select_related("BizMbrRuleId").first()
+        ).order_by("id").values_list("BizMbrRuleId", flat=True).first()
+        reward_rule = get_rule(business_id, rule_id)
 
-        if not business_member or not business_member.BizMbrRuleId:
+        if not reward_rule:
             return Response(
                 {"success": False, "message": "No active reward rule found for this member."},
                 status=status.HTTP_200_OK
             )
 
-        reward_rule = business_member.BizMbrRuleId
         # ✅ Decide redemption amount
         if custom_points is not None:
             if custom_points <= 0:
@@ -1324,34 +1598,37 @@ class RedeemPointsAPIView(APIView):
                     {"success": False, "message": "Custom points must be greater than 0."},
                     status=status.HTTP_400_BAD_REQUEST
                 )
-            if custom_points > cumulative_points.CurrentBalance:
-                return Response(
-                    {"success": False, "message": "Insufficient points for custom redemption."},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
             milestone = custom_points
+            insufficient_message = "Insufficient points for custom redemption."
         else:
-            milestone = reward_rule.RewardRuleMilestone
-            if cumulative_points.CurrentBalance < milestone:
+            milestone = reward_rule.milestone
+            if not milestone:
                 return Response(
-                    {"success": False, "message": f"Minimum {milestone} points required for milestone redemption."},
+                    {"success": False, "message": "No redemption milestone is set for this reward rule."},
                     status=status.HTTP_400_BAD_REQUEST
                 )
+            insufficient_message = f"Minimum {milestone} points required for milestone redemption."
 
-        # 💾 Create transaction
-        transaction = CardTransaction.objects.create(
+        # 💾 Create transaction and debit points in one atomic, conditional update
+        transaction = CardTransaction(
             CrdTrnsCardNumber=card_number,
             CrdTrnsBizId=business_id,
             CrdTrnsPurchaseAmount=0,
             CrdTrnsPoint=milestone,
             CrdTrnsTransactionType="Points_Redeemed"
         )
-
-        # 🔄 Update points
-        cumulative_points.LifetimeRedeemedPoints += milestone
-        
-        cumulative_points.CurrentBalance -= milestone
-        cumulative_points.save()
+        try:
+            apply_redeem(transaction, milestone)
+        except BalanceNotFound:
+            return Response(
+                {"success": False, "message": "No cumulative points found for this card and business."},
+                status=status.HTTP_200_OK
+            )
+        except InsufficientPoints:
+            return Response(
+                {"success": False, "message": insufficient_message},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         # Prepare email context
         email_context = {
             "full_name": full_name,
@@ -1407,28 +1684,99 @@ class BusinessReportsAPIView(APIView):
         """Retrieve business report including total cards, transaction amount, and average transaction amount."""
         business_id = request.user.business_id
 
+        # Read the pre-aggregated daily rollups instead of scanning the ledger
+        totals = get_business_totals(business_id)
+
         # Count total cards registered for the business
-        total_cards_registered = BusinessMember.objects.filter(BizMbrBizId=business_id).count()
+        total_cards_registered = totals["NewMembers"] - totals["RemovedMembers"]
 
-        # Get total and average transaction amounts
-        transactions = CardTransaction.objects.filter(CrdTrnsBizId=business_id)
         # Total transaction amount (all types)
-        total_transaction_amount = transactions.aggregate(
-            Sum("CrdTrnsPurchaseAmount")
-        )["CrdTrnsPurchaseAmount__sum"] or 0
+        total_transaction_amount = totals["EarnAmount"] + totals["RedeemAmount"]
 
         # Average amount of credit transactions only
-        credit_avg_transaction_amount = transactions.filter(
-            CrdTrnsTransactionType='Points_Earned'
-        ).aggregate(
-            Avg("CrdTrnsPurchaseAmount")
-        )["CrdTrnsPurchaseAmount__avg"] or 0
+        credit_avg_transaction_amount = (
+            totals["EarnAmount"] / totals["EarnCount"] if totals["EarnCount"] else 0
+        )
         return Response({
             "success": True,
             "total_cards_registered": total_cards_registered,
             "total_transaction_amount": total_transaction_amount,
             "average_transaction_amount": credit_avg_transaction_amount
         }, status=status.HTTP_200_OK)
+
+
+class BusinessReportSeriesAPIView(APIView):
+    """Earn/redeem totals per day, week or month for trend charts."""
+
+    authentication_classes = [SSOBusinessTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter("start_date", openapi.IN_QUERY, description="YYYY-MM-DD (default: 29 days before end_date)", type=openapi.TYPE_STRING),
+            openapi.Parameter("end_date", openapi.IN_QUERY, description="YYYY-MM-DD (default: today)", type=openapi.TYPE_STRING),
+            openapi.Parameter("bucket", openapi.IN_QUERY, description="day, week or month (default: day)", type=openapi.TYPE_STRING),
+        ],
+        responses={
+            200: openapi.Response(
+                description="Business report time series",
+                examples={
+                    "application/json": {
+                        "success": True,
+                        "bucket": "day",
+                        "start_date": "2025-01-01",
+                        "end_date": "2025-01-30",
+                        "series": [{
+                            "period_start": "2025-01-01",
+                            "earn_count": 12,
+                            "earn_amount": 6000.0,
+                            "earn_points": 600.0,
+                            "redeem_count": 2,
+                            "redeem_points": 150.0,
+                            "active_cards": 9,
+                            "average_basket": 500.0
+                        }]
+                    }
+                }
+            ),
+            400: openapi.Response(
+                description="Invalid parameters",
+                examples={"application/json": {"success": False, "error": "bucket must be one of day, week, month"}}
+            ),
+        }
+    )
+    def get(self, request):
+        """Return the series for the business, one point per bucket (empty buckets included)."""
+        business_id = request.user.business_id
+        bucket = request.query_params.get("bucket", "day")
+        if bucket not in BUCKETS:
+            return Response({"success": False, "error": "bucket must be one of " + ", ".join(BUCKETS)}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            end_date = request.query_params.get("end_date")
+            end_date = datetime.strptime(end_date, "%Y-%m-%d").date() if end_date else timezone.localdate()
+            start_date = request.query_params.get("start_date")
+            start_date = datetime.strptime(start_date, "%Y-%m-%d").date() if start_date else end_date - timedelta(days=29)
+        except ValueError:
+            return Response({"success": False, "error": "Dates must be in YYYY-MM-DD format"}, status=status.HTTP_400_BAD_REQUEST)
+
+        if start_date > end_date:
+            return Response({"success": False, "error": "start_date must not be after end_date"}, status=status.HTTP_400_BAD_REQUEST)
+
+        buckets = bucket_count(start_date, end_date, bucket)
+        if buckets > settings.REPORT_SERIES_MAX_BUCKETS:
+            return Response({
+                "success": False,
+                "error": f"Range covers {buckets} buckets, the maximum is {settings.REPORT_SERIES_MAX_BUCKETS}. Use a larger bucket or a shorter range."
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            "success": True,
+            "bucket": bucket,
+            "start_date": start_date.isoformat(),
+            "end_date": end_date.isoformat(),
+            "series": get_report_series(business_id, start_date, end_date, bucket)
+        }, status=status.HTTP_200_OK)
         
         
 class MemberRequestListApi(APIView):
@@ -1442,8 +1790,7 @@ class MemberRequestListApi(APIView):
     def get(self, request):
         business_id = request.user.business_id
         pending_requests = MemberJoinRequest.objects.filter(business=business_id , is_approved=False)
-        serializer = MemberJoinRequestSerializer(pending_requests, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return Response(member_join_request_rows.serialize(member_join_request_rows.values(pending_requests)), status=status.HTTP_200_OK)
     
     
     
@@ -1523,6 +1870,8 @@ class ApproveJoinRequestView(APIView):
                 join_request.is_approved = True
                 join_request.responded_at = timezone.now()
                 join_request.save()
+                card_number = join_request.card_number
+                transaction.on_commit(lambda: invalidate_card_mappings([card_number]))
                 message = "Member approved"
             else:
                 # Reject: delete the join request
@@ -1,52 +1,192 @@
+import logging
+import uuid
 import requests
 from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError
+from helpers.http_client import auth_get
+from helpers.singleflight import auth_flight
+
+logger = logging.getLogger(__name__)
+
+
+class CardLookupUnavailable(Exception):
+    """The auth server could not answer (network error or non-200); nothing is cached."""
+
+
+def _version_key(card_number):
+    return f"card_mapping_version:{card_number}"
+
+
+def _mapping_cache_key(card_number, business_id):
+    return f"card_mapping:{card_number}:{business_id}"
+
+
+def _cached_mapping(card_number, business_id):
+    """
+    (cached resolution or None, card version) in one cache round trip. Entries
+    are stored with the card's version, which invalidate_card_mappings bumps,
+    so one call drops the card for every business. Without a version key (never
+    set, or evicted) every entry of the card is a miss.
+    """
+    version_key, key = _version_key(card_number), _mapping_cache_key(card_number, business_id)
+    values = cache.get_many([version_key, key])
+    version = values.get(version_key)
+    entry = values.get(key)
+    if version is not None and entry is not None and entry[0] == version:
+        return entry[1], version
+    return None, version
+
+
+def _cache_mapping(card_number, business_id, version, result):
+    if version is None:
+        # First entry since the version key was set or evicted; a concurrent writer's key wins
+        version_key = _version_key(card_number)
+        cache.add(version_key, uuid.uuid4().hex, None)
+        version = cache.get(version_key)
+    ttl = settings.CARD_MAPPING_CACHE_TTL if result["success"] else settings.CARD_MAPPING_NEGATIVE_CACHE_TTL
+    cache.set(_mapping_cache_key(card_number, business_id), (version, result), ttl)
+
+
+def _as_card_number(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
 
 
 def get_primary_card_from_remote(card_number, business_id):
+    """
+    Resolve a scanned card to its primary card for a business.
+
+    Mappings are cached for CARD_MAPPING_CACHE_TTL and "not mapped" answers for
+    CARD_MAPPING_NEGATIVE_CACHE_TTL. Transport errors are never cached; while the
+    auth server is unreachable the last known mapping from the CardMapping table
+    is used when CARD_MAPPING_TABLE_ENABLED.
+    """
+    cached, version = _cached_mapping(card_number, business_id)
+    if cached is not None:
+        return cached
+
+    try:
+        # Concurrent scans of the same card share one in-flight call to the auth server
+        result = auth_flight.do(
+            ("/api/get-primary-card/", str(card_number), str(business_id)),
+            lambda: _fetch_primary_card(card_number, business_id)
+        )
+    except CardLookupUnavailable as e:
+        return _resolve_from_table(card_number, business_id) or {
+            "success": False,
+            "primary_card_number": None,
+            "message": str(e)
+        }
+
+    _cache_mapping(card_number, business_id, version, result)
+    _store_mapping(card_number, business_id, result)
+    return result
+
+
+def _fetch_primary_card(card_number, business_id):
     try:
-        response = requests.get(
-            settings.AUTH_SERVER_URL + "/api/get-primary-card/",
+        response = auth_get(
+            "/api/get-primary-card/",
             params={"card_number": card_number, "business_id": business_id},
-            timeout=5
         )
-        if response.status_code == 200:
-            data = response.json()
-
-            if data.get("success") and data.get("primary_card_number"):
-                return {
-                    "success": True,
-                    "primary_card_number": data["primary_card_number"],
-                    "secondary_card_number": data.get("secondary_card_number"),
-                    "message": data.get("message", "")
-                }
-
-            if data.get("primary_card_number") == card_number and not data.get("is_associated", True):
-                return {
-                    "success": False,
-                    "primary_card_number": None,
-                    "message": data.get("message", "Card is not mapped.")
-                }
-
-            return {
-                "success": False,
-                "primary_card_number": None,
-                "message": data.get("message", "Card is not associated with this business.")
-            }
+    except requests.RequestException:
+        raise CardLookupUnavailable("External request failed. Try again later.")
 
+    if response.status_code != 200:
         # ❌ Non-200 response
+        raise CardLookupUnavailable(f"Auth server returned status {response.status_code}")
+
+    data = response.json()
+
+    if data.get("success") and data.get("primary_card_number"):
         return {
-            "success": False,
-            "primary_card_number": None,
-            "message": f"Auth server returned status {response.status_code}"
+            "success": True,
+            "primary_card_number": data["primary_card_number"],
+            "secondary_card_number": data.get("secondary_card_number"),
+            "message": data.get("message", "")
         }
 
-    except requests.RequestException:
+    if data.get("primary_card_number") == card_number and not data.get("is_associated", True):
         return {
             "success": False,
             "primary_card_number": None,
-            "message": "External request failed. Try again later."
+            "message": data.get("message", "Card is not mapped.")
         }
 
+    return {
+        "success": False,
+        "primary_card_number": None,
+        "message": data.get("message", "Card is not associated with this business.")
+    }
+
+
+def _store_mapping(card_number, business_id, result):
+    """Save the resolution in the CardMapping table; one read and no write when it is unchanged."""
+    from business.models import CardMapping
+
+    card_number = _as_card_number(card_number)
+    if not settings.CARD_MAPPING_TABLE_ENABLED or card_number is None:
+        return
+    values = {
+        "primary_card_number": _as_card_number(result.get("primary_card_number")),
+        "secondary_card_number": _as_card_number(result.get("secondary_card_number")),
+        "is_mapped": result["success"],
+        "message": (result.get("message") or "")[:255],
+    }
+    try:
+        stored = CardMapping.objects.filter(card_number=card_number, business_id=business_id).values(*values).first()
+        if stored == values:
+            return
+        CardMapping.objects.update_or_create(card_number=card_number, business_id=business_id, defaults=values)
+    except DatabaseError as e:
+        logger.warning("Could not store card mapping for %s: %s", card_number, e)
+
+
+def _resolve_from_table(card_number, business_id):
+    from business.models import CardMapping
+
+    card_number = _as_card_number(card_number)
+    if not settings.CARD_MAPPING_TABLE_ENABLED or card_number is None:
+        return None
+    mapping = CardMapping.objects.filter(card_number=card_number, business_id=business_id, is_mapped=True).first()
+    if mapping is None:
+        return None
+    return {
+        "success": True,
+        "primary_card_number": mapping.primary_card_number,
+        "secondary_card_number": mapping.secondary_card_number,
+        "message": "Resolved from the local card mapping (auth server unavailable)."
+    }
+
+
+def refresh_card_mapping(card_number, business_id):
+    """Re-resolve one (card, business) pair from the auth server and update cache and table."""
+    _, version = _cached_mapping(card_number, business_id)
+    result = _fetch_primary_card(card_number, business_id)
+    _cache_mapping(card_number, business_id, version, result)
+    _store_mapping(card_number, business_id, result)
+    return result
+
+
+def invalidate_card_mappings(card_numbers):
+    """
+    Forget cached resolutions of the given cards (for every business) and their table rows.
+
+    The cached resolutions are dropped through a version key in the Django
+    cache, so this reaches every worker only with a shared cache backend
+    (CACHE_BACKEND, e.g. redis). With the default per-process LocMem cache,
+    other workers keep serving their copy for up to CARD_MAPPING_CACHE_TTL.
+    """
+    from business.models import CardMapping
+
+    cache.set_many({_version_key(card_number): uuid.uuid4().hex for card_number in card_numbers}, None)
+    numeric = [number for number in map(_as_card_number, card_numbers) if number is not None]
+    if numeric:
+        CardMapping.objects.filter(card_number__in=numeric).delete()
+
 
 
 
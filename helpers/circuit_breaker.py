@@ -0,0 +1,139 @@
+"""
+    Per-endpoint circuit breakers for auth-server calls (used by helpers.http_client).
+
+    closed     calls go through; outcomes are kept for AUTH_BREAKER_WINDOW_SECONDS.
+               Once the window has AUTH_BREAKER_MIN_CALLS calls and at least
+               AUTH_BREAKER_FAILURE_RATE percent of them failed, the breaker opens.
+    open       calls fail immediately with CircuitOpenError for AUTH_BREAKER_OPEN_SECONDS.
+    half_open  up to AUTH_BREAKER_HALF_OPEN_CALLS probe calls go through; a success
+               closes the breaker, a failure opens it again.
+
+    CircuitOpenError is a requests.RequestException, so callers that already
+    handle network errors (cached fallbacks, "service unreachable" responses)
+    handle an open breaker the same way, without waiting for a timeout.
+"""
+
+import threading
+import time
+from collections import deque
+
+import requests
+from django.conf import settings
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(requests.RequestException):
+    """The breaker for this endpoint is open; the call was not attempted."""
+
+
+class CircuitBreaker:
+    def __init__(self, name, window_seconds, min_calls, failure_rate, open_seconds, half_open_calls):
+        self.name = name
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._outcomes = deque()  # (monotonic time, failed)
+        self._opened_at = None
+        self._probes = 0
+        self._rejected = 0
+        self._opened_count = 0
+
+    def _trim(self, now):
+        while self._outcomes and now - self._outcomes[0][0] > self.window_seconds:
+            self._outcomes.popleft()
+
+    def _open(self, now):
+        self._state = OPEN
+        self._opened_at = now
+        self._opened_count += 1
+        self._outcomes.clear()
+
+    def before_call(self):
+        """Raise CircuitOpenError unless a call may go through now."""
+        with self._lock:
+            now = time.monotonic()
+            if self._state == OPEN and now - self._opened_at >= self.open_seconds:
+                self._state = HALF_OPEN
+                self._probes = 0
+            if self._state == OPEN or (self._state == HALF_OPEN and self._probes >= self.half_open_calls):
+                self._rejected += 1
+                raise CircuitOpenError(f"Circuit open for {self.name}")
+            if self._state == HALF_OPEN:
+                self._probes += 1
+
+    def record(self, failed):
+        with self._lock:
+            now = time.monotonic()
+            if self._state == HALF_OPEN:
+                self._probes = max(0, self._probes - 1)
+                if failed:
+                    self._open(now)
+                else:
+                    self._state = CLOSED
+                    self._outcomes.clear()
+                return
+            if self._state == OPEN:
+                return
+
+            self._outcomes.append((now, failed))
+            self._trim(now)
+            calls = len(self._outcomes)
+            failures = sum(1 for _, outcome in self._outcomes if outcome)
+            if calls >= self.min_calls and failures * 100 >= self.failure_rate * calls:
+                self._open(now)
+
+    def stats(self):
+        with self._lock:
+            now = time.monotonic()
+            self._trim(now)
+            calls = len(self._outcomes)
+            failures = sum(1 for _, outcome in self._outcomes if outcome)
+            state = self._state
+            if state == OPEN and now - self._opened_at >= self.open_seconds:
+                state = HALF_OPEN  # will let a probe through on the next call
+            return {
+                "state": state,
+                "window_calls": calls,
+                "window_failure_rate": round(failures * 100 / calls, 1) if calls else 0.0,
+                "open_for_seconds": round(now - self._opened_at, 1) if state != CLOSED and self._opened_at else 0.0,
+                "times_opened": self._opened_count,
+                "rejected_calls": self._rejected,
+            }
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name):
+    """The process-wide breaker for an endpoint, created on first use."""
+    breaker = _breakers.get(name)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.get(name)
+            if breaker is None:
+                breaker = _breakers[name] = CircuitBreaker(
+                    name,
+                    window_seconds=settings.AUTH_BREAKER_WINDOW_SECONDS,
+                    min_calls=settings.AUTH_BREAKER_MIN_CALLS,
+                    failure_rate=settings.AUTH_BREAKER_FAILURE_RATE,
+                    open_seconds=settings.AUTH_BREAKER_OPEN_SECONDS,
+                    half_open_calls=settings.AUTH_BREAKER_HALF_OPEN_CALLS,
+                )
+    return breaker
+
+
+def get_breaker_states():
+    """{endpoint: breaker stats} for this process."""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.stats() for breaker in breakers}
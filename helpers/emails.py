@@ -1,48 +1,83 @@
 import threading
 import requests
+from requests.adapters import HTTPAdapter
+from django.template import TemplateDoesNotExist, TemplateSyntaxError
 from django.template.loader import render_to_string
 from django.conf import settings
+from notifications.models import EmailOutbox
+from notifications.outbox import PermanentDeliveryError
+
+
+SES_API_URL = "https://w1yg18jn76.execute-api.ap-south-1.amazonaws.com/default/sesapi"
+SES_SENDER = "contact@jsjcard.com"  # Your verified SES sender email
+
+_session = None
+_session_lock = threading.Lock()
 
 
 def send_template_email(subject, template_name, context, recipient_list, attachments=None):
     """
-    Send an email by invoking your AWS Lambda SES API.
-    Supports HTML content and optional attachments.
-    """
-    # Render the HTML content
-    html_message = render_to_string(template_name, context)
+    Queue an email for the SES Lambda API.
 
-    sender = "contact@jsjcard.com"  # Your verified SES sender email
+    Only inserts an EmailOutbox row (inside the caller's transaction, if any);
+    rendering and delivery happen in `manage.py run_email_outbox`.
+    Returns the outbox id, or None when there is no recipient.
+    """
     recipient = recipient_list[0] if recipient_list else None
 
     if not recipient:
         print("No recipient provided.")
-        return
+        return None
 
-    api_url = "https://w1yg18jn76.execute-api.ap-south-1.amazonaws.com/default/sesapi"
+    message = EmailOutbox.objects.create(
+        subject=subject,
+        template_name=template_name,
+        context=context or {},
+        recipient=recipient,
+        attachments=attachments,  # Must be a list of dicts as per your Lambda spec
+    )
+    return message.id
 
-    # Prepare payload
-    payload = {
-        "sender": sender,
-        "recipient": recipient,
-        "subject": subject,
-        "body": html_message
-    }
 
-    # If attachments are provided, encode them as JSON string
-    if attachments:
-        payload["attachments"] = attachments  # Must be a list of dicts as per your Lambda spec
+def _get_session():
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                session.mount("https://", HTTPAdapter(pool_maxsize=settings.EMAIL_OUTBOX_WORKERS))
+                _session = session
+    return _session
+
 
-    headers = {"Content-Type": "application/json"}
+def deliver_email(message):
+    """
+    Render an EmailOutbox row and post it to the SES Lambda API.
+    Raises on failure; PermanentDeliveryError when a retry cannot help.
+    """
+    try:
+        html_message = render_to_string(message.template_name, message.context)
+    except (TemplateDoesNotExist, TemplateSyntaxError) as e:
+        raise PermanentDeliveryError(f"Template error: {e}")
 
-    def send_email():
-        try:
-            response = requests.post(api_url, json=payload, headers=headers)
-            if response.status_code == 200:
-                print("✅ Email sent successfully via AWS SES API.")
-            else:
-                print(f"❌ Failed to send email. Status: {response.status_code}, Response: {response.text}")
-        except Exception as e:
-            print(f"❌ Exception while sending email: {e}")
+    payload = {
+        "sender": SES_SENDER,
+        "recipient": message.recipient,
+        "subject": message.subject,
+        "body": html_message
+    }
+    if message.attachments:
+        payload["attachments"] = message.attachments
 
-    threading.Thread(target=send_email).start()
+    response = _get_session().post(
+        SES_API_URL,
+        json=payload,
+        headers={"Content-Type": "application/json"},
+        timeout=settings.EMAIL_SEND_TIMEOUT,
+    )
+    if response.status_code == 200:
+        return
+    error = f"Status: {response.status_code}, Response: {response.text[:500]}"
+    if 400 <= response.status_code < 500 and response.status_code not in (408, 429):
+        raise PermanentDeliveryError(error)
+    raise requests.HTTPError(error)
@@ -0,0 +1,9 @@
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class AuthServiceUnavailable(APIException):
+    """The auth server is down or its circuit breaker is open; the client should retry later."""
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Authentication service is temporarily unavailable. Please retry shortly."
+    default_code = "auth_service_unavailable"
@@ -0,0 +1,134 @@
+"""
+    Read-only fast path for list endpoints.
+
+    ValuesSerializer builds the same output as a plain ModelSerializer from
+    `.values()` rows instead of model instances. The serializer's fields are
+    inspected once: fields whose DRF representation is the database value itself
+    (integers, floats, strings, booleans, primary keys) are copied as is,
+    ISO 8601 datetimes are converted with the current timezone looked up once per
+    call instead of once per value, and every other field (choices, ...) goes
+    through that field's own to_representation, so the output stays identical
+    to serializer.data.
+
+    Only model fields are supported; serializers with SerializerMethodField,
+    nested serializers or dotted sources must keep using the ModelSerializer.
+
+    =====> How to use: <=======
+
+    card_transaction_rows = ValuesSerializer(CardTransactionSerializer)
+
+    rows = card_transaction_rows.values(CardTransaction.objects.filter(...))
+    page, meta = cursor_paginate(request, rows, ...)    # dict rows work with both paginators
+    data = card_transaction_rows.serialize(page)        # == CardTransactionSerializer(page, many=True).data
+"""
+
+import threading
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+
+# DRF fields whose to_representation returns the value the database driver
+# already produced for the matching model field
+PASSTHROUGH_FIELDS = (
+    serializers.IntegerField,
+    serializers.FloatField,
+    serializers.CharField,
+    serializers.BooleanField,
+)
+
+PASSTHROUGH, DATETIME, FIELD = "passthrough", "datetime", "field"
+
+
+def _is_iso_datetime(field):
+    output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+    return (
+        type(field) is serializers.DateTimeField
+        and not hasattr(field, "timezone")
+        and isinstance(output_format, str)
+        and output_format.lower() == ISO_8601
+    )
+
+
+def _datetime_converter(field, tz):
+    """DateTimeField.to_representation for aware values, with the timezone resolved up front."""
+    def convert(value):
+        if getattr(value, "utcoffset", None) is None or value.utcoffset() is None:
+            return field.to_representation(value)
+        try:
+            value = value.astimezone(tz).isoformat()
+        except OverflowError:
+            return field.to_representation(value)  # raises DRF's validation error
+        return value[:-6] + "Z" if value.endswith("+00:00") else value
+    return convert
+
+
+class ValuesSerializer:
+    def __init__(self, serializer_class):
+        self.serializer_class = serializer_class
+        self._plan = None
+        self._lock = threading.Lock()
+
+    def _build_plan(self):
+        plan = []
+        for field in self.serializer_class().fields.values():
+            if field.write_only:
+                continue
+            if isinstance(field, (serializers.SerializerMethodField, serializers.BaseSerializer)) or "." in field.source:
+                raise TypeError(
+                    f"{self.serializer_class.__name__}.{field.field_name} cannot be built from .values() rows"
+                )
+            if type(field) in PASSTHROUGH_FIELDS or (
+                isinstance(field, serializers.PrimaryKeyRelatedField) and field.pk_field is None
+            ):
+                kind = PASSTHROUGH
+            elif _is_iso_datetime(field):
+                kind = DATETIME
+            else:
+                kind = FIELD
+            plan.append((field.field_name, field.source, field, kind))
+        return plan
+
+    @property
+    def plan(self):
+        """[(output name, values() key, serializer field, kind)], built on first use."""
+        if self._plan is None:
+            with self._lock:
+                if self._plan is None:
+                    self._plan = self._build_plan()
+        return self._plan
+
+    @property
+    def sources(self):
+        return [source for _, source, _, _ in self.plan]
+
+    def values(self, queryset):
+        """The queryset as dict rows holding exactly the columns the serializer needs."""
+        return queryset.values(*self.sources)
+
+    def serialize(self, rows):
+        """List of dicts equal to serializer_class(rows, many=True).data."""
+        tz = timezone.get_current_timezone() if settings.USE_TZ else None
+        plan = []
+        for name, source, field, kind in self.plan:
+            if kind == PASSTHROUGH:
+                convert = None
+            elif kind == DATETIME and tz is not None:
+                convert = _datetime_converter(field, tz)
+            else:
+                convert = field.to_representation
+            plan.append((name, source, convert))
+
+        data = []
+        for row in rows:
+            item = {}
+            for name, source, convert in plan:
+                value = row[source]
+                item[name] = value if convert is None or value is None else convert(value)
+            data.append(item)
+        return data
+
+    def serialize_one(self, row):
+        return self.serialize([row])[0] if row is not None else None
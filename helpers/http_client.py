@@ -0,0 +1,142 @@
+"""
+    Process-wide pooled HTTP client for the auth server (jsjcardauth).
+
+    All auth-server helpers go through auth_get / auth_post so that a worker
+    keeps its TCP/TLS connections alive instead of doing a new handshake on
+    every lookup. GET requests are idempotent and are retried with jittered
+    backoff; POST requests are never retried. Each endpoint has a circuit
+    breaker (helpers/circuit_breaker.py): while it is open, calls raise
+    CircuitOpenError (a requests.RequestException) immediately.
+
+    =====> How to use: <=======
+
+    response = auth_get("/api/member-details/", params={"mobile_number": mobile_number})
+    if response.status_code == 200:
+        data = response.json()
+"""
+
+import threading
+import time
+from collections import deque
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from django.conf import settings
+from helpers.circuit_breaker import get_breaker
+
+
+_session = None
+_session_lock = threading.Lock()
+
+_metrics = {}
+_metrics_lock = threading.Lock()
+_LATENCY_SAMPLES = 512
+
+
+def _build_session():
+    retry = Retry(
+        total=getattr(settings, "AUTH_HTTP_MAX_RETRIES", 2),
+        backoff_factor=getattr(settings, "AUTH_HTTP_BACKOFF_FACTOR", 0.1),
+        backoff_jitter=getattr(settings, "AUTH_HTTP_BACKOFF_JITTER", 0.1),
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset(["GET"]),
+        raise_on_status=False,
+    )
+    pool_size = getattr(settings, "AUTH_HTTP_POOL_SIZE", 20)
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=retry)
+
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_session():
+    """Return the shared requests.Session, creating it on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def _default_timeout():
+    return (
+        getattr(settings, "AUTH_HTTP_CONNECT_TIMEOUT", 3),
+        getattr(settings, "AUTH_HTTP_READ_TIMEOUT", 5),
+    )
+
+
+def _record(endpoint, elapsed_ms, error=False):
+    with _metrics_lock:
+        stats = _metrics.get(endpoint)
+        if stats is None:
+            stats = _metrics[endpoint] = {
+                "count": 0,
+                "errors": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "samples": deque(maxlen=_LATENCY_SAMPLES),
+            }
+        stats["count"] += 1
+        stats["total_ms"] += elapsed_ms
+        stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+        stats["samples"].append(elapsed_ms)
+        if error:
+            stats["errors"] += 1
+
+
+def _request(method, path, timeout=None, **kwargs):
+    url = settings.AUTH_SERVER_URL + path
+    breaker = get_breaker(path)
+    breaker.before_call()  # raises CircuitOpenError without touching the network
+
+    start = time.perf_counter()
+    try:
+        response = get_session().request(method, url, timeout=timeout or _default_timeout(), **kwargs)
+    except requests.RequestException:
+        _record(path, (time.perf_counter() - start) * 1000, error=True)
+        breaker.record(failed=True)
+        raise
+    failed = response.status_code >= 500
+    _record(path, (time.perf_counter() - start) * 1000, error=failed)
+    breaker.record(failed=failed)
+    return response
+
+
+def auth_get(path, params=None, timeout=None):
+    """GET an auth-server endpoint (retried on connection errors and 502/503/504)."""
+    return _request("GET", path, params=params, timeout=timeout)
+
+
+def auth_post(path, json=None, timeout=None):
+    """POST to an auth-server endpoint (never retried)."""
+    return _request("POST", path, json=json, timeout=timeout)
+
+
+def _percentile(sorted_samples, fraction):
+    if not sorted_samples:
+        return 0.0
+    index = min(len(sorted_samples) - 1, int(round(fraction * (len(sorted_samples) - 1))))
+    return sorted_samples[index]
+
+
+def get_latency_metrics():
+    """Per-endpoint call counts, error counts and latency (ms) for this process."""
+    with _metrics_lock:
+        snapshot = {endpoint: dict(stats, samples=sorted(stats["samples"])) for endpoint, stats in _metrics.items()}
+
+    metrics = {}
+    for endpoint, stats in snapshot.items():
+        samples = stats["samples"]
+        metrics[endpoint] = {
+            "count": stats["count"],
+            "errors": stats["errors"],
+            "avg_ms": round(stats["total_ms"] / stats["count"], 2) if stats["count"] else 0.0,
+            "p50_ms": round(_percentile(samples, 0.50), 2),
+            "p95_ms": round(_percentile(samples, 0.95), 2),
+            "max_ms": round(stats["max_ms"], 2),
+        }
+    return metrics
@@ -0,0 +1,83 @@
+"""
+    Response compression negotiated with Accept-Encoding, built on Django's
+    GZipMiddleware.
+
+    Responses of at least RESPONSE_COMPRESSION_MIN_BYTES are compressed. JSON
+    responses go out as Brotli when the client accepts "br" and the optional
+    `brotli` package is installed; everything else is left to GZipMiddleware,
+    which pads the gzip header with a random number of bytes to mitigate
+    BREACH. Brotli output cannot be padded that way, so it is only used for the
+    API's JSON, which is authenticated with tokens in request headers rather
+    than cookies. Paths listed in RESPONSE_COMPRESSION_EXCLUDE_PATHS (e.g.
+    endpoints whose bodies carry tokens or other secrets next to user input)
+    are never compressed. Streaming responses (file downloads, static files
+    served by WhiteNoise) and responses that already have a Content-Encoding
+    are left alone.
+"""
+
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def accepted_encodings(header):
+    """Codings the client accepts, ignoring ones sent with q=0."""
+    accepted = set()
+    for part in (header or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            accepted.add(coding)
+    return accepted
+
+
+def accepts_brotli(header):
+    accepted = accepted_encodings(header)
+    return brotli is not None and ("br" in accepted or "*" in accepted)
+
+
+def is_excluded(path):
+    return any(path.startswith(prefix) for prefix in settings.RESPONSE_COMPRESSION_EXCLUDE_PATHS)
+
+
+class ResponseCompressionMiddleware(GZipMiddleware):
+    def process_response(self, request, response):
+        min_bytes = settings.RESPONSE_COMPRESSION_MIN_BYTES
+
+        if response.streaming or response.has_header("Content-Encoding"):
+            return response
+        if min_bytes <= 0 or len(response.content) < min_bytes or is_excluded(request.path):
+            return response
+
+        is_json = response.get("Content-Type", "").startswith("application/json")
+        if not (is_json and accepts_brotli(request.META.get("HTTP_ACCEPT_ENCODING"))):
+            return super().process_response(request, response)
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        compressed = brotli.compress(response.content, quality=settings.RESPONSE_COMPRESSION_BROTLI_QUALITY)
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response.headers["Content-Length"] = str(len(compressed))
+        response.headers["Content-Encoding"] = "br"
+        # The compressed body is a different representation of the same resource
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        return response
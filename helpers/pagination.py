@@ -1,3 +1,10 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination
 
 
@@ -33,6 +40,104 @@ def paginate(request, queryset, data_per_page = 20):
     page = paginator.paginate_queryset(queryset, request)
     return page, paginator.pagination_meta_data() 
 
+
+
+class KeysetPagination:
+    """
+    Cursor (keyset) pagination over a queryset ordered by two fields in the
+    same direction, e.g. ("-CrdTrnsTransactionDate", "-id"). Pages are fetched with a WHERE on the
+    last seen key instead of OFFSET, so every page costs the same as the first.
+    Cursors are opaque base64 strings; the total count is only computed on request.
+    """
+
+    def __init__(self, ordering, default_page_size=20):
+        self.ordering = tuple(ordering)
+        self.fields = tuple(name.lstrip("-") for name in self.ordering)
+        self.descending = self.ordering[0].startswith("-")
+        self.page_size = default_page_size
+        self.page_size_query_param = 'page_size'
+        self.max_page_size = 100
+
+    def _get_page_size(self, request):
+        try:
+            page_size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            page_size = self.page_size
+        return max(1, min(page_size, self.max_page_size))
+
+    @staticmethod
+    def _row_value(row, field):
+        return row[field] if isinstance(row, dict) else getattr(row, field)
+
+    def encode_cursor(self, row, reverse=False):
+        values = []
+        for field in self.fields:
+            value = self._row_value(row, field)
+            values.append({"dt": value.isoformat()} if isinstance(value, datetime) else value)
+        payload = json.dumps({"v": values, "r": reverse}, separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+    def decode_cursor(self, cursor):
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8"))
+            values = [
+                parse_datetime(value["dt"]) if isinstance(value, dict) else value
+                for value in payload["v"]
+            ]
+            if len(values) != len(self.fields) or any(value is None for value in values):
+                raise ValueError
+            return values, bool(payload.get("r"))
+        except (TypeError, ValueError, KeyError, binascii.Error):
+            raise NotFound("Invalid cursor.")
+
+    def _seek(self, values, forward):
+        # Moving "forward" follows the ordering; descending order means smaller keys
+        lookup = "lt" if forward == self.descending else "gt"
+        first, second = self.fields
+        return Q(**{f"{first}__{lookup}": values[0]}) | Q(**{first: values[0], f"{second}__{lookup}": values[1]})
+
+    def _reverse_ordering(self):
+        return tuple(name[1:] if name.startswith("-") else f"-{name}" for name in self.ordering)
+
+    def paginate_queryset(self, queryset, request, include_total=False):
+        page_size = self._get_page_size(request)
+        cursor = request.query_params.get("cursor")
+        total_items = queryset.count() if include_total else None
+
+        if not cursor:
+            rows = list(queryset.order_by(*self.ordering)[:page_size + 1])
+            has_next, has_previous = len(rows) > page_size, False
+            rows = rows[:page_size]
+        else:
+            values, reverse = self.decode_cursor(cursor)
+            if not reverse:
+                rows = list(queryset.filter(self._seek(values, forward=True)).order_by(*self.ordering)[:page_size + 1])
+                has_next, has_previous = len(rows) > page_size, True
+                rows = rows[:page_size]
+            else:
+                rows = list(queryset.filter(self._seek(values, forward=False)).order_by(*self._reverse_ordering())[:page_size + 1])
+                has_next, has_previous = True, len(rows) > page_size
+                rows = rows[:page_size][::-1]
+
+        meta = {
+            'page_size': page_size,
+            'next_cursor': self.encode_cursor(rows[-1]) if rows and has_next else None,
+            'previous_cursor': self.encode_cursor(rows[0], reverse=True) if rows and has_previous else None,
+        }
+        if include_total:
+            meta['total_items'] = total_items
+        return rows, meta
+
+
+def cursor_paginate(request, queryset, ordering=("-CrdTrnsTransactionDate", "-id"), data_per_page=20):
+    """
+    Keyset counterpart of paginate(). Pass ?cursor=<next_cursor or previous_cursor>
+    to move between pages and ?include_total=true to also get the total count.
+    """
+    paginator = KeysetPagination(ordering, data_per_page)
+    include_total = str(request.query_params.get("include_total", "")).lower() in ["true", "1"]
+    return paginator.paginate_queryset(queryset, request, include_total=include_total)
+
 """
     =====> How to use: <=======
 
@@ -48,4 +153,16 @@ def paginate(request, queryset, data_per_page = 20):
         "user_list": serialized_data,
         'pagination_meta_data': pagemator_meta_data,
     })
-"""
\ No newline at end of file
+"""
+
+"""
+    =====> Cursor mode: <=======
+
+    page, pagemator_meta_data = cursor_paginate(
+        request,
+        transactions,
+        ordering=("-CrdTrnsTransactionDate", "-id"),
+        data_per_page=10
+    )
+    # pagemator_meta_data -> {"page_size", "next_cursor", "previous_cursor"[, "total_items"]}
+"""
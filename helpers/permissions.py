@@ -0,0 +1,17 @@
+import hmac
+from django.conf import settings
+from rest_framework.permissions import BasePermission
+
+
+class HasInternalToken(BasePermission):
+    """
+    Allow service-to-service calls (e.g. from the auth server) that send the
+    shared secret in the X-Internal-Token header. Denies everything when
+    INTERNAL_API_TOKEN is not configured.
+    """
+    message = "A valid X-Internal-Token header is required."
+
+    def has_permission(self, request, view):
+        expected = settings.INTERNAL_API_TOKEN
+        provided = request.headers.get("X-Internal-Token", "")
+        return bool(expected) and hmac.compare_digest(provided.encode("utf-8"), expected.encode("utf-8"))
@@ -0,0 +1,105 @@
+"""
+    Read-through cache for auth-server lookups, backed by Django's cache framework.
+
+    Each entry is stored as {"value": ..., "fresh_until": <epoch seconds>} and kept
+    in the cache for ttl + stale_ttl seconds. Within ttl the value is served as is.
+    After that, and until the entry expires, the stale value is still served while
+    a single background refresh reloads it. Empty (None) results are not cached.
+
+    =====> How to use: <=======
+
+    details = read_through(
+        "member_card",
+        card_number,
+        lambda: _fetch_member_details_by_card(card_number),
+        ttl=300,
+        stale_ttl=3600,
+    )
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.cache import cache
+from helpers.singleflight import auth_flight
+
+logger = logging.getLogger(__name__)
+
+_refresh_executor = None
+
+
+def _get_refresh_executor():
+    global _refresh_executor
+    if _refresh_executor is None:
+        _refresh_executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, "REMOTE_CACHE_REFRESH_WORKERS", 2),
+            thread_name_prefix="remote-cache-refresh",
+        )
+    return _refresh_executor
+
+
+def cache_key(namespace, key):
+    return f"remote:{namespace}:{key}"
+
+
+def store(namespace, key, value, ttl, stale_ttl):
+    cache.set(
+        cache_key(namespace, key),
+        {"value": value, "fresh_until": time.time() + ttl},
+        ttl + stale_ttl,
+    )
+
+
+def invalidate(namespace, key):
+    cache.delete(cache_key(namespace, key))
+
+
+def peek(namespace, key):
+    """Return the cached value (fresh or stale) without loading it, or None."""
+    entry = cache.get(cache_key(namespace, key))
+    return entry["value"] if entry else None
+
+
+def get_fresh_many(namespace, keys):
+    """Return {key: value} for the keys that have a fresh entry in the cache."""
+    keys_by_cache_key = {cache_key(namespace, key): key for key in keys}
+    now = time.time()
+    return {
+        keys_by_cache_key[k]: entry["value"]
+        for k, entry in cache.get_many(list(keys_by_cache_key)).items()
+        if entry["fresh_until"] > now
+    }
+
+
+def _load(namespace, key, loader, ttl, stale_ttl):
+    value = loader()
+    if value is not None:
+        store(namespace, key, value, ttl, stale_ttl)
+    return value
+
+
+def _refresh(namespace, key, loader, ttl, stale_ttl):
+    try:
+        _load(namespace, key, loader, ttl, stale_ttl)
+    except Exception:
+        logger.exception("Background refresh of %s failed", cache_key(namespace, key))
+    finally:
+        cache.delete(cache_key(namespace, key) + ":refreshing")
+
+
+def read_through(namespace, key, loader, ttl, stale_ttl):
+    entry = cache.get(cache_key(namespace, key))
+    if entry is None:
+        # Concurrent misses for the same key share one remote call
+        return auth_flight.do(
+            cache_key(namespace, key),
+            lambda: _load(namespace, key, loader, ttl, stale_ttl)
+        )
+
+    if entry["fresh_until"] <= time.time():
+        # Stale: serve the old value and let exactly one worker refresh it
+        if cache.add(cache_key(namespace, key) + ":refreshing", 1, timeout=30):
+            _get_refresh_executor().submit(_refresh, namespace, key, loader, ttl, stale_ttl)
+
+    return entry["value"]
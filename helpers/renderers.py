@@ -0,0 +1,112 @@
+"""
+    JSON renderer and parser backed by orjson.
+
+    FastJSONRenderer produces the same JSON values as DRF's JSONRenderer with the
+    default settings (compact, UTF-8, datetimes as ISO 8601 with "Z" for UTC,
+    Decimal as a number) but encodes dicts, lists, strings, numbers, datetimes,
+    dates and UUIDs in orjson's C code. Decimal is converted in a small default
+    hook; anything else orjson cannot encode (lazy strings, querysets,
+    timedeltas, ...) goes through DRF's encoder for that value only.
+
+    The bytes can differ in float exponents: orjson writes 1e16 and 1e-7 where
+    the stdlib writes 1e+16 and 1e-07 (same value once parsed). NaN and
+    Infinity, which orjson would write as null, are handed to DRF's renderer,
+    so they raise ValueError under STRICT_JSON as before.
+
+    orjson is optional: without it, or with FAST_JSON_ENABLED=False, both classes
+    behave exactly like DRF's JSONRenderer / JSONParser. Indented output (the
+    browsable API, ?indent=) always uses DRF's renderer.
+"""
+
+import decimal
+import math
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+_fallback_encoder = JSONEncoder()
+
+ORJSON_OPTIONS = 0
+if orjson is not None:
+    ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj):
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    return _fallback_encoder.default(obj)
+
+
+def fast_json_enabled():
+    return orjson is not None and settings.FAST_JSON_ENABLED
+
+
+def has_non_finite(data):
+    """True if a float or Decimal in data is NaN or +-Infinity."""
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, float):
+            if not math.isfinite(value):
+                return True
+        elif isinstance(value, decimal.Decimal):
+            if not value.is_finite():
+                return True
+        elif isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+    return False
+
+
+def dumps(data):
+    """data as compact UTF-8 JSON bytes, the same as DRF's JSONRenderer output."""
+    ret = orjson.dumps(data, default=_default, option=ORJSON_OPTIONS)
+    # Like DRF: escape the two characters that are valid JSON but not valid JavaScript
+    if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+        ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+    return ret
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if not fast_json_enabled() or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = dumps(data)
+        except TypeError:
+            # e.g. integers beyond 64 bits, which orjson rejects and the stdlib encodes
+            return super().render(data, accepted_media_type, renderer_context)
+        # orjson writes NaN/Infinity as null, so output without a null cannot have had any
+        if b"null" in ret and has_non_finite(data):
+            return super().render(data, accepted_media_type, renderer_context)
+        return ret
+
+
+class FastJSONParser(JSONParser):
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if not fast_json_enabled():
+            return super().parse(stream, media_type, parser_context)
+
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        try:
+            body = stream.read() if stream is not None else b""
+            if encoding.lower().replace("-", "") != "utf8":
+                body = body.decode(encoding)
+            return orjson.loads(body)
+        except (ValueError, UnicodeDecodeError) as exc:
+            raise ParseError("JSON parse error - %s" % str(exc))
@@ -0,0 +1,62 @@
+"""
+    Request coalescing ("single flight") for remote lookups.
+
+    When several threads of the same process ask for the same key at the same
+    time, only the first one runs the call; the others wait for it and share its
+    result (or its exception). Nothing is cached once the call has finished.
+
+    =====> How to use: <=======
+
+    result = auth_flight.do(("/api/get-primary-card/", card_number, business_id), fetch)
+"""
+
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._stats = {"calls": 0, "deduplicated": 0}
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._stats["calls"] += 1
+            else:
+                self._stats["deduplicated"] += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return call.result
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, in_flight=len(self._calls))
+
+
+# Shared group for all auth-server lookups of this process
+auth_flight = SingleFlight()
@@ -0,0 +1,77 @@
+import hashlib
+import threading
+from django.conf import settings
+from django.core.cache import cache
+
+# Every TokenVerificationCache by namespace, so a revoked token can be dropped from all of them
+_caches = {}
+
+
+class TokenVerificationCache:
+    """
+    Caches the outcome of SSO token verification so that repeat calls with the
+    same token do not hit the auth server. Tokens are never stored in clear,
+    only a SHA-256 digest is used as the cache key.
+
+    Accepted tokens keep the resolved user payload for SSO_TOKEN_CACHE_TTL
+    seconds, rejected tokens are remembered for SSO_TOKEN_NEGATIVE_CACHE_TTL.
+
+    A token logged out or revoked at the auth server stays accepted here until
+    its entry expires, i.e. for up to SSO_TOKEN_CACHE_TTL seconds, unless the
+    auth server reports the revocation (TokenRevokeApi -> revoke_token).
+    """
+
+    def __init__(self, namespace):
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "negative_hits": 0, "misses": 0, "invalidations": 0}
+        _caches[namespace] = self
+
+    def _key(self, token):
+        digest = hashlib.sha256(token.encode("utf-8")).hexdigest()
+        return f"sso_token:{self.namespace}:{digest}"
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def get(self, token):
+        """
+        Return the cached entry for a token or None on a miss.
+        The entry is a dict: {"valid": True, "user": {...}} or {"valid": False}.
+        """
+        entry = cache.get(self._key(token))
+        if entry is None:
+            self._count("misses")
+        elif entry.get("valid"):
+            self._count("hits")
+        else:
+            self._count("negative_hits")
+        return entry
+
+    def set_valid(self, token, user_data):
+        ttl = getattr(settings, "SSO_TOKEN_CACHE_TTL", 300)
+        if ttl > 0:
+            cache.set(self._key(token), {"valid": True, "user": user_data}, ttl)
+
+    def set_rejected(self, token):
+        ttl = getattr(settings, "SSO_TOKEN_NEGATIVE_CACHE_TTL", 30)
+        if ttl > 0:
+            cache.set(self._key(token), {"valid": False}, ttl)
+
+    def invalidate(self, token):
+        cache.delete(self._key(token))
+        self._count("invalidations")
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["negative_hits"] + stats["misses"]
+        stats["hit_ratio"] = round((stats["hits"] + stats["negative_hits"]) / lookups, 4) if lookups else 0.0
+        return stats
+
+
+def revoke_token(token):
+    """Drop a token from every verification cache (business, member and staff tokens)."""
+    for token_cache in _caches.values():
+        token_cache.invalidate(token)
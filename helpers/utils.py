@@ -1,66 +1,129 @@
+import hashlib
+import logging
 import random
 import requests
 from django.core.cache import cache
 import urllib.parse
 import pytz
-from datetime import datetime
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 from django.conf import settings
+from django.db import IntegrityError, transaction
+from helpers.http_client import auth_get
+from helpers import remote_cache
+from helpers.exceptions import AuthServiceUnavailable
+from django.utils import timezone
+from notifications.models import SmsOutbox
+
+logger = logging.getLogger(__name__)
+
+
+def _sms_gateway_url(mobile_number, message):
+    # URL encode the message
+    encoded_message = requests.utils.quote(message)
+    return f"https://7l7dy2zq63.execute-api.ap-south-1.amazonaws.com/default/smsapi/?option=publishMessage&passKey=IamJiseniorJi@374&phoneNumber={mobile_number}&customMessage={encoded_message}"
+
 
 def send_sms(payload):
+    """Send an SMS synchronously. Request handlers should use queue_sms instead."""
     mobile_number = payload.get("mobile_number")
     message = payload.get("message")
-    
-    print(mobile_number, message, "--------------------------------")
 
     if not mobile_number or not message:
         return {"error": "Mobile number and message are required"}
 
-    # URL encode the message
-    encoded_message = requests.utils.quote(message)
-    print(f"Encoded message: {encoded_message}")
-
-    # Replace this with your actual API URL
-    sms_api_url = f"https://7l7dy2zq63.execute-api.ap-south-1.amazonaws.com/default/smsapi/?option=publishMessage&passKey=IamJiseniorJi@374&phoneNumber={mobile_number}&customMessage={encoded_message}"
-
     try:
-        response = requests.get(sms_api_url)
+        response = requests.get(_sms_gateway_url(mobile_number, message), timeout=settings.SMS_SEND_TIMEOUT)
         print(f"API Response: {response.text}")
         if response.status_code == 200:
             return {"message": "SMS sent successfully"}
         else:
-            return {"error": "Failed to send SMS:{response.text}"}
+            return {"error": f"Failed to send SMS:{response.text}"}
     except Exception as e:
         print(f"Exception: {str(e)}")
         return {"error": str(e)}
-    
-    
+
+
+def queue_sms(payload, business_id=0):
+    """
+    Queue an SMS for `manage.py run_sms_queue` and return the SmsOutbox row.
+
+    The same message to the same number within SMS_DEDUP_WINDOW_SECONDS is not
+    queued again; the earlier row is returned instead, so repeated taps send one SMS.
+    Concurrent requests are settled by the unique (dedup_key, dedup_window)
+    constraint on SmsOutbox, where dedup_window numbers fixed windows of that length.
+    Returns None when the mobile number or message is missing.
+    """
+    mobile_number = payload.get("mobile_number")
+    message = payload.get("message")
+
+    if not mobile_number or not message:
+        logger.warning("Not queueing SMS: mobile number and message are required")
+        return None
+
+    dedup_key = hashlib.sha256(f"{mobile_number}|{message}".encode("utf-8")).hexdigest()
+    now = timezone.now()
+    window_seconds = settings.SMS_DEDUP_WINDOW_SECONDS
+    not_dead = SmsOutbox.objects.filter(dedup_key=dedup_key).exclude(status=SmsOutbox.STATUS_DEAD)
+    existing = (
+        not_dead.filter(created_at__gte=now - timedelta(seconds=window_seconds))
+        .order_by("-created_at")
+        .first()
+    )
+    if existing:
+        return existing
+
+    dedup_window = int(now.timestamp()) // max(window_seconds, 1)
+    try:
+        with transaction.atomic():
+            return SmsOutbox.objects.create(
+                business_id=business_id or 0,
+                mobile_number=mobile_number,
+                message=message,
+                dedup_key=dedup_key,
+                dedup_window=dedup_window,
+            )
+    except IntegrityError:
+        # A concurrent request queued the same message first
+        return not_dead.get(dedup_window=dedup_window)
+
+
+def deliver_sms(sms):
+    """Send one SmsOutbox row through the gateway; raises so the worker can retry."""
+    response = requests.get(_sms_gateway_url(sms.mobile_number, sms.message), timeout=settings.SMS_SEND_TIMEOUT)
+    if response.status_code != 200:
+        raise requests.HTTPError(f"Status: {response.status_code}, Response: {response.text[:500]}")
+
+
 
 # AUTH_SERVICE_MOBILE_URL =  settings.AUTH_SERVER_URL + "/member-details/",
 
-def get_member_details_by_mobile(mobile_number):
+def _fetch_member_details_by_mobile(mobile_number):
     try:
-        response = requests.get(settings.AUTH_SERVER_URL + "/api/member-details/", params={"mobile_number": mobile_number})
+        response = auth_get("/api/member-details/", params={"mobile_number": mobile_number})
         if response.status_code == 200:
             return response.json()
         return None
     except requests.RequestException as e:
-        print(f"Error contacting auth service: {e}")
-        return None
+        # Includes CircuitOpenError; "unreachable" must not look like "not found"
+        logger.warning("Error contacting auth service: %s", e)
+        raise AuthServiceUnavailable()
     
     
 
 
 # AUTH_SERVICE_CARD_URL = settings.AUTH_SERVER_URL + "/cardno/member-details/",  
 
-def get_member_details_by_card(card_number):
+def _fetch_member_details_by_card(card_number):
     try:
-        response = requests.get(settings.AUTH_SERVER_URL + "/api/cardno/member-details/", params={"card_number": card_number})
+        response = auth_get("/api/cardno/member-details/", params={"card_number": card_number})
         if response.status_code == 200:
             return response.json()
         return None
     except requests.RequestException as e:
-        print(f"Error contacting auth service: {e}")
-        return None
+        # Includes CircuitOpenError; "unreachable" must not look like "not found"
+        logger.warning("Error contacting auth service: %s", e)
+        raise AuthServiceUnavailable()
     
     
     
@@ -68,14 +131,126 @@ def get_member_details_by_card(card_number):
     
 # AUTH_SERVICE_BUSINESS_URL = settings.AUTH_SERVER_URL + "/business/details/",
 
-def get_business_details_by_id(business_id):
+def _fetch_business_details_by_id(business_id):
     try:
-        response = requests.get(settings.AUTH_SERVER_URL + "/api/business/details/", params={"business_id": business_id})
+        response = auth_get("/api/business/details/", params={"business_id": business_id})
         if response.status_code == 200:
             return response.json()
         return None
     except requests.RequestException as e:
-        print(f"Error contacting auth service: {e}")
-        return None
+        # Includes CircuitOpenError; "unreachable" must not look like "not found"
+        logger.warning("Error contacting auth service: %s", e)
+        raise AuthServiceUnavailable()
+
+
+
+# -------------- cached lookups (read-through with stale-while-revalidate) --------------
+# None when the auth server has no such member/business; AuthServiceUnavailable (503)
+# when it cannot be reached and nothing is cached, stale or fresh.
+
+def _member_ttls():
+    return settings.MEMBER_DETAILS_CACHE_TTL, settings.REMOTE_CACHE_STALE_TTL
+
+
+def _business_ttls():
+    return settings.BUSINESS_DETAILS_CACHE_TTL, settings.REMOTE_CACHE_STALE_TTL
+
+
+def get_member_details_by_mobile(mobile_number):
+    ttl, stale_ttl = _member_ttls()
+    return remote_cache.read_through(
+        "member_mobile", mobile_number,
+        lambda: _fetch_member_details_by_mobile(mobile_number),
+        ttl, stale_ttl
+    )
+
+
+def get_member_details_by_card(card_number):
+    ttl, stale_ttl = _member_ttls()
+    return remote_cache.read_through(
+        "member_card", card_number,
+        lambda: _fetch_member_details_by_card(card_number),
+        ttl, stale_ttl
+    )
+
+
+def get_business_details_by_id(business_id):
+    ttl, stale_ttl = _business_ttls()
+    return remote_cache.read_through(
+        "business", business_id,
+        lambda: _fetch_business_details_by_id(business_id),
+        ttl, stale_ttl
+    )
+
+
+def invalidate_member_details(card_number=None, mobile_number=None):
+    """
+    Drop cached member details. Invalidating by card also drops the entry
+    cached under the member's mobile number when it is known.
+    """
+    if card_number is not None:
+        cached = remote_cache.peek("member_card", card_number) or {}
+        remote_cache.invalidate("member_card", card_number)
+        mobile_number = mobile_number or cached.get("mobile_number")
+    if mobile_number is not None:
+        remote_cache.invalidate("member_mobile", mobile_number)
+
+
+def invalidate_business_details(business_id):
+    remote_cache.invalidate("business", business_id)
+
+
+
+
+_lookup_executor = None
+
+
+def _get_lookup_executor():
+    global _lookup_executor
+    if _lookup_executor is None:
+        _lookup_executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, "AUTH_LOOKUP_MAX_WORKERS", 8),
+            thread_name_prefix="auth-lookup",
+        )
+    return _lookup_executor
+
+
+def _lookup_many(namespace, keys, lookup):
+    """
+    Fresh cache entries are served in one multi-get; the rest are looked up
+    with `lookup` in chunks over the shared lookup pool. Returns {key: value or None};
+    keys that could not be looked up because the auth server is unavailable are None.
+    """
+    def lookup_or_none(key):
+        try:
+            return lookup(key)
+        except AuthServiceUnavailable:
+            return None
+
+    unique_keys = list(dict.fromkeys(keys))
+    chunk_size = getattr(settings, "AUTH_LOOKUP_CHUNK_SIZE", 50)
+    executor = _get_lookup_executor()
+
+    results = remote_cache.get_fresh_many(namespace, unique_keys)
+    pending = [key for key in unique_keys if key not in results]
+
+    for start in range(0, len(pending), chunk_size):
+        chunk = pending[start:start + chunk_size]
+        for key, value in zip(chunk, executor.map(lookup_or_none, chunk)):
+            results[key] = value
+    return results
+
+
+def get_member_details_by_cards(card_numbers):
+    """
+    Resolve member details for many cards at once.
+    The auth server has no bulk endpoint, so lookups are fanned out in chunks
+    over a bounded, process-wide thread pool that reuses pooled connections.
+    Returns a dict of {card_number: member details or None}.
+    """
+    return _lookup_many("member_card", card_numbers, get_member_details_by_card)
 
 
+def get_business_details_by_ids(business_ids):
+    """Same as get_member_details_by_cards, for business details: {business_id: details or None}."""
+    return _lookup_many("business", business_ids, get_business_details_by_id)
@@ -2,7 +2,11 @@ from rest_framework.authentication import BaseAuthentication
 from rest_framework.exceptions import AuthenticationFailed
 import requests
 from django.conf import settings
+from helpers.exceptions import AuthServiceUnavailable
+from helpers.http_client import auth_post
+from helpers.token_cache import TokenVerificationCache
 
+token_cache = TokenVerificationCache("member")
 
 class SSOMemberTokenAuthentication(BaseAuthentication):
     def authenticate(self, request):
@@ -12,25 +16,38 @@ class SSOMemberTokenAuthentication(BaseAuthentication):
 
         token = auth_header.split("Token ")[1]
 
+        # Serve repeat tokens from the verification cache
+        cached = token_cache.get(token)
+        if cached is not None:
+            if not cached.get("valid"):
+                raise AuthenticationFailed("Invalid or expired token.")
+            return (AuthenticatedMemberUser(**cached["user"]), None)
+
         try:
-            response = requests.post(
-                settings.AUTH_SERVER_URL + "/api/member/verify-token/",
+            response = auth_post(
+                "/api/member/verify-token/",
                 json={"token": token},
-                timeout=5
             )
+            if response.status_code >= 500:
+                raise AuthServiceUnavailable()
             if response.status_code != 200:
+                if 400 <= response.status_code < 500:
+                    token_cache.set_rejected(token)
                 raise AuthenticationFailed("Invalid or expired token.")
 
             data = response.json()
-            user = AuthenticatedMemberUser(
-                id=data["user_id"],
-                mbrcardno=data["mbrcardno"],
-                full_name=data["full_name"]
-            )
+            user_data = {
+                "id": data["user_id"],
+                "mbrcardno": data["mbrcardno"],
+                "full_name": data["full_name"],
+            }
+            token_cache.set_valid(token, user_data)
+            user = AuthenticatedMemberUser(**user_data)
             print(user,"==============")
             return (user, None)
         except requests.RequestException:
-            raise AuthenticationFailed("Authentication service unreachable.")
+            # Includes CircuitOpenError: fail fast with 503 so clients retry instead of logging out
+            raise AuthServiceUnavailable()
 
 
 
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from business.models import  BusinessMember, CumulativePoints
 from member import models
+from helpers.fast_serializers import ValuesSerializer
 
 
 
@@ -26,6 +27,9 @@ class CumulativePointsSerializer(serializers.ModelSerializer):
         ]
 
 
+cumulative_points_rows = ValuesSerializer(CumulativePointsSerializer)
+
+
 class SelfMemberActiveSerializer(serializers.ModelSerializer):
     # BizMbrCardNo = serializers.CharField(source="BizMbrCardNo.mbrcardno")  # Get card number from related Member model
 
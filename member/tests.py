@@ -1,3 +1,240 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest.mock import patch
 
-# Create your tests here.
+import requests
+from django.core.cache import cache
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIRequestFactory, force_authenticate
+from business.models import BusinessCardDesign, BusinessMember, BusinessRewardRule, CardTransaction, CumulativePoints
+from member.authentication import AuthenticatedMemberUser, SSOMemberTokenAuthentication
+from member.views import (
+    BusinessStoreDetailsApi, BusinessStoreListApi, MemberDashboardApi, MemberQRScanAPIView,
+    MemberTransactionHistoryApi,
+)
+from helpers.exceptions import AuthServiceUnavailable
+from helpers.token_cache import revoke_token
+
+
+BUSINESS_ID = 701
+CARD_NUMBER = 100000000701
+
+
+class _VerifyResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+    def json(self):
+        return {"user_id": 9, "mbrcardno": CARD_NUMBER, "full_name": "Member"}
+
+
+class SSOMemberTokenCacheTests(SimpleTestCase):
+    """Member tokens share the verification cache of helpers/token_cache.py."""
+
+    def setUp(self):
+        cache.clear()
+
+    def authenticate(self):
+        request = RequestFactory().get("/member/stores/", HTTP_AUTHORIZATION="Token member-token")
+        return SSOMemberTokenAuthentication().authenticate(request)
+
+    def test_accepted_token_cached_until_revoked(self):
+        with patch("member.authentication.auth_post", return_value=_VerifyResponse(200)) as auth_post:
+            self.authenticate()
+            user, _ = self.authenticate()
+            self.assertEqual(user.mbrcardno, CARD_NUMBER)
+            self.assertEqual(auth_post.call_count, 1)
+
+            revoke_token("member-token")
+            self.authenticate()
+            self.assertEqual(auth_post.call_count, 2)
+
+    def test_rejected_token_cached(self):
+        with patch("member.authentication.auth_post", return_value=_VerifyResponse(401)) as auth_post:
+            for _ in range(2):
+                with self.assertRaises(AuthenticationFailed):
+                    self.authenticate()
+            self.assertEqual(auth_post.call_count, 1)
+
+
+@patch("member.views.get_business_details_by_id", lambda business_id: {"business_id": business_id})
+class MemberTransactionHistoryTests(TestCase):
+    """Transaction history comes in bounded cursor pages, newest first."""
+
+    @classmethod
+    def setUpTestData(cls):
+        for amount in range(25):
+            CardTransaction.objects.create(
+                CrdTrnsBizId=BUSINESS_ID, CrdTrnsCardNumber=CARD_NUMBER, CrdTrnsPurchaseAmount=amount,
+                CrdTrnsPoint=1, CrdTrnsTransactionType="Points_Earned",
+            )
+
+    def get(self, query=""):
+        request = APIRequestFactory().get(f"/member/reward/transactions/{BUSINESS_ID}/{query}")
+        force_authenticate(request, user=AuthenticatedMemberUser(id=1, mbrcardno=CARD_NUMBER, full_name="Member"))
+        return MemberTransactionHistoryApi.as_view()(request, biz_id=BUSINESS_ID)
+
+    @override_settings(MEMBER_TRANSACTION_HISTORY_PAGE_SIZE=10)
+    def test_first_page_by_default(self):
+        response = self.get()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["transactions"]), 10)
+        self.assertIsNotNone(response.data["pagination_meta_data"]["next_cursor"])
+
+    def test_cursor_pages(self):
+        first = self.get("?page_size=20")
+        rest = self.get(f"?cursor={first.data['pagination_meta_data']['next_cursor']}&page_size=20")
+
+        self.assertEqual(len(first.data["transactions"]), 20)
+        self.assertEqual(len(rest.data["transactions"]), 5)
+        self.assertIsNone(rest.data["pagination_meta_data"]["next_cursor"])
+        ids = [row["id"] for row in first.data["transactions"] + rest.data["transactions"]]
+        self.assertEqual(len(set(ids)), 25)
+
+
+def _member_request(method, path, **kwargs):
+    request = getattr(APIRequestFactory(), method)(path, **kwargs)
+    force_authenticate(request, user=AuthenticatedMemberUser(id=1, mbrcardno=CARD_NUMBER, full_name="Member"))
+    return request
+
+
+@patch("helpers.utils.auth_get", side_effect=requests.ConnectionError("auth server down"))
+class AuthOutageTests(TestCase):
+    """An auth-server outage is a 503, not "not found" or a 500."""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_store_details(self, auth_get):
+        request = _member_request("get", f"/member/business-store/details/{BUSINESS_ID}/")
+        response = BusinessStoreDetailsApi.as_view()(request, biz_id=BUSINESS_ID)
+
+        self.assertEqual(response.status_code, 503)
+
+    def test_scan_join_request(self, auth_get):
+        response = MemberQRScanAPIView.as_view()(_member_request("post", f"/member/scan/?Biz_Id={BUSINESS_ID}"))
+
+        self.assertEqual(response.status_code, 503)
+
+    def test_store_list(self, auth_get):
+        with patch("member.views.get_business_details_by_ids", side_effect=AuthServiceUnavailable()):
+            response = BusinessStoreListApi.as_view()(_member_request("get", "/member/business-store/"))
+
+        self.assertEqual(response.status_code, 503)
+
+
+def _add_store(business_id, milestone=None, active=True):
+    rule = BusinessRewardRule.objects.create(
+        RewardRuleBizId=business_id, RewardRuleType="flat", RewardRuleNotionalValue=1, RewardRuleMilestone=milestone,
+    )
+    BusinessCardDesign.objects.create(CardDsgBizId=business_id, CardDsgDesignTemplateId=f"design-{business_id}")
+    CumulativePoints.objects.create(
+        CmltvPntsMbrCardNo=CARD_NUMBER, CmltvPntsBizId=business_id, LifetimeEarnedPoints=120, CurrentBalance=70,
+        TotalPurchaseAmount=1200, LifetimeRedeemedPoints=50,
+    )
+    return BusinessMember.objects.create(
+        BizMbrBizId=business_id, BizMbrCardNo=CARD_NUMBER, BizMbrRuleId=rule, BizMbrIsActive=active,
+    )
+
+
+def _business_names(business_ids):
+    return {
+        business_id: {"business_id": business_id, "business_name": f"Store {business_id}"}
+        for business_id in business_ids
+    }
+
+
+@patch("member.views.get_business_details_by_ids", _business_names)
+class BusinessStoreListTests(TestCase):
+    """The store list runs the same queries for one store as for many."""
+
+    def get(self):
+        return BusinessStoreListApi.as_view()(_member_request("get", "/member/business-store/"))
+
+    def test_query_count_does_not_grow_with_stores(self):
+        _add_store(BUSINESS_ID)
+        with self.assertNumQueries(3):
+            self.assertEqual(len(self.get().data["businesses"]), 1)
+
+        for offset in range(1, 8):
+            _add_store(BUSINESS_ID + offset)
+        with self.assertNumQueries(3):
+            businesses = self.get().data["businesses"]
+
+        self.assertEqual(len(businesses), 8)
+        self.assertEqual(businesses[3], {
+            "business_id": BUSINESS_ID + 3,
+            "business_name": f"Store {BUSINESS_ID + 3}",
+            "CardDsgDesignTemplateId": f"design-{BUSINESS_ID + 3}",
+            "CardDsgAddLogo": None,
+            "CardDsgBackgroundColor": "#FFFFFF",
+            "CardDsgTextColor": "#000000",
+            "CardDsgCreationDate": businesses[3]["CardDsgCreationDate"],
+            "CurrentBalance": 70,
+            "fullname": "Member",
+            "cardno": CARD_NUMBER,
+        })
+
+
+@patch("member.views.get_business_details_by_ids", _business_names)
+@patch("member.views.get_business_details_by_id", lambda business_id: _business_names([business_id])[business_id])
+class MemberDashboardTests(TestCase):
+    """The dashboard matches the per-store calls it replaces: store details and transaction history."""
+
+    detail_fields = (
+        "business_name", "CardDsgDesignTemplateId", "CardDsgBackgroundColor", "CardDsgTextColor",
+        "LifetimeEarnedPoints", "LifetimeRedeemedPoints", "CurrentBalance", "TotalPurchaseAmount",
+        "MilestoneValue", "AchievedMilestones", "PointsToNextMilestone", "IsEligible", "RewardInfo",
+    )
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.business_ids = [BUSINESS_ID + offset for offset in range(4)]
+        _add_store(cls.business_ids[0], milestone=50)
+        _add_store(cls.business_ids[1], milestone=50, active=False)  # milestones only for active members
+        _add_store(cls.business_ids[2])
+        old = _add_store(cls.business_ids[3], milestone=40, active=False)
+        BusinessMember.objects.create(
+            BizMbrBizId=old.BizMbrBizId, BizMbrCardNo=CARD_NUMBER, BizMbrRuleId=old.BizMbrRuleId, BizMbrIsActive=True,
+        )
+
+        now = timezone.now()
+        for index, business_id in enumerate(cls.business_ids):
+            for n in range(index + 2):
+                transaction = CardTransaction.objects.create(
+                    CrdTrnsBizId=business_id, CrdTrnsCardNumber=CARD_NUMBER, CrdTrnsPurchaseAmount=n,
+                    CrdTrnsPoint=n, CrdTrnsTransactionType="Points_Earned",
+                )
+                # pairs of rows share a timestamp, so the id decides their order
+                CardTransaction.objects.filter(pk=transaction.pk).update(
+                    CrdTrnsTransactionDate=now - timedelta(minutes=n // 2)
+                )
+
+    def test_matches_per_store_calls(self):
+        last_k = 3
+        request = _member_request("get", f"/member/dashboard/?transactions={last_k}")
+        with self.assertNumQueries(4):
+            stores = MemberDashboardApi.as_view()(request).data["stores"]
+
+        self.assertEqual([store["business_id"] for store in stores], self.business_ids)
+        for store in stores:
+            business_id = store["business_id"]
+            details = BusinessStoreDetailsApi.as_view()(
+                _member_request("get", f"/member/business-store/details/{business_id}/"), biz_id=business_id
+            ).data
+            history = MemberTransactionHistoryApi.as_view()(
+                _member_request("get", f"/member/reward/transactions/{business_id}/?page_size={last_k}"),
+                biz_id=business_id,
+            ).data
+
+            self.assertEqual({field: store[field] for field in self.detail_fields},
+                             {field: details[field] for field in self.detail_fields})
+            self.assertEqual([row["id"] for row in store["recent_transactions"]],
+                             [row["id"] for row in history["transactions"]])
+
+        self.assertEqual((stores[0]["AchievedMilestones"], stores[0]["IsEligible"]), (2, True))
+        self.assertEqual((stores[1]["MilestoneValue"], stores[1]["RewardInfo"]), (0, None))
+        self.assertEqual(stores[3]["MilestoneValue"], 40)
+        self.assertEqual(len(stores[3]["recent_transactions"]), last_k)
@@ -8,6 +8,7 @@ urlpatterns = [
 
     path("business-store/", views.BusinessStoreListApi.as_view(), name="business-member-list-create"),
     path("business-store/details/<int:biz_id>/", views.BusinessStoreDetailsApi.as_view(), name="business-member-list-create"),
+    path("dashboard/", views.MemberDashboardApi.as_view(), name="member-dashboard"),
 
     path('member/scan/', views.MemberQRScanAPIView.as_view(), name='member-scan-qr'),
     
@@ -5,13 +5,27 @@ from rest_framework.permissions import IsAuthenticated
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from .authentication import SSOMemberTokenAuthentication
-from business.serializers import CardTransactionSerializer
+from business.serializers import CardTransactionSerializer, card_transaction_rows
+from business.reward_engine import milestone_progress
 from business.models import BusinessMember, BusinessCardDesign, CumulativePoints,CardTransaction, MemberJoinRequest
-from .serializers import MemberBusinessSotreSerializer, CumulativePointsSerializer, SelfMemberActiveSerializer
-from helpers.utils import get_business_details_by_id, get_member_details_by_card
+from .serializers import MemberBusinessSotreSerializer, SelfMemberActiveSerializer, cumulative_points_rows
+from helpers.exceptions import AuthServiceUnavailable
+from helpers.utils import get_business_details_by_id, get_business_details_by_ids, get_member_details_by_card
 from django.utils import timezone
-from django.db.models import Q
+from django.conf import settings
+from django.db.models import F, Q, Window
+from django.db.models.functions import RowNumber
 from helpers.emails import send_template_email
+from helpers.pagination import cursor_paginate
+
+
+CARD_DESIGN_FIELDS = (
+    "CardDsgDesignTemplateId",
+    "CardDsgAddLogo",
+    "CardDsgBackgroundColor",
+    "CardDsgTextColor",
+    "CardDsgCreationDate",
+)
 
 
 class BusinessStoreListApi(APIView):
@@ -41,35 +55,35 @@ class BusinessStoreListApi(APIView):
                     status=status.HTTP_404_NOT_FOUND
                 )
 
-            # Fetch all BusinessMember records where BizMbrCardNo matches the member
-            business_memberships = BusinessMember.objects.filter(BizMbrCardNo=member)
+            # One query each for memberships, card designs and balances, one batched
+            # (cached) lookup for business names, however many stores the member has
+            business_ids = list(
+                BusinessMember.objects.filter(BizMbrCardNo=member).values_list("BizMbrBizId", flat=True)
+            )
+            unique_business_ids = list(dict.fromkeys(business_ids))
+
+            card_designs = {}
+            for card_design in (
+                BusinessCardDesign.objects.filter(CardDsgBizId__in=unique_business_ids)
+                .order_by("CardDsgBizId", "id")
+                .values("CardDsgBizId", *CARD_DESIGN_FIELDS)
+            ):
+                card_designs.setdefault(card_design["CardDsgBizId"], card_design)  # first design per business
+
+            balances = dict(
+                CumulativePoints.objects.filter(CmltvPntsMbrCardNo=member, CmltvPntsBizId__in=unique_business_ids)
+                .values_list("CmltvPntsBizId", "CurrentBalance")
+            )
+            business_details = get_business_details_by_ids(unique_business_ids)
 
             business_data = []
-
-            for membership in business_memberships:
-                business = membership.BizMbrBizId  # Business instance
-                business_details =get_business_details_by_id(business)
-                
-                business_name=business_details.get("business_name")
-               
-                # Fetch card design for the business
-                card_design = BusinessCardDesign.objects.filter(CardDsgBizId=business).first()
-                
-                cumulative_points = CumulativePoints.objects.filter(
-                    CmltvPntsMbrCardNo=member, 
-                    CmltvPntsBizId=business
-                ).first()
-                
-                # Append business & card design details
+            for business in business_ids:
+                card_design = card_designs.get(business, {})
                 business_data.append({
                     "business_id": business,
-                    "business_name": business_name,
-                    "CardDsgDesignTemplateId": card_design.CardDsgDesignTemplateId if card_design else None,
-                    "CardDsgAddLogo": card_design.CardDsgAddLogo if card_design else None,
-                    "CardDsgBackgroundColor": card_design.CardDsgBackgroundColor if card_design else None,
-                    "CardDsgTextColor": card_design.CardDsgTextColor if card_design else None,
-                    "CardDsgCreationDate": card_design.CardDsgCreationDate if card_design else None,
-                    "CurrentBalance": cumulative_points.CurrentBalance if cumulative_points else 0.00,
+                    "business_name": (business_details.get(business) or {}).get("business_name"),
+                    **{field: card_design.get(field) for field in CARD_DESIGN_FIELDS},
+                    "CurrentBalance": balances.get(business, 0.00),
                     "fullname": request.user.full_name,  # Full name of the member
                     "cardno": request.user.mbrcardno  # Card number of the member
                 })
@@ -83,6 +97,9 @@ class BusinessStoreListApi(APIView):
                 status=status.HTTP_200_OK
             )
 
+        except AuthServiceUnavailable:
+            raise
+
         except Exception as e:
             return Response(
                 {"error": f"An unexpected error occurred: {str(e)}"},
@@ -91,6 +108,17 @@ class BusinessStoreListApi(APIView):
             
             
 
+def _reward_info(reward_rule):
+    if reward_rule is None:
+        return None
+    return {
+        "RewardRuleId": reward_rule.id,
+        "RewardRuleType": reward_rule.RewardRuleType,
+        "RewardRuleNotionalValue": reward_rule.RewardRuleNotionalValue,
+        "RewardRuleValue": reward_rule.RewardRuleValue
+    }
+
+
 class BusinessStoreDetailsApi(APIView):
     """
     List all Business stores for the logged-in member along with their card design,
@@ -171,34 +199,12 @@ class BusinessStoreDetailsApi(APIView):
         else:
             earned = current_balance = redeemed = total_purchase = 0
 
-        # Milestone logic
-        milestone_value = 0
-        achieved_milestones = 0
-        points_to_next_milestone = 0
-        is_eligible = False
-        reward_info = None
-
         biz_member = BusinessMember.objects.filter(
             BizMbrBizId=biz_id,
             BizMbrCardNo=request.user.mbrcardno,
             BizMbrIsActive=True
         ).select_related("BizMbrRuleId").first()
-
-        if biz_member and biz_member.BizMbrRuleId:
-            reward_rule = biz_member.BizMbrRuleId
-            milestone_value = reward_rule.RewardRuleMilestone or 0
-
-            if milestone_value > 0:
-                achieved_milestones = earned // milestone_value
-                points_to_next_milestone = milestone_value - (earned % milestone_value)
-                is_eligible = current_balance >= milestone_value
-
-            reward_info = {
-                "RewardRuleId": reward_rule.id,
-                "RewardRuleType": reward_rule.RewardRuleType,
-                "RewardRuleNotionalValue": reward_rule.RewardRuleNotionalValue,
-                "RewardRuleValue": reward_rule.RewardRuleValue
-            }
+        reward_rule = biz_member.BizMbrRuleId if biz_member else None
 
         response_data = {
             "BizMbrBizId": biz_id,
@@ -214,11 +220,8 @@ class BusinessStoreDetailsApi(APIView):
             "TotalPurchaseAmount": total_purchase,
             "MbrCardNo": mbr_card_no,
             "FullName": full_name,
-            "MilestoneValue": milestone_value,
-            "AchievedMilestones": achieved_milestones,
-            "PointsToNextMilestone": points_to_next_milestone if current_balance < milestone_value else 0,
-            "IsEligible": is_eligible,
-            "RewardInfo": reward_info
+            **milestone_progress(reward_rule.RewardRuleMilestone if reward_rule else 0, earned, current_balance),
+            "RewardInfo": _reward_info(reward_rule),
         }
 
         return Response(response_data, status=status.HTTP_200_OK)
@@ -227,16 +230,152 @@ class BusinessStoreDetailsApi(APIView):
     
 
 
+class MemberDashboardApi(APIView):
+    """
+    Everything the member app shows on launch in one call: every store the member
+    belongs to with its card design, balance, milestone progress and latest
+    transactions. A fixed number of queries regardless of the number of stores;
+    business names come from one batched, cached lookup.
+    """
+    authentication_classes = [SSOMemberTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="Stores, balances, milestone progress and the last transactions per store for the logged-in member.",
+        manual_parameters=[
+            openapi.Parameter(
+                'transactions',
+                openapi.IN_QUERY,
+                description="Latest transactions to return per store (default MEMBER_DASHBOARD_TRANSACTIONS, max MEMBER_DASHBOARD_MAX_TRANSACTIONS)",
+                type=openapi.TYPE_INTEGER,
+                required=False
+            ),
+        ],
+        responses={
+            200: openapi.Response(
+                description="Member dashboard",
+                examples={"application/json": {
+                    "success": True,
+                    "MbrCardNo": 100000000001,
+                    "FullName": "John Doe",
+                    "stores": [{
+                        "business_id": 12,
+                        "business_name": "Coffee House",
+                        "BizMbrIsActive": True,
+                        "CardDsgDesignTemplateId": "classic",
+                        "CardDsgAddLogo": None,
+                        "CardDsgBackgroundColor": "#FFFFFF",
+                        "CardDsgTextColor": "#000000",
+                        "CardDsgCreationDate": "2025-01-10T09:00:00Z",
+                        "LifetimeEarnedPoints": 250,
+                        "LifetimeRedeemedPoints": 100,
+                        "CurrentBalance": 150,
+                        "TotalPurchaseAmount": 2500.0,
+                        "MilestoneValue": 100,
+                        "AchievedMilestones": 2,
+                        "PointsToNextMilestone": 0,
+                        "IsEligible": True,
+                        "RewardInfo": {"RewardRuleId": 3, "RewardRuleType": "percentage", "RewardRuleNotionalValue": 1.0, "RewardRuleValue": 10.0},
+                        "recent_transactions": [{"id": 501, "CrdTrnsBizId": 12, "CrdTrnsCardNumber": 100000000001, "CrdTrnsPurchaseAmount": 250.0, "CrdTrnsPoint": 25, "CrdTrnsTransactionType": "Points_Earned", "CrdTrnsTransactionDate": "2025-03-01T12:00:00Z"}],
+                    }],
+                }}
+            ),
+            400: "Invalid transactions parameter",
+        }
+    )
+    def get(self, request):
+        card_number = request.user.mbrcardno
+        try:
+            last_k = int(request.query_params.get("transactions", settings.MEMBER_DASHBOARD_TRANSACTIONS))
+        except (TypeError, ValueError):
+            return Response({"success": False, "error": "transactions must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+        last_k = max(0, min(last_k, settings.MEMBER_DASHBOARD_MAX_TRANSACTIONS))
+
+        memberships = list(
+            BusinessMember.objects.filter(BizMbrCardNo=card_number).select_related("BizMbrRuleId").order_by("id")
+        )
+        # One membership per store, in first-joined order; an active one wins, as in BusinessStoreDetailsApi
+        store_memberships = {}
+        for membership in memberships:
+            current = store_memberships.get(membership.BizMbrBizId)
+            if current is None or (membership.BizMbrIsActive and not current.BizMbrIsActive):
+                store_memberships[membership.BizMbrBizId] = membership
+        business_ids = list(store_memberships)
+
+        card_designs = {}
+        for card_design in (
+            BusinessCardDesign.objects.filter(CardDsgBizId__in=business_ids)
+            .order_by("CardDsgBizId", "id")
+            .values("CardDsgBizId", *CARD_DESIGN_FIELDS)
+        ):
+            card_designs.setdefault(card_design["CardDsgBizId"], card_design)
+
+        balances = {
+            balance["CmltvPntsBizId"]: balance
+            for balance in CumulativePoints.objects.filter(
+                CmltvPntsMbrCardNo=card_number, CmltvPntsBizId__in=business_ids
+            ).values("CmltvPntsBizId", "LifetimeEarnedPoints", "LifetimeRedeemedPoints", "CurrentBalance", "TotalPurchaseAmount")
+        }
+
+        # Last K transactions of every store in one query: number each store's rows newest first
+        recent_transactions = {business_id: [] for business_id in business_ids}
+        if last_k and business_ids:
+            transactions = (
+                CardTransaction.objects.filter(CrdTrnsCardNumber=card_number, CrdTrnsBizId__in=business_ids)
+                .annotate(row_number=Window(
+                    expression=RowNumber(),
+                    partition_by=[F("CrdTrnsBizId")],
+                    order_by=[F("CrdTrnsTransactionDate").desc(), F("id").desc()],
+                ))
+                .filter(row_number__lte=last_k)
+                .order_by("CrdTrnsBizId", "row_number")
+            )
+            for transaction_data in card_transaction_rows.serialize(card_transaction_rows.values(transactions)):
+                recent_transactions[transaction_data["CrdTrnsBizId"]].append(transaction_data)
+
+        business_details = get_business_details_by_ids(business_ids)
+
+        stores = []
+        for business_id, membership in store_memberships.items():
+            balance = balances.get(business_id, {})
+            earned = balance.get("LifetimeEarnedPoints") or 0
+            current_balance = balance.get("CurrentBalance") or 0
+            # Milestones only apply to active memberships, as in BusinessStoreDetailsApi
+            reward_rule = membership.BizMbrRuleId if membership.BizMbrIsActive else None
+            card_design = card_designs.get(business_id, {})
+
+            stores.append({
+                "business_id": business_id,
+                "business_name": (business_details.get(business_id) or {}).get("business_name"),
+                "BizMbrIsActive": membership.BizMbrIsActive,
+                **{field: card_design.get(field) for field in CARD_DESIGN_FIELDS},
+                "LifetimeEarnedPoints": earned,
+                "LifetimeRedeemedPoints": balance.get("LifetimeRedeemedPoints") or 0,
+                "CurrentBalance": current_balance,
+                "TotalPurchaseAmount": balance.get("TotalPurchaseAmount") or 0,
+                **milestone_progress(reward_rule.RewardRuleMilestone if reward_rule else 0, earned, current_balance),
+                "RewardInfo": _reward_info(reward_rule),
+                "recent_transactions": recent_transactions.get(business_id, []),
+            })
+
+        return Response({
+            "success": True,
+            "MbrCardNo": card_number,
+            "FullName": request.user.full_name,
+            "stores": stores,
+        }, status=status.HTTP_200_OK)
+
+
 class MemberTransactionHistoryApi(APIView):
     """
-    Retrieve all transactions of a member for a specific business (BizMbrBizId),
-    including cumulative points summary.
+    Retrieve the transactions of a member for a specific business (BizMbrBizId),
+    newest first and one cursor page at a time, including cumulative points summary.
     """
     authentication_classes = [SSOMemberTokenAuthentication]
     permission_classes = [IsAuthenticated]
 
     @swagger_auto_schema(
-        operation_description="Retrieve all transactions for a member related to a specific business, along with cumulative points summary.",
+        operation_description="Retrieve a page of transactions for a member related to a specific business, along with cumulative points summary.",
         manual_parameters=[
             openapi.Parameter(
                 'biz_id',
@@ -252,7 +391,10 @@ class MemberTransactionHistoryApi(APIView):
                 type=openapi.TYPE_STRING,
                 enum=['debit', 'credit'],
                 required=False
-            )
+            ),
+            openapi.Parameter('cursor', openapi.IN_QUERY, description="next_cursor / previous_cursor from the previous response", type=openapi.TYPE_STRING, required=False),
+            openapi.Parameter('page_size', openapi.IN_QUERY, description="Transactions per page (max 100)", type=openapi.TYPE_INTEGER, required=False),
+            openapi.Parameter('include_total', openapi.IN_QUERY, description="Also return total_items (runs a COUNT)", type=openapi.TYPE_BOOLEAN, required=False),
         ],
         responses={
             200: openapi.Response(
@@ -264,7 +406,11 @@ class MemberTransactionHistoryApi(APIView):
                         "transactions": openapi.Schema(
                             type=openapi.TYPE_ARRAY,
                             items=openapi.Items(type=openapi.TYPE_OBJECT),
-                            description="List of transactions with type (debit or credit)"
+                            description="One page of transactions with type (debit or credit)"
+                        ),
+                        "pagination_meta_data": openapi.Schema(
+                            type=openapi.TYPE_OBJECT,
+                            description="next_cursor / previous_cursor (and total_items with include_total)"
                         ),
                         "cumulative_points": openapi.Schema(
                             type=openapi.TYPE_OBJECT,
@@ -291,7 +437,7 @@ class MemberTransactionHistoryApi(APIView):
     )
     def get(self, request, biz_id):
         """
-        Retrieve all transactions of a member for a specific business,
+        Retrieve a page of transactions of a member for a specific business,
         including cumulative points summary.
         """
         if not biz_id:
@@ -301,7 +447,7 @@ class MemberTransactionHistoryApi(APIView):
             )
 
         # Ensure the business exists
-        business = get_business_details_by_id(biz_id)
+        business = get_business_details_by_id(biz_id) or {}
         business_id=business.get("business_id")
         if not business_id:
             return Response({"error": "Business not found"}, status=status.HTTP_404_NOT_FOUND)
@@ -309,39 +455,46 @@ class MemberTransactionHistoryApi(APIView):
         transaction_type = request.query_params.get('transaction_type', None)
         # print(transaction_type,"================================")
 
-        # Retrieve all transactions related to the business for the logged-in member
-        transactions = CardTransaction.objects.filter(
+        # Transactions related to the business for the logged-in member
+        transactions = card_transaction_rows.values(CardTransaction.objects.filter(
             CrdTrnsBizId=business_id,
             CrdTrnsCardNumber=request.user.mbrcardno  # Filtering transactions for the logged-in member
-        )
+        ))
 
         # Apply filter for transaction type if provided
         if transaction_type in ['Points_Redeemed', 'Points_Earned']:
             transactions = transactions.filter(CrdTrnsTransactionType=transaction_type)
 
+        # Keyset pages, newest first (?cursor=...&page_size=...)
+        page, pagination_meta = cursor_paginate(
+            request,
+            transactions,
+            ordering=("-CrdTrnsTransactionDate", "-id"),
+            data_per_page=settings.MEMBER_TRANSACTION_HISTORY_PAGE_SIZE
+        )
+
         # Retrieve cumulative points for the logged-in member and business
-        cumulative_points = CumulativePoints.objects.filter(
+        cumulative_points = cumulative_points_rows.values(CumulativePoints.objects.filter(
             CmltvPntsMbrCardNo=request.user.mbrcardno,
             CmltvPntsBizId=business_id
-        ).first()
+        )).first()
 
-        transaction_data = CardTransactionSerializer(transactions, many=True).data if transactions.exists() else []
-        cumulative_points_data = CumulativePointsSerializer(cumulative_points).data if cumulative_points else {}
+        transaction_data = card_transaction_rows.serialize(page)
+        cumulative_points_data = cumulative_points_rows.serialize_one(cumulative_points) or {}
 
-        if not transactions.exists() and not cumulative_points:
+        if not page and not cumulative_points and not request.query_params.get("cursor"):
             return Response(
                 {"success": False, "message": "No transactions or cumulative points found for this business."},
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        return Response(
-            {
-                "success": True,
-                "transactions": transaction_data,
-                "cumulative_points": cumulative_points_data
-            },
-            status=status.HTTP_200_OK
-        )
+        data = {
+            "success": True,
+            "transactions": transaction_data,
+            "cumulative_points": cumulative_points_data,
+            "pagination_meta_data": pagination_meta,
+        }
+        return Response(data, status=status.HTTP_200_OK)
         
         
         
@@ -455,9 +608,11 @@ class MemberQRScanAPIView(APIView):
             business_id = int(business_id)
         except ValueError:
             return Response({"success": False, "error": "Invalid Biz_Id format."}, status=400)
-        business = get_business_details_by_id(business_id)
+        business = get_business_details_by_id(business_id) or {}
         business_id=business.get("business_id")
         email=business.get("email")
+        if not business_id:
+            return Response({"success": False, "error": "Business not found."}, status=404)
         # Check if already active
         if BusinessMember.objects.filter(BizMbrCardNo=card_number, BizMbrBizId=business_id).exists():
             return Response({
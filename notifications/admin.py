@@ -0,0 +1,16 @@
+from django.contrib import admin
+from notifications.models import EmailOutbox, SmsOutbox
+
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    list_display = ("id", "recipient", "subject", "status", "attempts", "next_attempt_at", "created_at")
+    list_filter = ("status",)
+    search_fields = ("recipient", "subject")
+
+
+@admin.register(SmsOutbox)
+class SmsOutboxAdmin(admin.ModelAdmin):
+    list_display = ("id", "business_id", "mobile_number", "status", "attempts", "next_attempt_at", "created_at")
+    list_filter = ("status",)
+    search_fields = ("mobile_number",)
@@ -0,0 +1,13 @@
+from helpers.emails import deliver_email
+from notifications.models import EmailOutbox
+from notifications.worker import OutboxWorkerCommand
+
+
+class Command(OutboxWorkerCommand):
+    help = "Deliver queued emails from the EmailOutbox table with a bounded worker pool."
+
+    model = EmailOutbox
+    setting_prefix = "EMAIL_OUTBOX"
+
+    def deliver(self, message):
+        deliver_email(message)
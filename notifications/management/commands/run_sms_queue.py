@@ -0,0 +1,22 @@
+from django.conf import settings
+from helpers.utils import deliver_sms
+from notifications.models import SmsOutbox
+from notifications.worker import OutboxWorkerCommand, TokenBucket
+
+
+class Command(OutboxWorkerCommand):
+    help = (
+        "Deliver queued SMS from the SmsOutbox table, limited to SMS_RATE_PER_SECOND. "
+        "The limit is per process, so run a single instance against the gateway quota."
+    )
+
+    model = SmsOutbox
+    setting_prefix = "SMS_QUEUE"
+
+    def handle(self, *args, **options):
+        self.rate_limiter = TokenBucket(settings.SMS_RATE_PER_SECOND, settings.SMS_RATE_BURST)
+        super().handle(*args, **options)
+
+    def deliver(self, message):
+        self.rate_limiter.acquire()
+        deliver_sms(message)
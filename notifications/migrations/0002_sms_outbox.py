@@ -0,0 +1,33 @@
+# Generated by Django 5.2 on 2026-10-17 15:43
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SmsOutbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('sending', 'Sending'), ('sent', 'Sent'), ('dead', 'Dead')], default='pending', max_length=10)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('business_id', models.IntegerField(default=0)),
+                ('mobile_number', models.CharField(max_length=20)),
+                ('message', models.TextField()),
+                ('dedup_key', models.CharField(max_length=64)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='smsoutbox_status_due_idx'), models.Index(fields=['dedup_key', '-created_at'], name='smsoutbox_dedup_idx')],
+            },
+        ),
+    ]
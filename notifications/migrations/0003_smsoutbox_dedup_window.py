@@ -0,0 +1,22 @@
+# Generated by Django 5.2 on 2026-10-17 16:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0002_sms_outbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='smsoutbox',
+            name='dedup_window',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='smsoutbox',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'dead'), _negated=True), fields=('dedup_key', 'dedup_window'), name='unique_sms_per_dedup_window'),
+        ),
+    ]
@@ -0,0 +1,69 @@
+from django.db import models
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+
+class OutboxMessage(models.Model):
+    """Common delivery state for messages sent by a background worker."""
+
+    STATUS_PENDING = "pending"
+    STATUS_SENDING = "sending"
+    STATUS_SENT = "sent"
+    STATUS_DEAD = "dead"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_SENDING, "Sending"),
+        (STATUS_SENT, "Sent"),
+        (STATUS_DEAD, "Dead"),
+    ]
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        abstract = True
+
+
+class EmailOutbox(OutboxMessage):
+    subject = models.CharField(max_length=255)
+    template_name = models.CharField(max_length=255)
+    context = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    recipient = models.CharField(max_length=254)
+    attachments = models.JSONField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"], name="emailoutbox_status_due_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.recipient} - {self.subject} ({self.status})"
+
+
+class SmsOutbox(OutboxMessage):
+    business_id = models.IntegerField(default=0)
+    mobile_number = models.CharField(max_length=20)
+    message = models.TextField()
+    dedup_key = models.CharField(max_length=64)
+    # created_at in whole SMS_DEDUP_WINDOW_SECONDS, see helpers.utils.queue_sms
+    dedup_window = models.BigIntegerField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"], name="smsoutbox_status_due_idx"),
+            models.Index(fields=["dedup_key", "-created_at"], name="smsoutbox_dedup_idx"),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["dedup_key", "dedup_window"],
+                condition=~models.Q(status=OutboxMessage.STATUS_DEAD),
+                name="unique_sms_per_dedup_window",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.mobile_number} ({self.status})"
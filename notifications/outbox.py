@@ -0,0 +1,114 @@
+"""
+    Claim / complete / retry helpers shared by the outbox workers.
+
+    A worker claims a batch of due rows (pending, or sending with an expired
+    lease after a crash), delivers them outside the claiming transaction and then
+    marks each row sent, pending again with exponential backoff, or dead once it
+    has used all its attempts. select_for_update(skip_locked=True) lets several
+    worker processes drain the same table without picking the same rows.
+"""
+
+import random
+from datetime import timedelta
+
+from django.db import close_old_connections, transaction
+from django.db.models import Count, F, Min, Q
+from django.utils import timezone
+from notifications.models import OutboxMessage
+
+
+class PermanentDeliveryError(Exception):
+    """The message can never be delivered (bad template, rejected recipient); do not retry."""
+
+
+def due_messages(model):
+    now = timezone.now()
+    return model.objects.filter(
+        Q(status=OutboxMessage.STATUS_PENDING) | Q(status=OutboxMessage.STATUS_SENDING),
+        next_attempt_at__lte=now,
+    )
+
+
+def claim_batch(model, batch_size, lease_seconds):
+    """Lock up to batch_size due rows, mark them sending and return them."""
+    with transaction.atomic():
+        ids = list(
+            due_messages(model)
+            .select_for_update(skip_locked=True)
+            .order_by("next_attempt_at", "id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            return []
+        model.objects.filter(id__in=ids).update(
+            status=OutboxMessage.STATUS_SENDING,
+            attempts=F("attempts") + 1,
+            next_attempt_at=timezone.now() + timedelta(seconds=lease_seconds),
+        )
+    return list(model.objects.filter(id__in=ids).order_by("id"))
+
+
+def mark_sent(message):
+    type(message).objects.filter(id=message.id).update(
+        status=OutboxMessage.STATUS_SENT, sent_at=timezone.now(), last_error=""
+    )
+
+
+def mark_failed(message, error, max_attempts, retry_base_seconds, permanent=False):
+    """Schedule a retry with jittered exponential backoff, or dead-letter the row."""
+    if permanent or message.attempts >= max_attempts:
+        type(message).objects.filter(id=message.id).update(
+            status=OutboxMessage.STATUS_DEAD, last_error=str(error)[:2000]
+        )
+        return OutboxMessage.STATUS_DEAD
+
+    delay = retry_base_seconds * (2 ** (message.attempts - 1))
+    delay = random.uniform(delay / 2, delay)
+    type(message).objects.filter(id=message.id).update(
+        status=OutboxMessage.STATUS_PENDING,
+        next_attempt_at=timezone.now() + timedelta(seconds=delay),
+        last_error=str(error)[:2000],
+    )
+    return OutboxMessage.STATUS_PENDING
+
+
+def process_batch(model, deliver, executor, batch_size, lease_seconds, max_attempts, retry_base_seconds):
+    """
+    Claim one batch and deliver it on the worker's bounded thread pool.
+
+    deliver(message) returns None on success or raises; a PermanentDeliveryError
+    dead-letters the row straight away. Returns {"sent": n, "retried": n, "dead": n}.
+    """
+    messages = claim_batch(model, batch_size, lease_seconds)
+    result = {"sent": 0, "retried": 0, "dead": 0}
+    if not messages:
+        return result
+
+    def run(message):
+        try:
+            deliver(message)
+            mark_sent(message)
+            return "sent"
+        except PermanentDeliveryError as e:
+            mark_failed(message, e, max_attempts, retry_base_seconds, permanent=True)
+            return "dead"
+        except Exception as e:
+            state = mark_failed(message, e, max_attempts, retry_base_seconds)
+            return "dead" if state == OutboxMessage.STATUS_DEAD else "retried"
+        finally:
+            close_old_connections()
+
+    for outcome in executor.map(run, messages):
+        result[outcome] += 1
+    return result
+
+
+def status_counts(model):
+    """Row count per status plus the age in seconds of the oldest due message."""
+    counts = dict.fromkeys([choice for choice, _ in OutboxMessage.STATUS_CHOICES], 0)
+    for row in model.objects.values("status").annotate(total=Count("id")):
+        counts[row["status"]] = row["total"]
+
+    oldest = due_messages(model).aggregate(oldest=Min("created_at"))["oldest"]
+    counts["oldest_due_age_seconds"] = int((timezone.now() - oldest).total_seconds()) if oldest else 0
+    return counts
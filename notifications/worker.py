@@ -0,0 +1,94 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from notifications.outbox import process_batch, status_counts
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: acquire() blocks until a token is available, so
+    at most `rate` calls per second go out (plus an initial burst).
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.capacity = float(burst or rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class OutboxWorkerCommand(BaseCommand):
+    """
+    Base for the outbox runner commands. Subclasses set `model`,
+    `setting_prefix` (reads <PREFIX>_WORKERS, _BATCH_SIZE, _MAX_ATTEMPTS,
+    _RETRY_BASE_SECONDS and _LEASE_SECONDS) and implement deliver(message).
+    """
+
+    model = None
+    setting_prefix = None
+
+    def setting(self, name):
+        return getattr(settings, f"{self.setting_prefix}_{name}")
+
+    def deliver(self, message):
+        raise NotImplementedError
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Drain the due messages once and exit.")
+        parser.add_argument("--stats", action="store_true", help="Print the message count per status and exit.")
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument("--workers", type=int, default=None)
+        parser.add_argument("--interval", type=float, default=5, help="Seconds to sleep when nothing is due.")
+
+    def handle(self, *args, **options):
+        if options["stats"]:
+            self.stdout.write(json.dumps(status_counts(self.model)))
+            return
+
+        workers = options["workers"] or self.setting("WORKERS")
+        batch_size = options["batch_size"] or self.setting("BATCH_SIZE")
+        totals = {"sent": 0, "retried": 0, "dead": 0}
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            try:
+                while True:
+                    result = process_batch(
+                        self.model,
+                        self.deliver,
+                        executor,
+                        batch_size=batch_size,
+                        lease_seconds=self.setting("LEASE_SECONDS"),
+                        max_attempts=self.setting("MAX_ATTEMPTS"),
+                        retry_base_seconds=self.setting("RETRY_BASE_SECONDS"),
+                    )
+                    for outcome, count in result.items():
+                        totals[outcome] += count
+                    if any(result.values()):
+                        self.stdout.write(f"sent={result['sent']} retried={result['retried']} dead={result['dead']}")
+                        continue
+                    if options["once"]:
+                        break
+                    time.sleep(options["interval"])
+            except KeyboardInterrupt:
+                pass
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{self.model.__name__}: sent {totals['sent']}, retried {totals['retried']}, dead {totals['dead']}."
+        ))
@@ -35,6 +35,7 @@ INSTALLED_APPS = [
     'member',
     'survey',
     'admin_dashboard',
+    'notifications',
     'rest_framework',
     'drf_yasg',
     'corsheaders',
@@ -42,6 +43,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'helpers.middleware.ResponseCompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -107,6 +109,29 @@ DATABASES = {
     }
 }
 
+# Cache
+# Local memory by default, point CACHE_BACKEND/CACHE_LOCATION at a shared backend (e.g. redis) in production.
+# Cross-worker invalidation (card remaps, member details) relies on a shared backend.
+CACHES = {
+    "default": {
+        "BACKEND": env_vars.get("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": env_vars.get("CACHE_LOCATION", "rewardsmanagement"),
+    }
+}
+
+# DRF: orjson-backed JSON renderer/parser (helpers/renderers.py), same output as the defaults
+REST_FRAMEWORK = {
+    "DEFAULT_RENDERER_CLASSES": [
+        "helpers.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "helpers.renderers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -145,6 +170,10 @@ STATIC_URL = '/static/'
 STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage" 
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 
+# Uploaded files (member import jobs)
+MEDIA_URL = '/media/'
+MEDIA_ROOT = env_vars.get("MEDIA_ROOT", os.path.join(BASE_DIR, 'media'))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -153,6 +182,107 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
  # Adjust based on jsjcardauth URL
 AUTH_SERVER_URL =env_vars['AUTH_SERVER_URL']
 
+# Pooled HTTP client for auth server calls (helpers/http_client.py)
+AUTH_HTTP_POOL_SIZE = int(env_vars.get("AUTH_HTTP_POOL_SIZE", 20))
+AUTH_HTTP_CONNECT_TIMEOUT = float(env_vars.get("AUTH_HTTP_CONNECT_TIMEOUT", 3))
+AUTH_HTTP_READ_TIMEOUT = float(env_vars.get("AUTH_HTTP_READ_TIMEOUT", 5))
+AUTH_HTTP_MAX_RETRIES = int(env_vars.get("AUTH_HTTP_MAX_RETRIES", 2))
+AUTH_HTTP_BACKOFF_FACTOR = float(env_vars.get("AUTH_HTTP_BACKOFF_FACTOR", 0.1))
+AUTH_HTTP_BACKOFF_JITTER = float(env_vars.get("AUTH_HTTP_BACKOFF_JITTER", 0.1))
+
+# Per-endpoint circuit breaker for auth server calls (helpers/circuit_breaker.py)
+AUTH_BREAKER_WINDOW_SECONDS = int(env_vars.get("AUTH_BREAKER_WINDOW_SECONDS", 30))
+AUTH_BREAKER_MIN_CALLS = int(env_vars.get("AUTH_BREAKER_MIN_CALLS", 20))
+AUTH_BREAKER_FAILURE_RATE = int(env_vars.get("AUTH_BREAKER_FAILURE_RATE", 50))  # percent
+AUTH_BREAKER_OPEN_SECONDS = int(env_vars.get("AUTH_BREAKER_OPEN_SECONDS", 15))
+AUTH_BREAKER_HALF_OPEN_CALLS = int(env_vars.get("AUTH_BREAKER_HALF_OPEN_CALLS", 3))
+
+# Fan-out for bulk auth server lookups (helpers.utils.get_member_details_by_cards)
+AUTH_LOOKUP_MAX_WORKERS = int(env_vars.get("AUTH_LOOKUP_MAX_WORKERS", 8))
+AUTH_LOOKUP_CHUNK_SIZE = int(env_vars.get("AUTH_LOOKUP_CHUNK_SIZE", 50))
+
+# Read-through cache for member/business details from the auth server (seconds)
+MEMBER_DETAILS_CACHE_TTL = int(env_vars.get("MEMBER_DETAILS_CACHE_TTL", 300))
+BUSINESS_DETAILS_CACHE_TTL = int(env_vars.get("BUSINESS_DETAILS_CACHE_TTL", 900))
+REMOTE_CACHE_STALE_TTL = int(env_vars.get("REMOTE_CACHE_STALE_TTL", 3600))
+REMOTE_CACHE_REFRESH_WORKERS = int(env_vars.get("REMOTE_CACHE_REFRESH_WORKERS", 2))
+
+# SSO token verification cache (seconds)
+SSO_TOKEN_CACHE_TTL = int(env_vars.get("SSO_TOKEN_CACHE_TTL", 300))
+SSO_TOKEN_NEGATIVE_CACHE_TTL = int(env_vars.get("SSO_TOKEN_NEGATIVE_CACHE_TTL", 30))
+
+# Card -> primary card resolution cache (helpers/card_utils.py, seconds)
+CARD_MAPPING_CACHE_TTL = int(env_vars.get("CARD_MAPPING_CACHE_TTL", 86400))
+CARD_MAPPING_NEGATIVE_CACHE_TTL = int(env_vars.get("CARD_MAPPING_NEGATIVE_CACHE_TTL", 300))
+CARD_MAPPING_TABLE_ENABLED = env_vars.get("CARD_MAPPING_TABLE_ENABLED", "True") == "True"
+
+# How long a worker trusts its cached reward rule version before re-reading it (business/reward_engine.py, seconds)
+REWARD_RULES_VERSION_CACHE_TTL = int(env_vars.get("REWARD_RULES_VERSION_CACHE_TTL", 5))
+# How long a card's membership rule id stays cached; membership changes drop it sooner (seconds)
+REWARD_CARD_RULE_CACHE_TTL = int(env_vars.get("REWARD_CARD_RULE_CACHE_TTL", 300))
+
+# Shared secret for internal endpoints called by other services (X-Internal-Token header)
+INTERNAL_API_TOKEN = env_vars.get("INTERNAL_API_TOKEN", "")
+
+# How long a stored Idempotency-Key response is replayed (business/idempotency.py)
+IDEMPOTENCY_KEY_TTL_HOURS = int(env_vars.get("IDEMPOTENCY_KEY_TTL_HOURS", 24))
+
+# Business member list (business.views.BusinessMemberListCreateApi): default page size, and the
+# most members the opt-in ?all=true full list returns
+MEMBER_LIST_PAGE_SIZE = int(env_vars.get("MEMBER_LIST_PAGE_SIZE", 20))
+MEMBER_LIST_MAX_ITEMS = int(env_vars.get("MEMBER_LIST_MAX_ITEMS", 1000))
+
+# Staff member list (admin_dashboard.staff.staff_api.BusinessMemberListByBusinessID): default page size
+STAFF_MEMBER_LIST_PAGE_SIZE = int(env_vars.get("STAFF_MEMBER_LIST_PAGE_SIZE", 50))
+
+# Max items per POST reward/transactions/batch/
+TRANSACTION_BATCH_MAX_ITEMS = int(env_vars.get("TRANSACTION_BATCH_MAX_ITEMS", 500))
+
+# Business report time series: cache lifetime of closed buckets (seconds) and max buckets per request
+REPORT_SERIES_CACHE_TTL = int(env_vars.get("REPORT_SERIES_CACHE_TTL", 86400))
+REPORT_SERIES_MAX_BUCKETS = int(env_vars.get("REPORT_SERIES_MAX_BUCKETS", 400))
+
+# Email outbox worker (manage.py run_email_outbox)
+EMAIL_OUTBOX_WORKERS = int(env_vars.get("EMAIL_OUTBOX_WORKERS", 4))
+EMAIL_OUTBOX_BATCH_SIZE = int(env_vars.get("EMAIL_OUTBOX_BATCH_SIZE", 50))
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(env_vars.get("EMAIL_OUTBOX_MAX_ATTEMPTS", 6))
+EMAIL_OUTBOX_RETRY_BASE_SECONDS = int(env_vars.get("EMAIL_OUTBOX_RETRY_BASE_SECONDS", 30))
+EMAIL_OUTBOX_LEASE_SECONDS = int(env_vars.get("EMAIL_OUTBOX_LEASE_SECONDS", 300))
+EMAIL_SEND_TIMEOUT = int(env_vars.get("EMAIL_SEND_TIMEOUT", 10))
+
+# SMS queue worker (manage.py run_sms_queue)
+SMS_QUEUE_WORKERS = int(env_vars.get("SMS_QUEUE_WORKERS", 2))
+SMS_QUEUE_BATCH_SIZE = int(env_vars.get("SMS_QUEUE_BATCH_SIZE", 50))
+SMS_QUEUE_MAX_ATTEMPTS = int(env_vars.get("SMS_QUEUE_MAX_ATTEMPTS", 5))
+SMS_QUEUE_RETRY_BASE_SECONDS = int(env_vars.get("SMS_QUEUE_RETRY_BASE_SECONDS", 15))
+SMS_QUEUE_LEASE_SECONDS = int(env_vars.get("SMS_QUEUE_LEASE_SECONDS", 120))
+SMS_RATE_PER_SECOND = int(env_vars.get("SMS_RATE_PER_SECOND", 10))
+SMS_RATE_BURST = int(env_vars.get("SMS_RATE_BURST", 10))
+SMS_DEDUP_WINDOW_SECONDS = int(env_vars.get("SMS_DEDUP_WINDOW_SECONDS", 300))
+SMS_SEND_TIMEOUT = int(env_vars.get("SMS_SEND_TIMEOUT", 10))
+
+# CSV member import (business/member_import.py): rows per bulk_create and max errors reported
+MEMBER_IMPORT_CHUNK_SIZE = int(env_vars.get("MEMBER_IMPORT_CHUNK_SIZE", 2000))
+MEMBER_IMPORT_MAX_ERRORS = int(env_vars.get("MEMBER_IMPORT_MAX_ERRORS", 1000))
+
+# Background import jobs (manage.py run_import_jobs)
+IMPORT_JOB_LEASE_SECONDS = int(env_vars.get("IMPORT_JOB_LEASE_SECONDS", 300))
+IMPORT_JOB_MAX_ATTEMPTS = int(env_vars.get("IMPORT_JOB_MAX_ATTEMPTS", 3))
+
+# Member transaction history (member.views.MemberTransactionHistoryApi): transactions per cursor page
+MEMBER_TRANSACTION_HISTORY_PAGE_SIZE = int(env_vars.get("MEMBER_TRANSACTION_HISTORY_PAGE_SIZE", 20))
+
+# Member app dashboard (member.views.MemberDashboardApi): latest transactions per store
+MEMBER_DASHBOARD_TRANSACTIONS = int(env_vars.get("MEMBER_DASHBOARD_TRANSACTIONS", 5))
+MEMBER_DASHBOARD_MAX_TRANSACTIONS = int(env_vars.get("MEMBER_DASHBOARD_MAX_TRANSACTIONS", 20))
+
+# JSON encoding and response compression (helpers/renderers.py, helpers/middleware.py)
+FAST_JSON_ENABLED = env_vars.get("FAST_JSON_ENABLED", "True") == "True"
+RESPONSE_COMPRESSION_MIN_BYTES = int(env_vars.get("RESPONSE_COMPRESSION_MIN_BYTES", 1024))  # 0 disables compression
+RESPONSE_COMPRESSION_BROTLI_QUALITY = int(env_vars.get("RESPONSE_COMPRESSION_BROTLI_QUALITY", 5))
+# Comma-separated path prefixes that are never compressed (bodies with secrets next to user input)
+RESPONSE_COMPRESSION_EXCLUDE_PATHS = [path.strip() for path in env_vars.get("RESPONSE_COMPRESSION_EXCLUDE_PATHS", "").split(",") if path.strip()]
+
 
 # cros origin 
 CORS_ALLOW_ALL_ORIGINS = True